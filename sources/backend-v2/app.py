@@ -1,13 +1,21 @@
-from flask import Flask
-from flask_mysqldb import MySQL
+from flask import Flask, jsonify, request
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from config import Config
+from database import db
+from utils.log import get_logger
+import hmac
+
+log = get_logger(__name__)
 
-mysql = MySQL()
 jwt = JWTManager()
 
-def create_app():
+def create_app(start_background=True):
+    """
+    start_background=False deja sin arrancar los hilos de fondo: con gunicorn
+    --preload la app se crea en el master y los hilos no sobreviven al fork, así
+    que cada worker llama a start_background_services en post_fork.
+    """
     app = Flask(__name__)
     app.config.from_object(Config)
     
@@ -18,7 +26,7 @@ def create_app():
          methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
          supports_credentials=False)
     
-    mysql.init_app(app)
+    db.init_app(app)
     jwt.init_app(app)
 
     # Importar blueprints aquí
@@ -33,13 +41,76 @@ def create_app():
     app.register_blueprint(pot_bp, url_prefix='/pots')
     app.register_blueprint(iot_bp, url_prefix='/iot')
 
+    from utils import metrics, log as logging_stats
+    from services.ingest_buffer import ingest_buffer
+    from services import model_loader
+    metrics.register('ingest_buffer', ingest_buffer.stats)
+    metrics.register('db_pool', db.pool.stats)
+    metrics.register('logging', logging_stats.stats)
+
+    if start_background:
+        start_background_services(app)
+
+    @app.route('/metrics', methods=['GET'])
+    def get_metrics():
+        # Expone tamaños de tablas, pool y cachés: no es público
+        token = app.config['METRICS_TOKEN']
+        if token:
+            allowed = hmac.compare_digest(request.headers.get('X-Metrics-Token', '').encode(), token.encode())
+        else:
+            allowed = request.remote_addr in ('127.0.0.1', '::1')
+        if not allowed:
+            return jsonify({'error': 'Unauthorized'}), 401
+        return jsonify(metrics.snapshot()), 200
+
+    @app.route('/health/live', methods=['GET'])
+    def liveness():
+        # El proceso responde: no depende de la base de datos ni de los modelos
+        return jsonify({'status': 'alive'}), 200
+
+    @app.route('/health/ready', methods=['GET'])
+    def readiness():
+        ready, models = model_loader.readiness()
+        try:
+            with db.checkout() as conn:
+                conn.ping()
+            database = 'ok'
+        except Exception as e:
+            database = str(e)
+            ready = False
+        return jsonify({
+            'status': 'ready' if ready else 'not_ready',
+            'database': database,
+            'models': models
+        }), 200 if ready else 503
+
     return app
 
+def start_background_services(app):
+    """Hilos de fondo del proceso: write-behind, invalidación de sesiones, sweeper y warm-up."""
+    from services.ingest_buffer import ingest_buffer
+    if app.config['INGEST_WRITE_BEHIND']:
+        ingest_buffer.init_app(app)
+
+    from services import session_cache
+    session_cache.init_app(app)
+    if app.config['AUTH_SESSION_MODE'] == 'stateless':
+        from services.revocation import revocation_store
+        revocation_store.init_app(app)
+    if app.config['SESSION_SWEEPER']:
+        from services.session_sweeper import session_sweeper
+        session_sweeper.init_app(app)
+
+    # Los modelos se cargan en el primer uso; con MODEL_WARMUP, ya en segundo plano
+    from services import model_loader
+    if app.config['MODEL_WARMUP']:
+        model_loader.warm_up_all()
+
+# Solo para desarrollo; en producción: gunicorn -c gunicorn.conf.py wsgi:app
 if __name__ == '__main__':
     app = create_app()
     host = app.config.get('FLASK_HOST', '0.0.0.0')
     port = app.config.get('FLASK_PORT', 5000)
-    print(f"\n🚀 Flask server running on http://{host}:{port}")
-    print(f"📡 Environment: {'Development' if app.debug else 'Production'}")
-    print(f"🔧 Debug mode: {app.debug}\n")
+    log.info(f"🚀 Flask server running on http://{host}:{port}",
+             environment='Development' if app.debug else 'Production', debug=app.debug)
     app.run(host=host, port=port, debug=True)
@@ -0,0 +1,63 @@
+"""
+Requests por segundo de un endpoint autenticado contra un servidor en marcha.
+Ejecutar una vez con el servidor en AUTH_SESSION_MODE=db y otra en
+AUTH_SESSION_MODE=stateless y comparar.
+
+Uso (desde backend-v2):
+    python benchmarks/bench_auth_modes.py --url http://localhost:5000 \\
+        --username user --password pass [--path /plants/] \\
+        [--threads 8] [--duration 10]
+"""
+import argparse
+import threading
+import time
+import requests
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', default='http://localhost:5000')
+    parser.add_argument('--username', required=True)
+    parser.add_argument('--password', required=True)
+    parser.add_argument('--path', default='/plants/', help='endpoint protegido con @authenticate')
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10.0)
+    args = parser.parse_args()
+
+    login = requests.post(f'{args.url}/auth/login', json={
+        'username': args.username,
+        'password': args.password
+    })
+    login.raise_for_status()
+    tokens = login.json()
+    headers = {
+        'Authorization': f"Bearer {tokens['access_token']}",
+        'X-Session-Token': tokens['session_token']
+    }
+
+    counts = [0] * args.threads
+    errors = [0] * args.threads
+    deadline = time.monotonic() + args.duration
+
+    def worker(index):
+        session = requests.Session()
+        while time.monotonic() < deadline:
+            response = session.get(f'{args.url}{args.path}', headers=headers)
+            if response.status_code == 200:
+                counts[index] += 1
+            else:
+                errors[index] += 1
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.threads)]
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - start
+
+    print(f"GET {args.path} con {args.threads} hilos durante {elapsed:.1f}s")
+    print(f"   OK: {sum(counts)}  errores: {sum(errors)}")
+    print(f"   {sum(counts) / elapsed:.1f} req/s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+Tiempos por etapa del preprocesado de imágenes de reconocimiento: camino
+original (decode completo + resize + np.array / 255.0 en float64 + conversión a
+float32) frente a services/image_preprocessing.py (decode JPEG en modo draft +
+resize + normalización uint8 -> float32 en un buffer preasignado).
+
+También informa de la diferencia de píxeles que introduce el modo draft.
+
+Sin --images genera fotos sintéticas de 4000x3000 (12 MP) en JPEG.
+
+Uso (desde backend-v2):
+    python benchmarks/bench_image_preprocessing.py [--images dir] [--limit 20] [--repeat 5]
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+from PIL import Image
+from services.image_preprocessing import IMG_HEIGHT, IMG_WIDTH, BatchBuffer, normalize
+
+SIZE = (IMG_WIDTH, IMG_HEIGHT)
+
+def synthetic_photos(count, width=4000, height=3000):
+    rng = np.random.default_rng(42)
+    photos = []
+    for _ in range(count):
+        # Gradientes suaves + ruido: se comprime como una foto, no como ruido puro
+        y, x = np.mgrid[0:height, 0:width]
+        base = np.stack([(x * 255 // width), (y * 255 // height), ((x + y) * 255 // (width + height))], axis=-1)
+        noise = rng.integers(0, 30, (height, width, 3))
+        buffer = io.BytesIO()
+        Image.fromarray(np.clip(base + noise, 0, 255).astype(np.uint8)).save(buffer, 'JPEG', quality=90)
+        photos.append(buffer.getvalue())
+    return photos
+
+def load_photos(directory, limit):
+    photos = []
+    for name in sorted(os.listdir(directory))[:limit]:
+        with open(os.path.join(directory, name), 'rb') as f:
+            photos.append(f.read())
+    return photos
+
+class StageTimer:
+    def __init__(self):
+        self.totals = {}
+
+    def __call__(self, stage, fn, *args):
+        start = time.perf_counter()
+        result = fn(*args)
+        self.totals[stage] = self.totals.get(stage, 0.0) + time.perf_counter() - start
+        return result
+
+def original_path(image_bytes, timer):
+    def decode():
+        img = Image.open(io.BytesIO(image_bytes))
+        img.load()
+        return img.convert('RGB') if img.mode != 'RGB' else img
+    img = timer('decode', decode)
+    img = timer('resize', img.resize, SIZE)
+    array = timer('to_array', np.array, img)
+    array = timer('normalize', lambda a: np.expand_dims(a, 0) / 255.0, array)
+    # Lo que hacía Keras internamente al recibir float64
+    return timer('cast_float32', lambda a: a.astype(np.float32), array)
+
+def optimized_path(image_bytes, timer, buffer):
+    def decode():
+        img = Image.open(io.BytesIO(image_bytes))
+        if img.format == 'JPEG':
+            img.draft('RGB', SIZE)
+        img.load()
+        return img.convert('RGB') if img.mode != 'RGB' else img
+    img = timer('decode', decode)
+    img = timer('resize', img.resize, SIZE)
+    pixels = timer('to_array', np.asarray, img)
+    out = buffer.batch(1)
+    timer('normalize', normalize, pixels, out[0])
+    return out
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--images')
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    photos = load_photos(args.images, args.limit) if args.images else synthetic_photos(min(args.limit, 4))
+    print(f"{len(photos)} imágenes, {args.repeat} repeticiones\n")
+
+    buffer = BatchBuffer()
+    original, optimized = StageTimer(), StageTimer()
+    max_diff = 0.0
+    for _ in range(args.repeat):
+        for image_bytes in photos:
+            expected = original_path(image_bytes, original)
+            got = optimized_path(image_bytes, optimized, buffer)
+            max_diff = max(max_diff, float(np.abs(expected - got).max()))
+
+    calls = len(photos) * args.repeat
+    print(f"{'etapa':<14} {'original ms':>12} {'optimizado ms':>14}")
+    for stage in ('decode', 'resize', 'to_array', 'normalize', 'cast_float32'):
+        before = original.totals.get(stage, 0.0) / calls * 1000
+        after = optimized.totals.get(stage, 0.0) / calls * 1000
+        print(f"{stage:<14} {before:>12.3f} {after:>14.3f}")
+    before = sum(original.totals.values()) / calls * 1000
+    after = sum(optimized.totals.values()) / calls * 1000
+    print(f"{'total':<14} {before:>12.3f} {after:>14.3f}   ({before / after:.1f}x)")
+    print(f"\nMáxima diferencia de píxel por el modo draft: {max_diff:.4f} (escala 0-1)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Paridad y latencia del evaluador compilado del modelo de riego frente a sklearn.
+Sale con código 1 si alguna predicción difiere.
+
+Uso (desde backend-v2):
+    python benchmarks/bench_irrigation_model.py [ruta/modelo_riego_numerico.pkl]
+"""
+import os
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+import pandas as pd
+from services.irrigation_model import FEATURES, SklearnPredictor, CompiledForest
+
+DEFAULT_MODEL = os.path.join(os.path.dirname(__file__), '..', '..', 'ML', 'modelo_riego_numerico.pkl')
+
+def timeit(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+def main():
+    model_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_MODEL
+    warnings.filterwarnings('ignore')
+    import joblib
+    model = joblib.load(model_path)
+    sklearn_path = SklearnPredictor(model)
+    compiled = CompiledForest.from_sklearn(model)
+
+    # Paridad: rejilla densa dentro y fuera del rango de entrenamiento
+    rng = np.random.default_rng(42)
+    n = 50000
+    X = np.column_stack([
+        rng.integers(0, 12, n),
+        rng.uniform(-10, 110, n),
+        rng.uniform(-10, 60, n)
+    ])
+    expected = model.predict(pd.DataFrame(X, columns=FEATURES))
+    got = compiled.predict(X)
+    mismatches = int(np.count_nonzero(expected != got))
+    print(f"Paridad sobre {n} filas: {'OK' if mismatches == 0 else f'{mismatches} diferencias'}")
+    print(f"   Máxima diferencia absoluta: {np.abs(expected - got).max():.3e} ml")
+
+    # Latencia: una fila (camino por request) y lotes
+    row = [(1, 28, 30)]
+    print("\nLatencia por llamada:")
+    print(f"   1 fila    sklearn+DataFrame: {timeit(lambda: sklearn_path.predict(row), 200) * 1e3:8.3f} ms")
+    print(f"   1 fila    compilado:         {timeit(lambda: compiled.predict(row), 2000) * 1e3:8.3f} ms")
+    for size in (100, 1000, 10000):
+        batch = X[:size]
+        print(f"   {size:<6}  sklearn+DataFrame: {timeit(lambda: sklearn_path.predict(batch), 20) * 1e3:8.3f} ms")
+        print(f"   {size:<6}  compilado:         {timeit(lambda: compiled.predict(batch), 20) * 1e3:8.3f} ms")
+
+    sys.exit(0 if mismatches == 0 else 1)
+
+if __name__ == '__main__':
+    main()
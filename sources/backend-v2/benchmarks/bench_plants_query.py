@@ -0,0 +1,128 @@
+"""
+Latencia de GET /plants (Plant.get_user_plants_with_conditions) según el número
+de plantas del usuario: consulta N+1 original frente a la consulta única.
+
+Necesita la base de datos del .env con el esquema aplicado (database.sql y
+migrations/). Crea un usuario temporal con sus plantas y lo borra al terminar.
+El historial se inserta directamente con fechas pasadas y la lectura más
+reciente de cada planta con Plant.create_ambiental_conditions (el camino de la
+ingesta), que mantiene plant_latest_conditions. Antes de medir se comprueba que
+ambas consultas devuelven las mismas filas.
+
+Uso (desde backend-v2):
+    python benchmarks/bench_plants_query.py [--conditions 50] [--repeat 20]
+"""
+import argparse
+import os
+import secrets
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from flask import Flask
+from database import db
+from config import Config
+from models.plant_model import Plant
+
+PLANT_COUNTS = [10, 50, 100, 250, 500]
+
+def legacy_user_plants(user_id):
+    """Implementación anterior: una consulta por planta."""
+    cur = db.connection.cursor()
+    cur.execute("SELECT id, name, species_id, pot_id, image_url FROM plants WHERE user_id = %s", (user_id,))
+    plants = cur.fetchall()
+    result = []
+    for plant in plants:
+        cur.execute("SELECT temperature_celsius, humidity_percent, moisture_percent, light_lux, recorded_at FROM ambiental_conditions WHERE plant_id = %s ORDER BY recorded_at DESC LIMIT 1", (plant[0],))
+        result.append((plant, cur.fetchone()))
+    cur.close()
+    return result
+
+def reading(i, n):
+    """Lectura distinta por planta y minuto, para que la comparación sea significativa."""
+    return (20.0 + i % 15 + n / 100, 40.0 + n % 50, 10.0 + (i * 7 + n) % 80, 500.0 + i * 3 + n)
+
+def seed(conn, user_id, start, count, conditions):
+    cur = conn.cursor()
+    plant_ids = []
+    for i in range(start, start + count):
+        cur.execute("INSERT INTO pots (user_id, label) VALUES (%s, %s)", (user_id, f'BENCH-{user_id}-{i}'))
+        pot_id = cur.lastrowid
+        cur.execute("INSERT INTO plants (user_id, pot_id, name) VALUES (%s, %s, %s)", (user_id, pot_id, f'bench {i}'))
+        plant_id = cur.lastrowid
+        plant_ids.append((i, plant_id))
+        # Historial: conditions - 1 lecturas de los minutos anteriores
+        cur.executemany("""
+            INSERT INTO ambiental_conditions
+            (plant_id, temperature_celsius, humidity_percent, moisture_percent, light_lux, recorded_at)
+            VALUES (%s, %s, %s, %s, %s, NOW() - INTERVAL %s MINUTE)
+        """, [(plant_id, *reading(i, n), n) for n in range(1, conditions)])
+    conn.commit()
+    cur.close()
+    # Lectura actual por la ingesta: actualiza plant_latest_conditions
+    Plant.create_ambiental_conditions([(plant_id, *reading(i, 0)) for i, plant_id in plant_ids])
+
+def check_same_rows(user_id):
+    """Las dos implementaciones deben devolver la misma última lectura por planta."""
+    legacy = {
+        plant[0]: None if cond is None else (
+            tuple(round(float(v), 3) for v in cond[:4]), cond[4].isoformat()
+        )
+        for plant, cond in legacy_user_plants(user_id)
+    }
+    single = {}
+    for plant in Plant.get_user_plants_with_conditions(user_id):
+        last = plant['last_conditions']
+        single[plant['id']] = None if last['recorded_at'] is None else (
+            tuple(round(float(last[key]), 3) for key in
+                  ('temperature_celsius', 'humidity_percent', 'moisture_percent', 'light_lux')),
+            last['recorded_at']
+        )
+    assert legacy == single, 'la consulta única no devuelve las mismas filas que la N+1'
+    assert all(value is not None for value in single.values()), 'plant_latest_conditions está vacía'
+
+def measure(fn, user_id, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(user_id)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--conditions', type=int, default=50, help='lecturas por planta')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    db.init_app(app)
+    with app.app_context():
+        conn = db.connection
+        cur = conn.cursor()
+        username = f'bench_{secrets.token_hex(4)}'
+        cur.execute("INSERT INTO users (username, email, password_hash) VALUES (%s, %s, %s)",
+                    (username, f'{username}@bench.local', 'x'))
+        user_id = cur.lastrowid
+        conn.commit()
+        try:
+            print(f"{'plantas':>8} {'N+1 (ms)':>10} {'única (ms)':>11} {'speedup':>8}")
+            seeded = 0
+            for count in PLANT_COUNTS:
+                seed(conn, user_id, seeded, count - seeded, args.conditions)
+                seeded = count
+                check_same_rows(user_id)
+                legacy = measure(legacy_user_plants, user_id, args.repeat)
+                single = measure(Plant.get_user_plants_with_conditions, user_id, args.repeat)
+                print(f"{count:>8} {legacy:>10.2f} {single:>11.2f} {legacy / single:>7.1f}x")
+        finally:
+            cur.execute("DELETE FROM pots WHERE user_id = %s", (user_id,))
+            cur.execute("DELETE FROM users WHERE id = %s", (user_id,))
+            conn.commit()
+            cur.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Paridad y latencia de los backends del modelo de reconocimiento
+(services/recognition_model.py) frente a Keras model.predict.
+
+Para cada backend disponible (se salta los que no tienen artefacto o librería)
+compara las probabilidades con Keras sobre las mismas imágenes (máxima
+diferencia absoluta y coincidencia del top-1) y mide la latencia por llamada
+con lotes de 1 y de --batch imágenes. Sale con código 1 si algún backend cambia
+el top-1 de alguna imagen.
+
+Con --images usa fotos reales (JPEG/PNG de un directorio); si no, imágenes
+aleatorias (útiles para latencia, menos para paridad).
+
+Uso (desde backend-v2):
+    python benchmarks/bench_recognition_backends.py [ruta/model-recognition.h5]
+        [--images dir] [--batch 16] [--repeat 50] [--threads N]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+from services.recognition_model import IMG_HEIGHT, IMG_WIDTH, BACKENDS, load_recognition_model, load_calibration_images
+
+DEFAULT_MODEL = os.path.join(os.path.dirname(__file__), '..', 'model-recognition.h5')
+
+def latency(fn, repeat):
+    fn()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return np.percentile(times, 50), np.percentile(times, 95)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('model', nargs='?', default=DEFAULT_MODEL)
+    parser.add_argument('--images')
+    parser.add_argument('--batch', type=int, default=16)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--threads', type=int)
+    args = parser.parse_args()
+
+    if args.images:
+        X = load_calibration_images(args.images, 256)
+    else:
+        X = np.random.default_rng(42).random((64, IMG_HEIGHT, IMG_WIDTH, 3), dtype=np.float32)
+    print(f"{len(X)} imágenes ({'reales' if args.images else 'aleatorias'})\n")
+
+    reference = load_recognition_model(args.model, 'keras', num_threads=args.threads).predict(X)
+    failed = False
+    print(f"{'backend':<12} {'max |Δp|':>10} {'top-1':>8} {'1 img p50/p95 ms':>18} {f'{args.batch} img p50/p95 ms':>19}")
+    for name in BACKENDS:
+        try:
+            backend = load_recognition_model(args.model, name, num_threads=args.threads)
+        except (ImportError, FileNotFoundError) as e:
+            print(f"{name:<12} no disponible: {e}")
+            continue
+        got = backend.predict(X)
+        max_diff = float(np.abs(got - reference).max())
+        agreement = float(np.mean(got.argmax(axis=1) == reference.argmax(axis=1)))
+        failed |= agreement < 1.0
+        single = latency(lambda: backend.predict(X[:1]), args.repeat)
+        batch = latency(lambda: backend.predict(X[:args.batch]), max(args.repeat // 5, 5))
+        print(f"{name:<12} {max_diff:>10.2e} {agreement:>8.2%} {single[0]:>8.2f} / {single[1]:<7.2f} {batch[0]:>9.2f} / {batch[1]:<7.2f}")
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
@@ -12,5 +12,90 @@ class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'default_secret')
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'default_jwt_secret')
     IOT_API_KEY = os.getenv('IOT_API_KEY', 'your_iot_api_key_here')
+    IOT_BATCH_MAX_READINGS = int(os.getenv('IOT_BATCH_MAX_READINGS', 500))
+    POT_LABEL_CACHE_SIZE = int(os.getenv('POT_LABEL_CACHE_SIZE', 10000))
+    POT_LABEL_CACHE_TTL = int(os.getenv('POT_LABEL_CACHE_TTL', 300))
+    # 'compiled' (evaluador NumPy) o 'sklearn' (RandomForestRegressor.predict original)
+    IRRIGATION_MODEL_BACKEND = os.getenv('IRRIGATION_MODEL_BACKEND', 'compiled')
+    # Tablas precalculadas por especie (humedad x temperatura) para el modelo de riego
+    IRRIGATION_LUT = os.getenv('IRRIGATION_LUT', 'false').lower() == 'true'
+    IRRIGATION_LUT_MOISTURE_RANGE = tuple(float(v) for v in os.getenv('IRRIGATION_LUT_MOISTURE_RANGE', '0,100').split(','))
+    IRRIGATION_LUT_MOISTURE_STEP = float(os.getenv('IRRIGATION_LUT_MOISTURE_STEP', 1.0))
+    IRRIGATION_LUT_TEMPERATURE_RANGE = tuple(float(v) for v in os.getenv('IRRIGATION_LUT_TEMPERATURE_RANGE', '0,50').split(','))
+    IRRIGATION_LUT_TEMPERATURE_STEP = float(os.getenv('IRRIGATION_LUT_TEMPERATURE_STEP', 0.1))
+    IRRIGATION_LUT_INTERPOLATE = os.getenv('IRRIGATION_LUT_INTERPOLATE', 'false').lower() == 'true'
+    # Caché LRU cuantizada de predicciones de riego (opcional: responde con la
+    # predicción del punto cuantizado; 0 = desactivada)
+    IRRIGATION_CACHE_SIZE = int(os.getenv('IRRIGATION_CACHE_SIZE', 0))
+    IRRIGATION_CACHE_MOISTURE_STEP = float(os.getenv('IRRIGATION_CACHE_MOISTURE_STEP', 1.0))
+    IRRIGATION_CACHE_TEMPERATURE_STEP = float(os.getenv('IRRIGATION_CACHE_TEMPERATURE_STEP', 0.1))
+    IRRIGATION_CACHE_CHECK_INTERVAL = float(os.getenv('IRRIGATION_CACHE_CHECK_INTERVAL', 5))
+    # Buffer write-behind para ambiental_conditions (ver services/ingest_buffer.py)
+    INGEST_WRITE_BEHIND = os.getenv('INGEST_WRITE_BEHIND', 'false').lower() == 'true'
+    INGEST_FLUSH_ROWS = int(os.getenv('INGEST_FLUSH_ROWS', 500))
+    INGEST_FLUSH_INTERVAL_MS = int(os.getenv('INGEST_FLUSH_INTERVAL_MS', 200))
+    INGEST_QUEUE_SIZE = int(os.getenv('INGEST_QUEUE_SIZE', 20000))
+    INGEST_OVERFLOW = os.getenv('INGEST_OVERFLOW', 'block')  # block | sync | drop
+    INGEST_ENQUEUE_TIMEOUT_MS = int(os.getenv('INGEST_ENQUEUE_TIMEOUT_MS', 1000))
+    INGEST_DELIVERY = os.getenv('INGEST_DELIVERY', 'at_least_once')  # at_least_once | at_most_once
+    # Reintentos de un lote fallido con at_least_once antes de mandarlo al log de dead-letter
+    INGEST_MAX_RETRIES = int(os.getenv('INGEST_MAX_RETRIES', 5))
+    INGEST_SHUTDOWN_TIMEOUT = float(os.getenv('INGEST_SHUTDOWN_TIMEOUT', 10))
+    WATERING_COUNT_CACHE_SIZE = int(os.getenv('WATERING_COUNT_CACHE_SIZE', 10000))
+    WATERING_COUNT_CACHE_TTL = int(os.getenv('WATERING_COUNT_CACHE_TTL', 60))
+    # Pool de conexiones MySQL (database.py)
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 10))
+    DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 10))
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true'
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))
+    # Caché de sesiones validadas en authenticate (0 la desactiva)
+    SESSION_CACHE_TTL = int(os.getenv('SESSION_CACHE_TTL', 60))
+    SESSION_CACHE_SIZE = int(os.getenv('SESSION_CACHE_SIZE', 10000))
+    # Invalidación entre workers vía Redis pub/sub (opcional). Sin ella, una sesión
+    # cerrada sigue valiendo en los demás workers hasta SESSION_CACHE_TTL segundos
+    SESSION_CACHE_REDIS_URL = os.getenv('SESSION_CACHE_REDIS_URL', '')
+    # 'db' (consulta sessions en cada request) o 'stateless' (claims del JWT + sesiones revocadas).
+    # En modo db los logout no se registran en revoked_sessions: al pasar a stateless,
+    # las sesiones cerradas antes del cambio valen hasta que expire su JWT
+    AUTH_SESSION_MODE = os.getenv('AUTH_SESSION_MODE', 'db')
+    REVOCATION_SYNC_INTERVAL = int(os.getenv('REVOCATION_SYNC_INTERVAL', 30))
+    # Limpieza de sesiones expiradas (services/session_sweeper.py)
+    SESSION_SWEEPER = os.getenv('SESSION_SWEEPER', 'true').lower() == 'true'
+    SESSION_SWEEP_INTERVAL = int(os.getenv('SESSION_SWEEP_INTERVAL', 300))
+    SESSION_SWEEP_BATCH = int(os.getenv('SESSION_SWEEP_BATCH', 1000))
+    SESSION_SWEEP_PAUSE_MS = int(os.getenv('SESSION_SWEEP_PAUSE_MS', 50))
+    # GET /metrics: con METRICS_TOKEN exige la cabecera X-Metrics-Token; sin él
+    # solo responde a peticiones desde localhost
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+    # Logging (utils/log.py): DEBUG | INFO | WARNING | ERROR, formato text | json
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')
+    LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', 10000))
+    # Reconocimiento: local (modelo en este proceso) | remote (proxy a ml-service,
+    # sin cargar TensorFlow en backend-v2)
+    RECOGNITION_MODE = os.getenv('RECOGNITION_MODE', 'local')
+    ML_SERVICE_URL = os.getenv('ML_SERVICE_URL', 'http://ml-service:5000')
+    ML_SERVICE_CONNECT_TIMEOUT = float(os.getenv('ML_SERVICE_CONNECT_TIMEOUT', 1))
+    ML_SERVICE_READ_TIMEOUT = float(os.getenv('ML_SERVICE_READ_TIMEOUT', 30))
+    ML_SERVICE_POOL_SIZE = int(os.getenv('ML_SERVICE_POOL_SIZE', 10))
+    # Backend del modelo de reconocimiento: keras (por defecto) | tf_function | tflite | onnx
+    # (opcionales; tflite y onnx requieren scripts/convert_recognition_model.py)
+    RECOGNITION_BACKEND = os.getenv('RECOGNITION_BACKEND', 'keras')
+    RECOGNITION_NUM_THREADS = int(os.getenv('RECOGNITION_NUM_THREADS', 0)) or None
+    # Variante cuantizada (scripts/quantize_recognition_model.py): vacío = float32,
+    # tflite: dynamic | fp16 | int8, onnx: dynamic
+    RECOGNITION_VARIANT = os.getenv('RECOGNITION_VARIANT') or None
+    # Decode JPEG reducido (modo draft) antes del resize a 180x180: más rápido pero
+    # cambia ligeramente los píxeles, por eso es opcional
+    RECOGNITION_JPEG_DRAFT = os.getenv('RECOGNITION_JPEG_DRAFT', 'false').lower() == 'true'
+    # Caché de resultados de reconocimiento (RECOGNITION_CACHE_SIZE=0 la desactiva,
+    # RECOGNITION_CACHE_PATH = archivo SQLite para persistirla y compartirla entre workers)
+    RECOGNITION_CACHE_SIZE = int(os.getenv('RECOGNITION_CACHE_SIZE', 1000))
+    RECOGNITION_CACHE_TTL = int(os.getenv('RECOGNITION_CACHE_TTL', 86400))
+    RECOGNITION_CACHE_PERCEPTUAL = os.getenv('RECOGNITION_CACHE_PERCEPTUAL', 'false').lower() == 'true'
+    RECOGNITION_CACHE_PATH = os.getenv('RECOGNITION_CACHE_PATH') or None
+    # Modelos: carga diferida; MODEL_WARMUP los carga en segundo plano tras create_app
+    MODEL_WARMUP = os.getenv('MODEL_WARMUP', 'true').lower() == 'true'
+    MODEL_RETRY_INTERVAL = float(os.getenv('MODEL_RETRY_INTERVAL', 30))
     FLASK_PORT = int(os.getenv('FLASK_PORT', 5000))
     FLASK_HOST = os.getenv('FLASK_HOST', '0.0.0.0')
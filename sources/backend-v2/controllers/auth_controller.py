@@ -1,11 +1,15 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 from models.user_model import User
-from flask_mysqldb import MySQL
+from config import Config
+from services.session_cache import invalidate_session
+from services.revocation import revocation_store, token_fingerprint
+from utils.log import get_logger
 import secrets
 from datetime import datetime, timedelta
 
 auth_bp = Blueprint('auth', __name__)
+log = get_logger(__name__)
 
 @auth_bp.route('/login', methods=['POST'])
 def login():
@@ -13,34 +17,33 @@ def login():
     username = data.get('username')
     password = data.get('password')
     
-    print(f"\n🔐 Login attempt for username: {username}")
+    log.debug("🔐 Login attempt", username=username)
     
     if not username or not password:
-        print("❌ Missing username or password")
+        log.info("❌ Missing username or password")
         return jsonify({'msg': 'Username and password are required'}), 400
     
     user = User.find_by_username(username)
     if not user:
-        print(f"❌ User not found: {username}")
+        log.info("❌ User not found", username=username)
         return jsonify({'msg': 'Invalid credentials'}), 401
         
     if not User.verify_password(user[3], password):
-        print(f"❌ Invalid password for user: {username}")
+        log.warning("❌ Invalid password", username=username)
         return jsonify({'msg': 'Invalid credentials'}), 401
     
-    # Crear tokens
-    access_token = create_access_token(identity=user[0])
+    # Crear sesión y guardarla en base de datos
     session_token = secrets.token_urlsafe(32)
     expires_at = datetime.utcnow() + timedelta(hours=2)
+    session_id = User.create_session(user[0], session_token, expires_at)
     
-    print(f"✅ Tokens created for user_id: {user[0]}")
-    print(f"   - Access token length: {len(access_token)}")
-    print(f"   - Session token: {session_token[:20]}...")
-    print(f"   - Expires at: {expires_at.isoformat()}")
-    
-    # Guardar sesión en base de datos
-    User.create_session(user[0], session_token, expires_at)
-    print(f"✅ Session saved in database")
+    # El JWT lleva la sesión como claims para validarla sin base de datos
+    # en AUTH_SESSION_MODE=stateless
+    access_token = create_access_token(identity=user[0], additional_claims={
+        'sid': session_id,
+        'sth': token_fingerprint(session_token),
+        'sexp': int((expires_at - datetime(1970, 1, 1)).total_seconds())
+    })
     
     # Retornar datos completos del usuario
     response_data = {
@@ -51,7 +54,8 @@ def login():
         'username': user[1],
         'email': user[2]
     }
-    print(f"✅ Login successful for {username} (user_id: {user[0]})\n")
+    log.info("✅ Login successful", username=username, user_id=user[0], session_id=session_id,
+             expires_at=response_data['expires_at'])
     return jsonify(response_data), 200
 
 @auth_bp.route('/register', methods=['POST'])
@@ -78,5 +82,10 @@ def logout():
     user_id = get_jwt_identity()
     data = request.get_json()
     session_token = data.get('session_token')
-    User.delete_session(user_id, session_token)
+    # En modo db basta con borrar la sesión: revoked_sessions solo lo lee el modo stateless
+    stateless = Config.AUTH_SESSION_MODE == 'stateless'
+    session_id = User.revoke_session(user_id, session_token, record_revocation=stateless)
+    invalidate_session(user_id, session_token)
+    if stateless and session_id is not None:
+        revocation_store.revoke(session_id)
     return jsonify({'msg': 'Logged out'}), 200
@@ -1,27 +1,113 @@
 from flask import Blueprint, request, jsonify
 from models.plant_model import Plant
 from config import Config
-import joblib
-import pandas as pd
+from services.irrigation_model import load_irrigation_model
+from services.ingest_buffer import ingest_buffer
+from services.model_loader import LazyModel
+from utils import metrics
+from utils.log import get_logger
+import math
 import os
 
 iot_bp = Blueprint('iot', __name__)
+log = get_logger(__name__)
 
 # Token de autenticación para dispositivos IoT (puedes ponerlo en .env)
 IOT_API_KEY = Config.IOT_API_KEY if hasattr(Config, 'IOT_API_KEY') else 'your_iot_api_key_here'
 
-# Cargar modelo de ML para predicción de riego
+# Modelo de ML para predicción de riego (se carga en el primer uso o en el warm-up)
 MODEL_PATH = os.path.join(os.path.dirname(__file__), '..', 'modelo_riego_numerico.pkl')
-try:
-    modelo_riego = joblib.load(MODEL_PATH)
-    print(f"Modelo de riego cargado correctamente desde {MODEL_PATH}")
-except Exception as e:
-    print(f"ERROR: No se pudo cargar el modelo de riego: {e}")
-    modelo_riego = None
+LOOKUP_TABLE = {
+    'moisture_range': Config.IRRIGATION_LUT_MOISTURE_RANGE,
+    'moisture_step': Config.IRRIGATION_LUT_MOISTURE_STEP,
+    'temperature_range': Config.IRRIGATION_LUT_TEMPERATURE_RANGE,
+    'temperature_step': Config.IRRIGATION_LUT_TEMPERATURE_STEP,
+    'interpolate': Config.IRRIGATION_LUT_INTERPOLATE
+} if Config.IRRIGATION_LUT else None
+PREDICTION_CACHE = {
+    'maxsize': Config.IRRIGATION_CACHE_SIZE,
+    'moisture_step': Config.IRRIGATION_CACHE_MOISTURE_STEP,
+    'temperature_step': Config.IRRIGATION_CACHE_TEMPERATURE_STEP,
+    'check_interval': Config.IRRIGATION_CACHE_CHECK_INTERVAL
+} if Config.IRRIGATION_CACHE_SIZE > 0 else None
+
+def _load_irrigation_model():
+    model = load_irrigation_model(MODEL_PATH, backend=Config.IRRIGATION_MODEL_BACKEND,
+                                  lookup_table=LOOKUP_TABLE, cache=PREDICTION_CACHE)
+    log.info("Modelo de riego cargado correctamente", backend=model.backend, path=MODEL_PATH)
+    if hasattr(model, 'stats'):
+        log.info("Estado del modelo de riego", stats=model.stats())
+    return model
+
+def _irrigation_model_stats():
+    model = modelo_riego.peek()
+    return model.stats() if hasattr(model, 'stats') else modelo_riego.status()
+
+modelo_riego = LazyModel('irrigation', _load_irrigation_model,
+                         retry_interval=Config.MODEL_RETRY_INTERVAL, logger=log)
+metrics.register('irrigation_model', _irrigation_model_stats)
 
 # Umbral mínimo de riego (ml) - si el modelo predice menos, no se riega
 RIEGO_MINIMO = 50
 
+SENSOR_FIELDS = ['pot_label', 'temperature', 'humidity', 'moisture', 'light']
+NUMERIC_FIELDS = ['temperature', 'humidity', 'moisture', 'light']
+
+def _numeric(value):
+    """float finito a partir de un número o un string numérico; None si no lo es."""
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        return None
+    try:
+        number = float(value)
+    except ValueError:
+        return None
+    return number if math.isfinite(number) else None
+
+def _validate_reading(reading):
+    """
+    Devuelve (lectura normalizada, None) o (None, error) para una lectura del lote:
+    pot_label string o entero (se normaliza a string), campos de sensor numéricos y finitos.
+    """
+    if not isinstance(reading, dict) or not all(field in reading for field in SENSOR_FIELDS):
+        return None, {'error': 'Missing required fields'}
+    label = reading['pot_label']
+    invalid = [] if isinstance(label, (str, int)) and not isinstance(label, bool) else ['pot_label']
+    values = {field: _numeric(reading[field]) for field in NUMERIC_FIELDS}
+    invalid += [field for field, value in values.items() if value is None]
+    if invalid:
+        return None, {'error': 'Invalid field types', 'fields': invalid}
+    return dict(values, pot_label=str(label)), None
+
+def _predict_irrigation(rows):
+    """
+    Predice los ml de riego para una lista de tuplas (species_id, moisture, temperature)
+    con una sola llamada vectorizada al modelo.
+    """
+    # Columnas del modelo: [localname, moisture, temperature]
+    # localname es el species_id numérico
+    return modelo_riego.get().predict(rows)
+
+def _record_conditions(rows):
+    """
+    Persiste lecturas (plant_id, temperature, humidity, moisture, light).
+    Con INGEST_WRITE_BEHIND se encolan en el buffer y solo se escriben aquí las
+    que el buffer rechace por estar lleno.
+    Devuelve listas paralelas (states, condition_ids, sequence_ids) con state
+    'written', 'queued' o 'dropped' (INGEST_OVERFLOW=drop con la cola llena:
+    la lectura se perdió).
+    """
+    if not ingest_buffer.enabled:
+        return ['written'] * len(rows), Plant.create_ambiental_conditions(rows), [None] * len(rows)
+    submitted = ingest_buffer.submit(rows)
+    states = [state for state, _ in submitted]
+    condition_ids = [None] * len(rows)
+    sequence_ids = [sequence_id for _, sequence_id in submitted]
+    rejected = [i for i, state in enumerate(states) if state == 'rejected']
+    for i, condition_id in zip(rejected, Plant.create_ambiental_conditions([rows[i] for i in rejected])):
+        states[i] = 'written'
+        condition_ids[i] = condition_id
+    return states, condition_ids, sequence_ids
+
 @iot_bp.route('/sensor-data', methods=['POST'])
 def receive_sensor_data():
     """
@@ -36,8 +122,7 @@ def receive_sensor_data():
     data = request.get_json()
     
     # Validar campos requeridos
-    required_fields = ['pot_label', 'temperature', 'humidity', 'moisture', 'light']
-    if not all(field in data for field in required_fields):
+    if not all(field in data for field in SENSOR_FIELDS):
         return jsonify({'error': 'Missing required fields'}), 400
     
     pot_label = data['pot_label']
@@ -53,30 +138,25 @@ def receive_sensor_data():
         return jsonify({'error': 'Plant not found for this pot label'}), 404
     
     # Crear registro de condiciones ambientales
-    condition_id = Plant.create_ambiental_condition(
-        plant_info['plant_id'],
-        temperature,
-        humidity,
-        moisture,
-        light
-    )
+    states, condition_ids, sequence_ids = _record_conditions([
+        (plant_info['plant_id'], temperature, humidity, moisture, light)
+    ])
+    if states[0] == 'dropped':
+        return jsonify({
+            'error': 'Sensor data dropped',
+            'message': 'Ingest queue is full, retry later'
+        }), 503
+    condition_id = condition_ids[0]
     
     # ==== PREDICCIÓN DE RIEGO CON ML ====
     needs_watering = False
     water_amount = 0
     
-    if modelo_riego and plant_info['species_id']:
+    if plant_info['species_id'] and modelo_riego.get_or_none() is not None:
         try:
-            # Preparar datos para el modelo: [localname, moisture, temperature]
-            # localname es el species_id numérico
-            input_data = pd.DataFrame([[
-                plant_info['species_id'],
-                moisture,
-                temperature
-            ]], columns=['localname', 'moisture', 'temperature'])
-            
-            # Predecir cantidad de riego en ml
-            predicted_ml = modelo_riego.predict(input_data)[0]
+            predicted_ml = _predict_irrigation([
+                (plant_info['species_id'], moisture, temperature)
+            ])[0]
             
             # Determinar si necesita riego
             if predicted_ml >= RIEGO_MINIMO:
@@ -84,10 +164,10 @@ def receive_sensor_data():
                 water_amount = round(predicted_ml, 2)
             
         except Exception as e:
-            print(f"Error en predicción de riego: {e}")
+            log.exception("Error en predicción de riego", pot_label=pot_label)
             # Continuar sin predicción si hay error
     
-    return jsonify({
+    response = {
         'status': 'success',
         'message': 'Sensor data recorded',
         'condition_id': condition_id,
@@ -97,4 +177,137 @@ def receive_sensor_data():
             'water_amount_ml': water_amount,
             'species_name': plant_info.get('species_name', 'Unknown')
         }
+    }
+    if ingest_buffer.enabled:
+        # 'queued': la fila se escribirá en el próximo flush y condition_id aún no
+        # existe; 'written': el buffer estaba lleno y se escribió de forma síncrona
+        response['ingest'] = states[0]
+        response['sequence_id'] = sequence_ids[0]
+    return jsonify(response), 201
+
+@iot_bp.route('/sensor-data/batch', methods=['POST'])
+def receive_sensor_data_batch():
+    """
+    Endpoint para recibir un lote de lecturas (de uno o varios maceteros)
+    Requiere API Key en el header: X-IoT-API-Key
+    Body: {"readings": [{pot_label, temperature, humidity, moisture, light}, ...]}
+    Responde una decisión de riego por lectura, en el mismo orden de entrada.
+    """
+    api_key = request.headers.get('X-IoT-API-Key')
+    if api_key != IOT_API_KEY:
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    data = request.get_json(silent=True)
+    readings = data.get('readings') if isinstance(data, dict) else data
+    if not isinstance(readings, list) or not readings:
+        return jsonify({'error': 'Body must contain a non-empty readings list'}), 400
+    if len(readings) > Config.IOT_BATCH_MAX_READINGS:
+        return jsonify({
+            'error': 'Too many readings',
+            'max_readings': Config.IOT_BATCH_MAX_READINGS
+        }), 413
+    
+    results = [None] * len(readings)
+    valid = []
+    for index, reading in enumerate(readings):
+        normalized, error = _validate_reading(reading)
+        if error:
+            results[index] = {'index': index, 'status': 'error', **error}
+        else:
+            readings[index] = normalized
+            valid.append(index)
+    
+    # Resolver todos los maceteros con una sola consulta
+    plants = Plant.get_plants_by_pot_labels([readings[i]['pot_label'] for i in valid])
+    
+    to_insert = []
+    for index in valid:
+        if readings[index]['pot_label'] not in plants:
+            results[index] = {'index': index, 'status': 'error', 'error': 'Plant not found for this pot label'}
+        else:
+            to_insert.append(index)
+    
+    # Un INSERT multi-fila y un solo commit para todo el lote (o al buffer write-behind)
+    states, condition_ids, sequence_ids = _record_conditions([
+        (
+            plants[readings[i]['pot_label']]['plant_id'],
+            readings[i]['temperature'],
+            readings[i]['humidity'],
+            readings[i]['moisture'],
+            readings[i]['light']
+        )
+        for i in to_insert
+    ])
+    recorded = []
+    for index, state, condition_id, sequence_id in zip(to_insert, states, condition_ids, sequence_ids):
+        if state == 'dropped':
+            # Cola del buffer llena con INGEST_OVERFLOW=drop: la lectura no se guardó
+            results[index] = {
+                'index': index,
+                'status': 'error',
+                'error': 'Sensor data dropped, ingest queue is full',
+                'plant_id': plants[readings[index]['pot_label']]['plant_id']
+            }
+        else:
+            recorded.append((index, state, condition_id, sequence_id))
+    
+    # ==== PREDICCIÓN DE RIEGO CON ML (una sola llamada para todo el lote) ====
+    predictions = {}
+    prediction_error = None
+    to_predict = [i for i, _, _, _ in recorded if plants[readings[i]['pot_label']]['species_id']]
+    if to_predict and modelo_riego.get_or_none() is None:
+        prediction_error = 'Irrigation model not available'
+    elif to_predict:
+        try:
+            predicted = _predict_irrigation([
+                (
+                    plants[readings[i]['pot_label']]['species_id'],
+                    readings[i]['moisture'],
+                    readings[i]['temperature']
+                )
+                for i in to_predict
+            ])
+            predictions = dict(zip(to_predict, predicted))
+        except Exception as e:
+            log.exception("Error en predicción de riego por lotes", readings=len(to_predict))
+            prediction_error = 'Irrigation prediction failed'
+    
+    to_predict = set(to_predict)
+    for index, state, condition_id, sequence_id in recorded:
+        plant_info = plants[readings[index]['pot_label']]
+        if prediction_error and index in to_predict:
+            # La lectura se guardó, pero no hay decisión de riego: no se informa 0 ml
+            results[index] = {
+                'index': index,
+                'status': 'error',
+                'error': prediction_error,
+                'condition_id': condition_id,
+                'plant_id': plant_info['plant_id']
+            }
+            if ingest_buffer.enabled:
+                results[index].update(ingest=state, sequence_id=sequence_id)
+            continue
+        predicted_ml = float(predictions.get(index, 0))
+        needs_watering = predicted_ml >= RIEGO_MINIMO
+        results[index] = {
+            'index': index,
+            'status': 'success',
+            'condition_id': condition_id,
+            'plant_id': plant_info['plant_id'],
+            'irrigation': {
+                'needs_watering': needs_watering,
+                'water_amount_ml': round(predicted_ml, 2) if needs_watering else 0,
+                'species_name': plant_info.get('species_name', 'Unknown')
+            }
+        }
+        if ingest_buffer.enabled:
+            results[index].update(ingest=state, sequence_id=sequence_id)
+    
+    return jsonify({
+        'status': 'success',
+        'message': 'Sensor data batch recorded',
+        'received': len(readings),
+        'recorded': len(recorded),
+        'errors': sum(1 for result in results if result['status'] == 'error'),
+        'results': results
     }), 201
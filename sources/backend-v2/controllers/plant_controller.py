@@ -1,9 +1,11 @@
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import get_jwt_identity
 from middleware.auth_middleware import authenticate
-from models.plant_model import Plant
+from models.plant_model import Plant, decode_cursor
 plant_bp = Blueprint('plant', __name__)
 
+MAX_PER_PAGE = 100
+
 @plant_bp.route('/', methods=['GET'])
 @authenticate
 def get_plants():
@@ -12,13 +14,25 @@ def get_plants():
     return jsonify(result), 200
 
 # Endpoint para detalle de planta con historial de riego paginado
+# (?page=1&per_page=5; modo cursor opcional: ?cursor= para la primera página,
+# luego ?cursor=<next_cursor>, con &include_total=true si se quiere el total)
 @plant_bp.route('/<int:plant_id>', methods=['GET'])
 @authenticate
 def get_plant_detail(plant_id):
     user_id = get_jwt_identity()
-    page = int(request.args.get('page', 1))
-    per_page = int(request.args.get('per_page', 5))
-    detail = Plant.get_plant_detail(user_id, plant_id, page, per_page)
+    cursor = request.args.get('cursor')
+    try:
+        per_page = min(max(int(request.args.get('per_page', 5)), 1), MAX_PER_PAGE)
+        page = max(int(request.args.get('page', 1)), 1)
+        if cursor:
+            decode_cursor(cursor)
+    except ValueError:
+        return jsonify({'msg': 'Invalid pagination parameters'}), 400
+    detail = Plant.get_plant_detail(
+        user_id, plant_id, page, per_page,
+        cursor=cursor,
+        include_total=request.args.get('include_total', 'false').lower() == 'true'
+    )
     if not detail:
         return jsonify({'msg': 'Plant not found or not owned by user'}), 404
     return jsonify(detail), 200
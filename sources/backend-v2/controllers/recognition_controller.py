@@ -1,15 +1,19 @@
 from flask import Blueprint, request, jsonify
-import tensorflow as tf
+from config import Config
+from services.recognition_model import load_recognition_model
+from services.image_preprocessing import decode_image, normalize, batch_buffer
+from services.recognition_cache import RecognitionCache
+from services.model_loader import LazyModel
+from services.ml_client import MLServiceClient, MLServiceUnavailable
+from utils import metrics
 import numpy as np
-from PIL import Image
-import io
 import os
+from utils.log import get_logger
 
 recognition_bp = Blueprint('recognition', __name__)
+log = get_logger(__name__)
 
 # Configuración del modelo
-IMG_HEIGHT = 180
-IMG_WIDTH = 180
 MODEL_PATH = os.path.join(os.path.dirname(__file__), '..', 'model-recognition.h5')
 
 # Clases/etiquetas del modelo
@@ -18,18 +22,101 @@ CLASS_NAMES = [
     'oregano', 'orquidea', 'rosachina', 'tomatecherry'
 ]
 
-# Cargar el modelo al iniciar
-try:
-    modelo = tf.keras.models.load_model(MODEL_PATH)
-    print(f"Modelo de reconocimiento cargado correctamente desde {MODEL_PATH}")
-except Exception as e:
-    print(f"ERROR: No se pudo cargar el modelo de reconocimiento: {e}")
-    modelo = None
+# El modelo (y TensorFlow) se carga en el primer uso o en el warm-up, no al importar
+def _load_recognition_model():
+    model = load_recognition_model(MODEL_PATH, backend=Config.RECOGNITION_BACKEND,
+                                   num_threads=Config.RECOGNITION_NUM_THREADS,
+                                   variant=Config.RECOGNITION_VARIANT)
+    log.info("Modelo de reconocimiento cargado correctamente", backend=model.backend,
+             variant=Config.RECOGNITION_VARIANT, path=MODEL_PATH)
+    return model
+
+# RECOGNITION_MODE=remote: las imágenes se reenvían al ml-service (que tiene su
+# propia caché) y este proceso nunca carga el modelo ni TensorFlow
+REMOTE = Config.RECOGNITION_MODE == 'remote'
+modelo = recognition_cache = ml_client = None
+
+if REMOTE:
+    ml_client = MLServiceClient(Config.ML_SERVICE_URL,
+                                connect_timeout=Config.ML_SERVICE_CONNECT_TIMEOUT,
+                                read_timeout=Config.ML_SERVICE_READ_TIMEOUT,
+                                pool_size=Config.ML_SERVICE_POOL_SIZE)
+    metrics.register('ml_service', ml_client.stats)
+else:
+    modelo = LazyModel('recognition', _load_recognition_model,
+                       retry_interval=Config.MODEL_RETRY_INTERVAL, logger=log)
+
+    # Caché de resultados por hash del contenido (y opcionalmente dHash)
+    recognition_cache = RecognitionCache(
+        maxsize=Config.RECOGNITION_CACHE_SIZE,
+        ttl=Config.RECOGNITION_CACHE_TTL,
+        perceptual=Config.RECOGNITION_CACHE_PERCEPTUAL,
+        path=Config.RECOGNITION_CACHE_PATH,
+        namespace=f'{Config.RECOGNITION_BACKEND}:{Config.RECOGNITION_VARIANT}:{Config.RECOGNITION_JPEG_DRAFT}'
+    ) if Config.RECOGNITION_CACHE_SIZE > 0 else None
+    if recognition_cache is not None:
+        metrics.register('recognition_cache', recognition_cache.stats)
+
+def _predict_probabilities(model, image_bytes):
+    """Probabilidades del modelo para la imagen, desde la caché si ya se vio."""
+    key = phash = None
+    if recognition_cache is not None:
+        probabilities, key = recognition_cache.lookup(image_bytes)
+        if probabilities is not None:
+            return probabilities
+    
+    img = decode_image(image_bytes, draft=Config.RECOGNITION_JPEG_DRAFT)
+    if recognition_cache is not None:
+        probabilities, phash = recognition_cache.lookup_image(img)
+        if probabilities is not None:
+            recognition_cache.store(key, phash, probabilities)
+            return probabilities
+    
+    # Normalizar directamente en el lote del hilo y predecir
+    img_array = batch_buffer().batch(1)
+    normalize(np.asarray(img), out=img_array[0])
+    probabilities = model.predict(img_array)[0]
+    if recognition_cache is not None:
+        recognition_cache.store(key, phash, probabilities)
+    return probabilities
+
+def _recognize_remote():
+    """Reenvía el multipart al ml-service y traduce su respuesta al formato de /recognition/."""
+    if request.mimetype != 'multipart/form-data':
+        return jsonify({'error': 'No image file provided'}), 400
+    try:
+        # Sin tocar request.files: el cuerpo se reenvía por bloques tal cual llega
+        status, data = ml_client.forward('/predict/recognition', request.stream,
+                                         request.content_type, request.content_length)
+    except MLServiceUnavailable as e:
+        log.error("❌ ML Service no disponible", error=str(e))
+        return jsonify({'error': 'Recognition service unavailable'}), 503
+    data = data or {}
+    if status == 200:
+        return jsonify({
+            'plant_type': data['speciesName'],
+            'confidence': data['confidence'],
+            'all_probabilities': {
+                prediction['species']: prediction['confidence']
+                for prediction in data['allPredictions']
+            }
+        }), 200
+    if status < 500:
+        return jsonify({'error': data.get('error', f'ML Service returned {status}')}), status
+    if data.get('error') == 'Recognition model not loaded':
+        return jsonify({'error': 'Model not loaded'}), 500
+    if status == 503:
+        return jsonify({'error': data.get('error', 'Recognition service unavailable')}), 503
+    return jsonify({'error': f"Error processing image: {data.get('message', status)}"}), 500
 
 @recognition_bp.route('/', methods=['POST'])
 def recognize_plant():
     """Endpoint para reconocer el tipo de planta desde una imagen."""
-    if modelo is None:
+    if REMOTE:
+        return _recognize_remote()
+    
+    model = modelo.get_or_none()
+    if model is None:
         return jsonify({'error': 'Model not loaded'}), 500
     
     # Verificar que se envió un archivo
@@ -44,23 +131,9 @@ def recognize_plant():
     try:
         # Leer la imagen desde el archivo
         image_bytes = file.read()
-        img = Image.open(io.BytesIO(image_bytes))
-        
-        # Convertir a RGB si es necesario
-        if img.mode != 'RGB':
-            img = img.convert('RGB')
-        
-        # Redimensionar
-        img = img.resize((IMG_WIDTH, IMG_HEIGHT))
-        
-        # Convertir a array y normalizar
-        img_array = np.array(img)
-        img_array = np.expand_dims(img_array, 0)  # Agregar dimensión de batch
-        img_array = img_array / 255.0  # Normalizar
         
         # Realizar predicción
-        predicciones = modelo.predict(img_array)
-        probabilities = predicciones[0]
+        probabilities = _predict_probabilities(model, image_bytes)
         indice = np.argmax(probabilities)
         confianza = float(np.max(probabilities) * 100)
         
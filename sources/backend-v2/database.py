@@ -0,0 +1,177 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from flask import g
+
+class PoolTimeout(Exception):
+    """No se liberó ninguna conexión del pool dentro de DB_POOL_TIMEOUT."""
+
+class ConnectionPool:
+    """
+    Pool de conexiones MySQLdb compartido por todos los hilos del proceso.
+
+    Las conexiones se abren bajo demanda hasta size. Al sacarlas se descartan
+    las que superan recycle segundos de vida y, con pre_ping, se comprueban con
+    ping() y se reabren si el servidor las cerró. Al devolverlas se hace
+    rollback para no arrastrar transacciones (ni snapshots) entre requests.
+    """
+
+    def __init__(self, connect_kwargs, size=10, timeout=10.0, pre_ping=True, recycle=1800):
+        self.connect_kwargs = connect_kwargs
+        self.size = size
+        self.timeout = timeout
+        self.pre_ping = pre_ping
+        self.recycle = recycle
+        self._idle = deque()
+        self._created_at = {}
+        self._cond = threading.Condition()
+        self._opened = 0
+        self.in_use = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.reconnects = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _connect(self):
+        # Import diferido: crear la app (scripts, tests, arranque) no necesita el driver
+        import MySQLdb
+        conn = MySQLdb.connect(**self.connect_kwargs)
+        self._created_at[id(conn)] = time.monotonic()
+        return conn
+
+    def _discard(self, conn):
+        self._created_at.pop(id(conn), None)
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _validate(self, conn):
+        """Devuelve una conexión usable: la misma o una nueva si caducó o no responde."""
+        if self.recycle and time.monotonic() - self._created_at.get(id(conn), 0) > self.recycle:
+            self._discard(conn)
+            self.reconnects += 1
+            return self._connect()
+        if self.pre_ping:
+            import MySQLdb
+            try:
+                conn.ping()
+            except MySQLdb.Error:
+                self._discard(conn)
+                self.reconnects += 1
+                return self._connect()
+        return conn
+
+    def checkout(self):
+        start = time.perf_counter()
+        deadline = time.monotonic() + self.timeout
+        with self._cond:
+            while True:
+                if self._idle:
+                    conn = self._idle.pop()
+                    break
+                if self._opened < self.size:
+                    self._opened += 1
+                    conn = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise PoolTimeout(f'No database connection available after {self.timeout}s')
+                self._cond.wait(remaining)
+            self.in_use += 1
+            waited = time.perf_counter() - start
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+        try:
+            return self._connect() if conn is None else self._validate(conn)
+        except Exception:
+            with self._cond:
+                self._opened -= 1
+                self.in_use -= 1
+                self._cond.notify()
+            raise
+
+    def checkin(self, conn):
+        try:
+            conn.rollback()
+            healthy = True
+        except Exception:
+            healthy = False
+        with self._cond:
+            self.in_use -= 1
+            if healthy:
+                self._idle.append(conn)
+            else:
+                self._opened -= 1
+                self._discard(conn)
+            self._cond.notify()
+
+    def stats(self):
+        with self._cond:
+            return {
+                'size': self.size,
+                'open': self._opened,
+                'in_use': self.in_use,
+                'idle': len(self._idle),
+                'utilization': round(self.in_use / self.size, 4) if self.size else 0.0,
+                'checkouts': self.checkouts,
+                'wait_ms_avg': round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                'wait_ms_max': round(self.wait_max * 1000, 3),
+                'timeouts': self.timeouts,
+                'reconnects': self.reconnects
+            }
+
+class Database:
+    """
+    Acceso a MySQL para modelos y middleware: db.connection devuelve la conexión
+    del request actual (una por contexto de aplicación, sacada del pool la primera
+    vez que se usa y devuelta en teardown_appcontext).
+    Para hilos de fondo sin request: with db.checkout() as conn.
+    """
+
+    def __init__(self):
+        self.pool = None
+
+    def init_app(self, app):
+        config = app.config
+        self.pool = ConnectionPool(
+            {
+                'host': config['MYSQL_HOST'],
+                'port': config['MYSQL_PORT'],
+                'user': config['MYSQL_USER'],
+                'passwd': config['MYSQL_PASSWORD'],
+                'db': config['MYSQL_DB'],
+                'charset': 'utf8'
+            },
+            size=config['DB_POOL_SIZE'],
+            timeout=config['DB_POOL_TIMEOUT'],
+            pre_ping=config['DB_POOL_PRE_PING'],
+            recycle=config['DB_POOL_RECYCLE']
+        )
+        app.teardown_appcontext(self._release)
+
+    @property
+    def connection(self):
+        conn = g.get('_db_connection')
+        if conn is None:
+            conn = g._db_connection = self.pool.checkout()
+        return conn
+
+    def _release(self, exception=None):
+        conn = g.pop('_db_connection', None)
+        if conn is not None:
+            self.pool.checkin(conn)
+
+    @contextmanager
+    def checkout(self):
+        conn = self.pool.checkout()
+        try:
+            yield conn
+        finally:
+            self.pool.checkin(conn)
+
+db = Database()
@@ -17,7 +17,16 @@ CREATE TABLE sessions (
     session_token VARCHAR(255) NOT NULL UNIQUE,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     expires_at TIMESTAMP NOT NULL,
-    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    INDEX idx_sessions_user_token (user_id, session_token),
+    INDEX idx_sessions_expires (expires_at)
+);
+
+CREATE TABLE revoked_sessions (
+    session_id INT PRIMARY KEY,
+    expires_at TIMESTAMP NOT NULL,
+    revoked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_revoked_sessions_expires (expires_at)
 );
 
 CREATE TABLE pots (
@@ -65,13 +74,39 @@ CREATE TABLE ambiental_conditions (
     moisture_percent FLOAT,
     light_lux FLOAT,
     recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (plant_id) REFERENCES plants(id) ON DELETE CASCADE,
+    INDEX idx_ambiental_conditions_plant_recorded (plant_id, recorded_at, id)
+);
+
+CREATE TABLE plant_latest_conditions (
+    plant_id INT PRIMARY KEY,
+    ambiental_conditions_id INT NOT NULL,
+    temperature_celsius FLOAT,
+    humidity_percent FLOAT,
+    moisture_percent FLOAT,
+    light_lux FLOAT,
+    recorded_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (plant_id) REFERENCES plants(id) ON DELETE CASCADE
 );
 
 CREATE TABLE watering_logs (
     id INT AUTO_INCREMENT PRIMARY KEY,
     ambiental_conditions_id INT NOT NULL,
-    watered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    plant_id INT NOT NULL DEFAULT 0,
+    watered_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     amount_ml INT NOT NULL,
-    FOREIGN KEY (ambiental_conditions_id) REFERENCES ambiental_conditions(id) ON DELETE CASCADE
-);
\ No newline at end of file
+    FOREIGN KEY (ambiental_conditions_id) REFERENCES ambiental_conditions(id) ON DELETE CASCADE,
+    FOREIGN KEY (plant_id) REFERENCES plants(id) ON DELETE CASCADE,
+    INDEX idx_watering_logs_plant_history (plant_id, watered_at, id, amount_ml, ambiental_conditions_id)
+);
+
+DELIMITER //
+CREATE TRIGGER trg_watering_logs_plant_id
+BEFORE INSERT ON watering_logs
+FOR EACH ROW
+BEGIN
+    IF NEW.plant_id IS NULL OR NEW.plant_id = 0 THEN
+        SET NEW.plant_id = (SELECT plant_id FROM ambiental_conditions WHERE id = NEW.ambiental_conditions_id);
+    END IF;
+END//
+DELIMITER ;
\ No newline at end of file
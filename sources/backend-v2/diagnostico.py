@@ -100,9 +100,9 @@ def check_flask_dependencies():
     dependencies = [
         'flask',
         'flask_jwt_extended',
-        'flask_mysqldb',
+        'MySQLdb',  # mysqlclient, usado por database.py
         'flask_cors',
-        'python-dotenv'
+        'dotenv'  # python-dotenv
     ]
     
     for dep in dependencies:
@@ -0,0 +1,53 @@
+"""
+Configuración de gunicorn para backend-v2 (prefork con modelos compartidos).
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+- preload_app: el master importa la app y carga los modelos de PRELOAD_MODELS
+  antes de hacer fork; los workers los heredan copy-on-write. El modelo de riego
+  se lee con joblib mmap_mode='r' (modelo_riego_numerico.compiled.joblib), así
+  que sus arrays son páginas del archivo compartidas por todos los workers.
+- El modelo de reconocimiento (TensorFlow/TFLite/ONNX Runtime) no es seguro
+  tras fork: se carga en cada worker (MODEL_WARMUP) y por eso no está en
+  PRELOAD_MODELS por defecto.
+- Hilos de fondo (write-behind, sweeper, invalidación de sesiones) y conexiones
+  a MySQL se crean en cada worker, nunca en el master.
+- Recarga sin cortar requests: kill -HUP <master> (workers nuevos con la
+  configuración releída; con preload el código no se recarga) o kill -USR2
+  <master> seguido de kill -QUIT al master viejo para desplegar código nuevo.
+
+Memoria por worker: python scripts/measure_worker_memory.py <pid del master>.
+"""
+import gc
+import os
+import multiprocessing
+
+bind = os.getenv('GUNICORN_BIND', f"0.0.0.0:{os.getenv('FLASK_PORT', 5000)}")
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+# Reciclar workers de vez en cuando acota el crecimiento de memoria (0 = nunca)
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 10000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 1000))
+preload_app = True
+PRELOAD_MODELS = [name for name in os.getenv('PRELOAD_MODELS', 'irrigation').split(',') if name]
+
+# wsgi.py crea la app sin hilos de fondo; los arranca post_fork en cada worker
+os.environ['GUNICORN_PRELOAD'] = '1'
+
+def when_ready(server):
+    from services import model_loader
+    for name in PRELOAD_MODELS:
+        model = model_loader.get_model(name)
+        model.warm_up(background=False)
+        server.log.info(f'📦 Modelo {name} precargado en el master: {model.state}')
+    # Lo cargado hasta aquí no lo vuelve a tocar el GC en los workers (menos copy-on-write)
+    gc.collect()
+    gc.freeze()
+
+def post_fork(server, worker):
+    from app import start_background_services
+    start_background_services(server.app.wsgi())
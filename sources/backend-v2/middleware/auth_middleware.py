@@ -1,8 +1,15 @@
 from flask import request, jsonify
-from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
-from flask_mysqldb import MySQL
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity, get_jwt
+from database import db
+from services.session_cache import get_cached_session, cache_session
+from services.revocation import revocation_store, token_fingerprint
+from config import Config
+from utils.log import get_logger
 from functools import wraps
 from datetime import datetime
+import time
+
+log = get_logger(__name__)
 
 def authenticate(f):
     @wraps(f)
@@ -10,8 +17,7 @@ def authenticate(f):
         try:
             verify_jwt_in_request()
         except Exception as e:
-            error_msg = str(e)
-            print(f"❌ JWT verification failed: {error_msg}")
+            log.info("❌ JWT verification failed", error=str(e))
             return jsonify({
                 'msg': 'Invalid or expired token',
                 'error': 'token_invalid',
@@ -19,23 +25,33 @@ def authenticate(f):
             }), 401
             
         user_id = get_jwt_identity()
-        print(f"✅ JWT valid for user_id: {user_id}")
+        log.debug("✅ JWT valid", user_id=user_id)
         
         session_token = request.headers.get('X-Session-Token')
         if not session_token:
-            print("❌ Missing X-Session-Token header")
+            log.info("❌ Missing X-Session-Token header", user_id=user_id)
             return jsonify({
                 'msg': 'Session token required',
                 'error': 'session_token_missing'
             }), 401
             
-        cur = MySQL().connection.cursor()
-        cur.execute("SELECT expires_at FROM sessions WHERE user_id = %s AND session_token = %s", (user_id, session_token))
-        session = cur.fetchone()
-        cur.close()
+        if Config.AUTH_SESSION_MODE == 'stateless':
+            return _authenticate_stateless(f, session_token, *args, **kwargs)
+            
+        # Sesiones ya validadas se sirven desde caché (acotada por su expires_at)
+        expires_at = get_cached_session(user_id, session_token)
+        if expires_at is not None:
+            session = (expires_at,)
+        else:
+            cur = db.connection.cursor()
+            cur.execute("SELECT expires_at FROM sessions WHERE user_id = %s AND session_token = %s", (user_id, session_token))
+            session = cur.fetchone()
+            cur.close()
+            if session:
+                cache_session(user_id, session_token, session[0])
         
         if not session:
-            print(f"❌ Session not found in DB for user {user_id}")
+            log.info("❌ Session not found in DB", user_id=user_id)
             return jsonify({
                 'msg': 'Session not found',
                 'error': 'session_not_found',
@@ -43,13 +59,46 @@ def authenticate(f):
             }), 401
             
         if session[0] < datetime.utcnow():
-            print(f"❌ Session expired at {session[0]}")
+            log.info("❌ Session expired", user_id=user_id, expires_at=session[0])
             return jsonify({
                 'msg': 'Session expired',
                 'error': 'session_expired',
                 'details': 'Please login again'
             }), 401
             
-        print(f"✅ Authentication successful for user {user_id}")
+        log.debug("✅ Authentication successful", user_id=user_id)
         return f(*args, **kwargs)
     return decorated_function
+
+def _authenticate_stateless(f, session_token, *args, **kwargs):
+    """
+    Validación sin base de datos (AUTH_SESSION_MODE=stateless): la sesión viaja
+    en los claims del JWT (sid, sth, sexp) y solo se consulta el conjunto de
+    sesiones revocadas en memoria.
+    """
+    claims = get_jwt()
+    if 'sid' not in claims or claims.get('sth') != token_fingerprint(session_token):
+        log.info("❌ Session claims missing or not matching", user_id=claims.get('sub'))
+        return jsonify({
+            'msg': 'Session not found',
+            'error': 'session_not_found',
+            'details': 'Please login again'
+        }), 401
+        
+    if revocation_store.is_revoked(claims['sid']):
+        log.info("❌ Session revoked", session_id=claims['sid'])
+        return jsonify({
+            'msg': 'Session revoked',
+            'error': 'session_revoked',
+            'details': 'Please login again'
+        }), 401
+        
+    if claims['sexp'] < time.time():
+        log.info("❌ Session expired", session_id=claims['sid'], expires_at=claims['sexp'])
+        return jsonify({
+            'msg': 'Session expired',
+            'error': 'session_expired',
+            'details': 'Please login again'
+        }), 401
+        
+    return f(*args, **kwargs)
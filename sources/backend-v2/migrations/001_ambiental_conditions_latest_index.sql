@@ -0,0 +1,6 @@
+-- Índice para resolver "la última condición de una planta" sin ordenar el historial
+-- (GET /plants y GET /plants/<id>)
+USE potia;
+
+CREATE INDEX idx_ambiental_conditions_plant_recorded
+    ON ambiental_conditions (plant_id, recorded_at, id);
@@ -0,0 +1,15 @@
+-- Última lectura de cada planta, mantenida por la ingesta en la misma transacción
+-- que el INSERT en ambiental_conditions. Rellenar después con
+-- scripts/backfill_latest_conditions.py
+USE potia;
+
+CREATE TABLE plant_latest_conditions (
+    plant_id INT PRIMARY KEY,
+    ambiental_conditions_id INT NOT NULL,
+    temperature_celsius FLOAT,
+    humidity_percent FLOAT,
+    moisture_percent FLOAT,
+    light_lux FLOAT,
+    recorded_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (plant_id) REFERENCES plants(id) ON DELETE CASCADE
+);
@@ -0,0 +1,29 @@
+-- Historial de riego paginado por clave (watered_at, id) sin JOIN para filtrar/ordenar.
+-- watering_logs guarda plant_id desnormalizado; un trigger lo rellena desde
+-- ambiental_conditions para cualquier escritor que no lo indique (DEFAULT 0).
+USE potia;
+
+ALTER TABLE watering_logs ADD COLUMN plant_id INT NULL AFTER ambiental_conditions_id;
+
+UPDATE watering_logs wl
+JOIN ambiental_conditions ac ON wl.ambiental_conditions_id = ac.id
+SET wl.plant_id = ac.plant_id,
+    wl.watered_at = COALESCE(wl.watered_at, ac.recorded_at);
+
+-- Índice cubriente: filtro, orden y columnas propias de la consulta del historial
+ALTER TABLE watering_logs
+    MODIFY plant_id INT NOT NULL DEFAULT 0,
+    MODIFY watered_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    ADD CONSTRAINT fk_watering_logs_plant FOREIGN KEY (plant_id) REFERENCES plants(id) ON DELETE CASCADE,
+    ADD INDEX idx_watering_logs_plant_history (plant_id, watered_at, id, amount_ml, ambiental_conditions_id);
+
+DELIMITER //
+CREATE TRIGGER trg_watering_logs_plant_id
+BEFORE INSERT ON watering_logs
+FOR EACH ROW
+BEGIN
+    IF NEW.plant_id IS NULL OR NEW.plant_id = 0 THEN
+        SET NEW.plant_id = (SELECT plant_id FROM ambiental_conditions WHERE id = NEW.ambiental_conditions_id);
+    END IF;
+END//
+DELIMITER ;
@@ -0,0 +1,10 @@
+-- Sesiones revocadas por logout, para AUTH_SESSION_MODE=stateless.
+-- Las filas dejan de importar al pasar expires_at (el JWT ya no es válido).
+USE potia;
+
+CREATE TABLE revoked_sessions (
+    session_id INT PRIMARY KEY,
+    expires_at TIMESTAMP NOT NULL,
+    revoked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_revoked_sessions_expires (expires_at)
+);
@@ -0,0 +1,24 @@
+-- Índices de sessions: búsqueda de authenticate por (user_id, session_token) y
+-- borrado por lotes de expiradas (services/session_sweeper.py).
+-- Idempotente: solo crea los índices que falten.
+USE potia;
+
+DELIMITER //
+CREATE PROCEDURE potai_ensure_index(IN p_table VARCHAR(64), IN p_index VARCHAR(64), IN p_columns VARCHAR(255))
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = p_table AND INDEX_NAME = p_index
+    ) THEN
+        SET @ddl = CONCAT('CREATE INDEX ', p_index, ' ON ', p_table, ' (', p_columns, ')');
+        PREPARE stmt FROM @ddl;
+        EXECUTE stmt;
+        DEALLOCATE PREPARE stmt;
+    END IF;
+END//
+DELIMITER ;
+
+CALL potai_ensure_index('sessions', 'idx_sessions_user_token', 'user_id, session_token');
+CALL potai_ensure_index('sessions', 'idx_sessions_expires', 'expires_at');
+
+DROP PROCEDURE potai_ensure_index;
@@ -1,10 +1,50 @@
-from flask_mysqldb import MySQL
+from database import db
+from config import Config
+from datetime import datetime
+import base64
+from utils.cache import TTLCache
+from utils import metrics
+
+# Caché pot_label -> {plant_id, user_id, species_id, species_name} para la ingesta IoT.
+# El mapeo casi nunca cambia; create_pot y create_plant (los únicos caminos que
+# escriben pots/plants) lo invalidan. La caché es por proceso: con varios workers
+# los demás ven el cambio al expirar POT_LABEL_CACHE_TTL
+pot_label_cache = TTLCache(maxsize=Config.POT_LABEL_CACHE_SIZE, ttl=Config.POT_LABEL_CACHE_TTL)
+metrics.register('pot_label_cache', pot_label_cache.stats)
+
+def pot_label_key(label):
+    """
+    Clave de un label de macetero: compara como MySQL con la collation de la tabla
+    (sin distinguir mayúsculas ni espacios finales). 5, '5', 'M1 ' y 'm1' caen en
+    la misma entrada de caché que el label guardado, e invalidate_pot_label la borra.
+    """
+    return str(label).rstrip(' ').lower()
+
+# Total de riegos por planta en modo cursor con include_total. No se invalida al
+# escribir en watering_logs: puede ir hasta WATERING_COUNT_CACHE_TTL por detrás.
+# La paginación por página calcula el total exacto en cada request
+watering_count_cache = TTLCache(maxsize=Config.WATERING_COUNT_CACHE_SIZE, ttl=Config.WATERING_COUNT_CACHE_TTL)
+metrics.register('watering_count_cache', watering_count_cache.stats)
+
+def encode_cursor(watered_at, log_id):
+    """Cursor opaco de paginación por clave (watered_at, id)"""
+    raw = f'{watered_at.isoformat()}|{log_id}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """Inversa de encode_cursor; lanza ValueError si el cursor no es válido"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        watered_at, log_id = raw.split('|')
+        return datetime.fromisoformat(watered_at), int(log_id)
+    except Exception:
+        raise ValueError('Invalid cursor')
 
 class Plant:
     @staticmethod
     def get_pot_by_label(user_id, label):
         """Busca un pot por label y user_id"""
-        cur = MySQL().connection.cursor()
+        cur = db.connection.cursor()
         cur.execute("SELECT id FROM pots WHERE user_id = %s AND label = %s LIMIT 1", (user_id, label))
         row = cur.fetchone()
         cur.close()
@@ -12,11 +52,12 @@ class Plant:
 
     @staticmethod
     def create_pot(user_id, label):
-        cur = MySQL().connection.cursor()
+        cur = db.connection.cursor()
         cur.execute("INSERT INTO pots (user_id, label) VALUES (%s, %s)", (user_id, label))
         pot_id = cur.lastrowid
-        MySQL().connection.commit()
+        db.connection.commit()
         cur.close()
+        Plant.invalidate_pot_label(label)
         return pot_id
     
     @staticmethod
@@ -32,7 +73,7 @@ class Plant:
     @staticmethod
     def get_species_id_by_name(species_name):
         """Busca una especie por nombre común o científico (case-insensitive)"""
-        cur = MySQL().connection.cursor()
+        cur = db.connection.cursor()
         cur.execute("""
             SELECT id FROM species 
             WHERE LOWER(common_name) = LOWER(%s) 
@@ -45,44 +86,61 @@ class Plant:
 
     @staticmethod
     def create_plant(user_id, pot_id, name, image_url, species_id):
-        cur = MySQL().connection.cursor()
+        cur = db.connection.cursor()
         cur.execute("INSERT INTO plants (user_id, pot_id, name, image_url, species_id) VALUES (%s, %s, %s, %s, %s)",
                     (user_id, pot_id, name, image_url, species_id))
         plant_id = cur.lastrowid
-        MySQL().connection.commit()
+        db.connection.commit()
+        # El ESP32 de este macetero debe resolver la planta en su próxima lectura
+        cur.execute("SELECT label FROM pots WHERE id = %s", (pot_id,))
+        row = cur.fetchone()
         cur.close()
+        if row:
+            Plant.invalidate_pot_label(row[0])
         return plant_id
 
     @staticmethod
     def get_user_plants_with_conditions(user_id):
-        cur = MySQL().connection.cursor()
-        cur.execute("SELECT id, name, species_id, pot_id, image_url FROM plants WHERE user_id = %s", (user_id,))
+        cur = db.connection.cursor()
+        # Una sola consulta: la última condición de cada planta se mantiene en
+        # plant_latest_conditions desde la ingesta
+        cur.execute("""
+            SELECT p.id, p.name, p.species_id, p.pot_id, p.image_url,
+                   lc.temperature_celsius, lc.humidity_percent, lc.moisture_percent, lc.light_lux, lc.recorded_at
+            FROM plants p
+            LEFT JOIN plant_latest_conditions lc ON lc.plant_id = p.id
+            WHERE p.user_id = %s
+        """, (user_id,))
         plants = cur.fetchall()
-        result = []
-        for plant in plants:
-            plant_id = plant[0]
-            cur.execute("SELECT temperature_celsius, humidity_percent, moisture_percent, light_lux, recorded_at FROM ambiental_conditions WHERE plant_id = %s ORDER BY recorded_at DESC LIMIT 1", (plant_id,))
-            cond = cur.fetchone()
-            result.append({
+        cur.close()
+        return [
+            {
                 'id': plant[0],
                 'name': plant[1],
                 'species_id': plant[2],
                 'pot_id': plant[3],
                 'image_url': plant[4],
                 'last_conditions': {
-                    'temperature_celsius': cond[0] if cond else None,
-                    'humidity_percent': cond[1] if cond else None,
-                    'moisture_percent': cond[2] if cond else None,
-                    'light_lux': cond[3] if cond else None,
-                    'recorded_at': cond[4].isoformat() if cond else None
+                    'temperature_celsius': plant[5],
+                    'humidity_percent': plant[6],
+                    'moisture_percent': plant[7],
+                    'light_lux': plant[8],
+                    'recorded_at': plant[9].isoformat() if plant[9] else None
                 }
-            })
-        cur.close()
-        return result
+            } for plant in plants
+        ]
 
     @staticmethod
-    def get_plant_detail(user_id, plant_id, page=1, per_page=5):
-        cur = MySQL().connection.cursor()
+    def get_plant_detail(user_id, plant_id, page=1, per_page=5, cursor=None, include_total=False):
+        """
+        Detalle de planta con historial de riego paginado.
+        Sin cursor: paginación por página (OFFSET) con page, total y pages, como siempre.
+        cursor: modo opcional por clave (watered_at, id); '' pide la primera página
+        y cada respuesta trae next_cursor. No calcula el total salvo con include_total.
+        include_total: total de riegos en modo cursor (cacheado WATERING_COUNT_CACHE_TTL,
+        aproximado); en modo página el total es siempre exacto.
+        """
+        cur = db.connection.cursor()
         # Verificar que la planta pertenece al usuario
         cur.execute("SELECT id, name, species_id, pot_id, image_url, notes, planted_at FROM plants WHERE id = %s AND user_id = %s", (plant_id, user_id))
         plant = cur.fetchone()
@@ -90,26 +148,52 @@ class Plant:
             cur.close()
             return None
         # Condiciones ambientales actuales
-        cur.execute("SELECT temperature_celsius, humidity_percent, moisture_percent, light_lux, recorded_at FROM ambiental_conditions WHERE plant_id = %s ORDER BY recorded_at DESC LIMIT 1", (plant_id,))
+        cur.execute("SELECT temperature_celsius, humidity_percent, moisture_percent, light_lux, recorded_at FROM plant_latest_conditions WHERE plant_id = %s", (plant_id,))
         cond = cur.fetchone()
-        # Historial de riego paginado
-        offset = (page - 1) * per_page
-        cur.execute("""
+        # Historial de riego: se recorre idx_watering_logs_plant_history y se pide
+        # una fila de más para saber si hay página siguiente
+        history_sql = """
             SELECT wl.id, wl.watered_at, wl.amount_ml, ac.temperature_celsius, ac.humidity_percent, ac.moisture_percent, ac.light_lux, ac.recorded_at
             FROM watering_logs wl
             JOIN ambiental_conditions ac ON wl.ambiental_conditions_id = ac.id
-            WHERE ac.plant_id = %s
-            ORDER BY wl.watered_at DESC
-            LIMIT %s OFFSET %s
-        """, (plant_id, per_page, offset))
+            WHERE wl.plant_id = %s {after}
+            ORDER BY wl.watered_at DESC, wl.id DESC
+            LIMIT %s {offset}
+        """
+        if cursor:
+            watered_at, log_id = decode_cursor(cursor)
+            cur.execute(history_sql.format(
+                after='AND (wl.watered_at < %s OR (wl.watered_at = %s AND wl.id < %s))', offset=''
+            ), (plant_id, watered_at, watered_at, log_id, per_page + 1))
+        elif cursor is not None:
+            cur.execute(history_sql.format(after='', offset=''), (plant_id, per_page + 1))
+        else:
+            cur.execute(history_sql.format(after='', offset='OFFSET %s'),
+                        (plant_id, per_page + 1, (page - 1) * per_page))
         watering_history = cur.fetchall()
-        # Total de registros para paginación
-        cur.execute("""
-            SELECT COUNT(*) FROM watering_logs wl
-            JOIN ambiental_conditions ac ON wl.ambiental_conditions_id = ac.id
-            WHERE ac.plant_id = %s
-        """, (plant_id,))
-        total = cur.fetchone()[0]
+        has_more = len(watering_history) > per_page
+        watering_history = watering_history[:per_page]
+
+        pagination = {
+            'per_page': per_page,
+            'has_more': has_more,
+            'next_cursor': encode_cursor(watering_history[-1][1], watering_history[-1][0]) if has_more else None
+        }
+        if cursor is None:
+            pagination['page'] = page
+        if cursor is None:
+            # total y pages deben cuadrar con has_more: COUNT exacto, sin caché
+            cur.execute("SELECT COUNT(*) FROM watering_logs WHERE plant_id = %s", (plant_id,))
+            total = cur.fetchone()[0]
+            pagination['total'] = total
+            pagination['pages'] = (total + per_page - 1) // per_page
+        elif include_total:
+            total = watering_count_cache.get(plant_id)
+            if total is None:
+                cur.execute("SELECT COUNT(*) FROM watering_logs WHERE plant_id = %s", (plant_id,))
+                total = cur.fetchone()[0]
+                watering_count_cache.set(plant_id, total)
+            pagination['total'] = total
         cur.close()
         return {
             'id': plant[0],
@@ -138,47 +222,162 @@ class Plant:
                     'recorded_at': wh[7].isoformat() if wh[7] else None
                 } for wh in watering_history
             ],
-            'pagination': {
-                'page': page,
-                'per_page': per_page,
-                'total': total,
-                'pages': (total + per_page - 1) // per_page
-            }
+            'pagination': pagination
         }
 
     @staticmethod
     def get_plant_by_pot_label(pot_label):
         """Obtener planta por el label del macetero (para ESP32)"""
-        cur = MySQL().connection.cursor()
+        key = pot_label_key(pot_label)
+        cached = pot_label_cache.get(key)
+        if cached is not None:
+            return cached
+        cur = db.connection.cursor()
         cur.execute("""
             SELECT p.id, p.user_id, p.species_id, s.common_name
             FROM plants p
             JOIN pots pot ON p.pot_id = pot.id
             LEFT JOIN species s ON p.species_id = s.id
             WHERE pot.label = %s
+            ORDER BY p.id
             LIMIT 1
-        """, (pot_label,))
+        """, (str(pot_label),))
         result = cur.fetchone()
         cur.close()
         if result:
-            return {
+            plant_info = {
                 'plant_id': result[0], 
                 'user_id': result[1],
                 'species_id': result[2],
                 'species_name': result[3]
             }
+            pot_label_cache.set(key, plant_info)
+            return plant_info
         return None
 
+    @staticmethod
+    def get_plants_by_pot_labels(pot_labels):
+        """
+        Obtener plantas para varios labels de macetero en una sola consulta (ingesta por lotes).
+        El resultado va indexado por los labels tal como se pidieron, no por el
+        valor guardado en la base de datos (que puede diferir en mayúsculas o espacios).
+        """
+        result = {}
+        missing = {}
+        for label in dict.fromkeys(pot_labels):
+            key = pot_label_key(label)
+            cached = pot_label_cache.get(key)
+            if cached is not None:
+                result[label] = cached
+            else:
+                missing.setdefault(key, []).append(label)
+        if not missing:
+            return result
+        requested = [str(label) for labels in missing.values() for label in labels]
+        placeholders = ', '.join(['%s'] * len(requested))
+        cur = db.connection.cursor()
+        cur.execute(f"""
+            SELECT pot.label, p.id, p.user_id, p.species_id, s.common_name
+            FROM plants p
+            JOIN pots pot ON p.pot_id = pot.id
+            LEFT JOIN species s ON p.species_id = s.id
+            WHERE pot.label IN ({placeholders})
+            ORDER BY p.id
+        """, requested)
+        rows = cur.fetchall()
+        cur.close()
+        for row in rows:
+            # Igual que get_plant_by_pot_label: la planta más antigua del label
+            key = pot_label_key(row[0])
+            if key not in missing:
+                continue
+            plant_info = {
+                'plant_id': row[1],
+                'user_id': row[2],
+                'species_id': row[3],
+                'species_name': row[4]
+            }
+            pot_label_cache.set(key, plant_info)
+            for label in missing.pop(key):
+                result[label] = plant_info
+        return result
+
+    @staticmethod
+    def invalidate_pot_label(pot_label):
+        """Descarta el mapeo cacheado de un macetero (al crear su pot o una planta en él)"""
+        pot_label_cache.invalidate(pot_label_key(pot_label))
+
     @staticmethod
     def create_ambiental_condition(plant_id, temperature, humidity, moisture, light):
         """Crear registro de condiciones ambientales"""
-        cur = MySQL().connection.cursor()
-        cur.execute("""
+        return Plant.create_ambiental_conditions([(plant_id, temperature, humidity, moisture, light)])[0]
+
+    @staticmethod
+    def create_ambiental_conditions(rows):
+        """
+        Crear varios registros de condiciones ambientales con un único INSERT
+        multi-fila y un solo commit.
+        rows: lista de tuplas (plant_id, temperature, humidity, moisture, light)
+        Devuelve los ids generados en el mismo orden que rows.
+        En la misma transacción actualiza plant_latest_conditions con la lectura
+        más reciente de cada planta del lote.
+        """
+        if not rows:
+            return []
+        placeholders = ', '.join(['(%s, %s, %s, %s, %s)'] * len(rows))
+        params = [value for row in rows for value in row]
+        cur = db.connection.cursor()
+        cur.execute(f"""
             INSERT INTO ambiental_conditions 
             (plant_id, temperature_celsius, humidity_percent, moisture_percent, light_lux) 
-            VALUES (%s, %s, %s, %s, %s)
-        """, (plant_id, temperature, humidity, moisture, light))
-        condition_id = cur.lastrowid
-        MySQL().connection.commit()
+            VALUES {placeholders}
+        """, params)
+        # Un INSERT multi-fila es un "simple insert": InnoDB reserva los ids del
+        # lote de una vez (sin intercalar otros INSERT) y lastrowid es el de la
+        # primera fila. Los siguientes avanzan de auto_increment_increment en
+        # auto_increment_increment (1 salvo en replicación multi-primario)
+        first_id = cur.lastrowid
+        step = Plant._auto_increment_step(cur)
+        condition_ids = [first_id + i * step for i in range(len(rows))]
+        # Última lectura del lote por planta (los ids crecen con el orden de entrada)
+        latest = list({row[0]: condition_id for row, condition_id in zip(rows, condition_ids)}.values())
+        Plant._upsert_latest_conditions(cur, latest)
+        db.connection.commit()
         cur.close()
-        return condition_id
+        return condition_ids
+
+    @staticmethod
+    def _auto_increment_step(cur):
+        """@@auto_increment_increment de la sesión, leído una vez por conexión"""
+        conn = cur.connection
+        step = getattr(conn, '_auto_increment_step', None)
+        if step is None:
+            cur.execute("SELECT @@auto_increment_increment")
+            step = int(cur.fetchone()[0])
+            conn._auto_increment_step = step
+        return step
+
+    @staticmethod
+    def _upsert_latest_conditions(cur, condition_ids):
+        """
+        Copia las lecturas indicadas a plant_latest_conditions sin hacer commit.
+        Solo reemplaza la fila de una planta si la lectura es más nueva (id mayor),
+        así ingestas concurrentes y el backfill no pueden retroceder el estado.
+        """
+        placeholders = ', '.join(['%s'] * len(condition_ids))
+        # ambiental_conditions_id se asigna el último: MySQL evalúa las
+        # asignaciones en orden y las anteriores comparan contra el valor viejo
+        cur.execute(f"""
+            INSERT INTO plant_latest_conditions
+            (plant_id, temperature_celsius, humidity_percent, moisture_percent, light_lux, recorded_at, ambiental_conditions_id)
+            SELECT plant_id, temperature_celsius, humidity_percent, moisture_percent, light_lux, recorded_at, id
+            FROM ambiental_conditions
+            WHERE id IN ({placeholders})
+            ON DUPLICATE KEY UPDATE
+                temperature_celsius = IF(VALUES(ambiental_conditions_id) > ambiental_conditions_id, VALUES(temperature_celsius), temperature_celsius),
+                humidity_percent = IF(VALUES(ambiental_conditions_id) > ambiental_conditions_id, VALUES(humidity_percent), humidity_percent),
+                moisture_percent = IF(VALUES(ambiental_conditions_id) > ambiental_conditions_id, VALUES(moisture_percent), moisture_percent),
+                light_lux = IF(VALUES(ambiental_conditions_id) > ambiental_conditions_id, VALUES(light_lux), light_lux),
+                recorded_at = IF(VALUES(ambiental_conditions_id) > ambiental_conditions_id, VALUES(recorded_at), recorded_at),
+                ambiental_conditions_id = GREATEST(VALUES(ambiental_conditions_id), ambiental_conditions_id)
+        """, condition_ids)
@@ -1,13 +1,11 @@
 from flask import current_app
-from flask_mysqldb import MySQL
+from database import db
 from werkzeug.security import generate_password_hash, check_password_hash
 
-mysql = MySQL()
-
 class User:
     @staticmethod
     def find_by_username(username):
-        cur = mysql.connection.cursor()
+        cur = db.connection.cursor()
         cur.execute("SELECT * FROM users WHERE username = %s", (username,))
         user = cur.fetchone()
         cur.close()
@@ -16,10 +14,10 @@ class User:
     @staticmethod
     def create(username, email, password):
         password_hash = generate_password_hash(password)
-        cur = mysql.connection.cursor()
+        cur = db.connection.cursor()
         cur.execute("INSERT INTO users (username, email, password_hash) VALUES (%s, %s, %s)",
                     (username, email, password_hash))
-        mysql.connection.commit()
+        db.connection.commit()
         cur.close()
 
     @staticmethod
@@ -28,15 +26,37 @@ class User:
 
     @staticmethod
     def create_session(user_id, session_token, expires_at):
-        cur = mysql.connection.cursor()
+        cur = db.connection.cursor()
         cur.execute("INSERT INTO sessions (user_id, session_token, expires_at) VALUES (%s, %s, %s)",
                     (user_id, session_token, expires_at))
-        mysql.connection.commit()
+        session_id = cur.lastrowid
+        db.connection.commit()
         cur.close()
+        return session_id
 
     @staticmethod
     def delete_session(user_id, session_token):
-        cur = mysql.connection.cursor()
+        cur = db.connection.cursor()
         cur.execute("DELETE FROM sessions WHERE user_id = %s AND session_token = %s", (user_id, session_token))
-        mysql.connection.commit()
+        db.connection.commit()
+        cur.close()
+
+    @staticmethod
+    def revoke_session(user_id, session_token, record_revocation=True):
+        """
+        Elimina la sesión y, con record_revocation (modo stateless), la registra en
+        revoked_sessions en la misma transacción para que se rechace hasta su
+        expiración. Devuelve su id o None.
+        """
+        cur = db.connection.cursor()
+        cur.execute("SELECT id, expires_at FROM sessions WHERE user_id = %s AND session_token = %s", (user_id, session_token))
+        session = cur.fetchone()
+        if not session:
+            cur.close()
+            return None
+        if record_revocation:
+            cur.execute("INSERT IGNORE INTO revoked_sessions (session_id, expires_at) VALUES (%s, %s)", session)
+        cur.execute("DELETE FROM sessions WHERE id = %s", (session[0],))
+        db.connection.commit()
         cur.close()
+        return session[0]
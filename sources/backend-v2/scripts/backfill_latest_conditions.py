@@ -0,0 +1,75 @@
+"""
+Rellena plant_latest_conditions a partir del historial de ambiental_conditions
+(migrations/002_plant_latest_conditions.sql).
+
+Recorre las plantas por rangos de id con un commit por lote, así que se puede
+ejecutar con la API en marcha: el upsert solo avanza una fila si la lectura es
+más nueva que la que ya escribió la ingesta. Es idempotente.
+
+Uso (desde backend-v2):
+    python scripts/backfill_latest_conditions.py [--batch-size 500]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import MySQLdb
+from config import Config
+
+BACKFILL_SQL = """
+    INSERT INTO plant_latest_conditions
+    (plant_id, temperature_celsius, humidity_percent, moisture_percent, light_lux, recorded_at, ambiental_conditions_id)
+    SELECT ac.plant_id, ac.temperature_celsius, ac.humidity_percent, ac.moisture_percent, ac.light_lux, ac.recorded_at, ac.id
+    FROM plants p
+    JOIN ambiental_conditions ac ON ac.id = (
+        SELECT last.id FROM ambiental_conditions last
+        WHERE last.plant_id = p.id
+        ORDER BY last.recorded_at DESC, last.id DESC
+        LIMIT 1
+    )
+    WHERE p.id > %s AND p.id <= %s
+    ON DUPLICATE KEY UPDATE
+        temperature_celsius = IF(VALUES(ambiental_conditions_id) > ambiental_conditions_id, VALUES(temperature_celsius), temperature_celsius),
+        humidity_percent = IF(VALUES(ambiental_conditions_id) > ambiental_conditions_id, VALUES(humidity_percent), humidity_percent),
+        moisture_percent = IF(VALUES(ambiental_conditions_id) > ambiental_conditions_id, VALUES(moisture_percent), moisture_percent),
+        light_lux = IF(VALUES(ambiental_conditions_id) > ambiental_conditions_id, VALUES(light_lux), light_lux),
+        recorded_at = IF(VALUES(ambiental_conditions_id) > ambiental_conditions_id, VALUES(recorded_at), recorded_at),
+        ambiental_conditions_id = GREATEST(VALUES(ambiental_conditions_id), ambiental_conditions_id)
+"""
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--batch-size', type=int, default=500, help='plantas por transacción')
+    args = parser.parse_args()
+
+    conn = MySQLdb.connect(
+        host=Config.MYSQL_HOST,
+        port=Config.MYSQL_PORT,
+        user=Config.MYSQL_USER,
+        passwd=Config.MYSQL_PASSWORD,
+        db=Config.MYSQL_DB
+    )
+    cur = conn.cursor()
+    cur.execute("SELECT COALESCE(MAX(id), 0) FROM plants")
+    max_id = cur.fetchone()[0]
+    print(f"Rellenando plant_latest_conditions para plantas 1..{max_id}")
+
+    start = time.perf_counter()
+    last_id = 0
+    while last_id < max_id:
+        upper = last_id + args.batch_size
+        cur.execute(BACKFILL_SQL, (last_id, upper))
+        conn.commit()
+        print(f"   plantas {last_id + 1}..{min(upper, max_id)}: {cur.rowcount} filas afectadas")
+        last_id = upper
+
+    cur.execute("SELECT COUNT(*) FROM plant_latest_conditions")
+    print(f"✅ Listo en {time.perf_counter() - start:.1f}s: {cur.fetchone()[0]} plantas con última lectura")
+    cur.close()
+    conn.close()
+
+if __name__ == '__main__':
+    main()
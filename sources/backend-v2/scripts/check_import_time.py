@@ -0,0 +1,70 @@
+"""
+Presupuesto de tiempo de arranque: importa la aplicación en un proceso nuevo
+(sin warm-up de modelos) y falla si tarda más que el presupuesto o si ha
+importado alguna dependencia pesada que debería cargarse solo al usar los
+modelos (tensorflow, pandas, sklearn).
+
+    backend-v2: from app import create_app; create_app()
+    ml-service: import app
+
+Sale con código 1 si algún objetivo se pasa del presupuesto. tests/test_import_time.py
+hace la misma comprobación con pytest.
+
+Uso (desde backend-v2):
+    python scripts/check_import_time.py [--target backend-v2 ml-service] [--budget 1.5] [--repeat 3]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+
+TARGETS = {
+    'backend-v2': (os.path.join(ROOT, 'backend-v2'), 'from app import create_app; create_app()',
+                   {'MODEL_WARMUP': 'false', 'SESSION_SWEEPER': 'false', 'AUTH_SESSION_MODE': 'db',
+                    'INGEST_WRITE_BEHIND': 'false'}),
+    'ml-service': (os.path.join(ROOT, 'backend', 'ml-service'), 'import app', {'ML_WARMUP': 'false'})
+}
+
+HEAVY_MODULES = ['tensorflow', 'pandas', 'sklearn', 'onnxruntime', 'tflite_runtime']
+
+PROBE = """
+import sys, time, json
+start = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'heavy': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+def measure(target):
+    cwd, code, env = TARGETS[target]
+    result = subprocess.run(
+        [sys.executable, '-c', PROBE.format(code=code, heavy=HEAVY_MODULES)],
+        cwd=cwd, env={**os.environ, **env}, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f'{target} no se pudo importar:\n{result.stderr.strip()}')
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--target', nargs='+', choices=list(TARGETS), default=list(TARGETS))
+    parser.add_argument('--budget', type=float, default=1.5, help='segundos')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    failed = False
+    for target in args.target:
+        runs = [measure(target) for _ in range(args.repeat)]
+        best = min(run['seconds'] for run in runs)
+        heavy = sorted(set(module for run in runs for module in run['heavy']))
+        ok = best <= args.budget and not heavy
+        failed |= not ok
+        print(f"{'✅' if ok else '❌'} {target:<11} {best:.3f} s (presupuesto {args.budget} s)"
+              + (f", importó: {', '.join(heavy)}" if heavy else ''))
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+"""
+Genera los artefactos TFLite y ONNX del clasificador de plantas a partir de
+model-recognition.h5, para RECOGNITION_BACKEND=tflite | onnx.
+
+Los archivos se escriben junto al .h5 con el mismo nombre
+(model-recognition.tflite, model-recognition.onnx). Para ml-service, copiarlos
+a backend/ml-service/models/ o pasar esa ruta como modelo.
+
+Requiere tensorflow (y tf2onnx para onnx: pip install tf2onnx).
+
+Uso (desde backend-v2):
+    python scripts/convert_recognition_model.py [ruta/model-recognition.h5] [--formats tflite onnx] [--opset 13]
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.recognition_model import convert_recognition_model
+
+DEFAULT_MODEL = os.path.join(os.path.dirname(__file__), '..', 'model-recognition.h5')
+
+def main():
+    parser = argparse.ArgumentParser(description='Convierte model-recognition.h5 a TFLite / ONNX')
+    parser.add_argument('model', nargs='?', default=DEFAULT_MODEL)
+    parser.add_argument('--formats', nargs='+', choices=['tflite', 'onnx'], default=['tflite', 'onnx'])
+    parser.add_argument('--opset', type=int, default=13)
+    args = parser.parse_args()
+
+    outputs = convert_recognition_model(args.model, formats=args.formats, opset=args.opset)
+    for fmt, path in outputs.items():
+        print(f"✅ {fmt:<7} {path} ({os.path.getsize(path) / 1e6:.1f} MB)")
+
+if __name__ == '__main__':
+    main()
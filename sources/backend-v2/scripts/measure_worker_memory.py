@@ -0,0 +1,137 @@
+"""
+Memoria por worker de un servidor prefork (gunicorn): RSS, PSS, USS y memoria
+compartida del master y de cada worker, leídas de /proc/<pid>/smaps_rollup (Linux).
+
+- RSS cuenta las páginas compartidas en cada proceso (suma engañosa).
+- PSS reparte cada página compartida entre los procesos que la usan: la suma de
+  PSS es la memoria real del servidor.
+- USS (Private_Clean + Private_Dirty) es lo que se liberaría al matar el worker:
+  el coste marginal de añadir un worker más.
+
+Uso (desde backend-v2):
+    python scripts/measure_worker_memory.py <pid del master de gunicorn>
+
+    # Sin gunicorn: carga el modelo de riego, hace fork de N procesos que
+    # predicen (como preload_app) y mide; --no-mmap usa una copia en memoria
+    # en vez del sidecar .compiled.joblib, --no-preload lanza N procesos
+    # independientes que cargan cada uno el modelo (sin preload_app)
+    python scripts/measure_worker_memory.py --demo --workers 4 [--model ruta.pkl] [--no-mmap] [--no-preload]
+"""
+import argparse
+import gc
+import os
+import signal
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+DEFAULT_MODEL = os.path.join(os.path.dirname(__file__), '..', '..', 'ML', 'modelo_riego_numerico.pkl')
+
+def smaps(pid):
+    """Campos de smaps_rollup en MB."""
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                values[parts[0].rstrip(':')] = int(parts[1]) / 1024
+    return {
+        'rss': values.get('Rss', 0.0),
+        'pss': values.get('Pss', 0.0),
+        'uss': values.get('Private_Clean', 0.0) + values.get('Private_Dirty', 0.0),
+        'shared': values.get('Shared_Clean', 0.0) + values.get('Shared_Dirty', 0.0)
+    }
+
+def children(pid):
+    pids = []
+    for task in os.listdir(f'/proc/{pid}/task'):
+        with open(f'/proc/{pid}/task/{task}/children') as f:
+            pids.extend(int(child) for child in f.read().split())
+    return pids
+
+def report(master, workers):
+    rows = [('master', master, smaps(master))] + [('worker', pid, smaps(pid)) for pid in workers]
+    print(f"{'proceso':<8} {'pid':>7} {'RSS MB':>9} {'PSS MB':>9} {'USS MB':>9} {'compartida MB':>14}")
+    for role, pid, mem in rows:
+        print(f"{role:<8} {pid:>7} {mem['rss']:>9.1f} {mem['pss']:>9.1f} {mem['uss']:>9.1f} {mem['shared']:>14.1f}")
+    total_pss = sum(mem['pss'] for _, _, mem in rows)
+    total_rss = sum(mem['rss'] for _, _, mem in rows)
+    worker_uss = [mem['uss'] for role, _, mem in rows if role == 'worker']
+    print(f'Total PSS: {total_pss:.1f} MB (suma de RSS: {total_rss:.1f} MB)')
+    if worker_uss:
+        print(f'USS medio por worker: {sum(worker_uss) / len(worker_uss):.1f} MB')
+    return total_pss
+
+WORKER_CODE = '''
+import signal, sys, numpy as np
+from services.irrigation_model import load_irrigation_model
+model = load_irrigation_model(sys.argv[1], mmap=sys.argv[2] == '1')
+rng = np.random.default_rng(0)
+rows = np.column_stack([rng.integers(1, 9, 256), rng.uniform(0, 100, 256), rng.uniform(5, 40, 256)])
+for _ in range(20):
+    model.predict(rows)
+signal.pause()
+'''
+
+def demo_no_preload(model_path, n_workers, mmap):
+    cwd = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+    procs = [subprocess.Popen([sys.executable, '-W', 'ignore', '-c', WORKER_CODE, model_path, '1' if mmap else '0'],
+                              cwd=cwd) for _ in range(n_workers)]
+    time.sleep(5)
+    print(f'\n== sin preload, {n_workers} procesos independientes ==')
+    try:
+        return report(os.getpid(), [proc.pid for proc in procs])
+    finally:
+        for proc in procs:
+            proc.terminate()
+            proc.wait()
+
+def demo(model_path, n_workers, mmap):
+    import numpy as np
+    from services.irrigation_model import load_irrigation_model
+    model = load_irrigation_model(model_path, mmap=mmap)
+    gc.collect()
+    gc.freeze()
+    rng = np.random.default_rng(0)
+    rows = np.column_stack([rng.integers(1, 9, 256), rng.uniform(0, 100, 256), rng.uniform(5, 40, 256)])
+    pids = []
+    for _ in range(n_workers):
+        pid = os.fork()
+        if pid == 0:
+            # Worker: usa el modelo (toca todas las páginas de los árboles) y espera
+            for _ in range(20):
+                model.predict(rows)
+            signal.pause()
+            os._exit(0)
+        pids.append(pid)
+    time.sleep(2)
+    print(f"\n== {'mmap (.compiled.joblib)' if mmap else 'copia en memoria'}, {n_workers} workers ==")
+    try:
+        return report(os.getpid(), pids)
+    finally:
+        for pid in pids:
+            os.kill(pid, signal.SIGTERM)
+            os.waitpid(pid, 0)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('pid', type=int, nargs='?', help='pid del master de gunicorn')
+    parser.add_argument('--demo', action='store_true')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--model', default=DEFAULT_MODEL)
+    parser.add_argument('--no-mmap', action='store_true', help='solo con --demo')
+    parser.add_argument('--no-preload', action='store_true', help='solo con --demo')
+    args = parser.parse_args()
+    if args.demo and args.no_preload:
+        demo_no_preload(args.model, args.workers, mmap=not args.no_mmap)
+    elif args.demo:
+        demo(args.model, args.workers, mmap=not args.no_mmap)
+    elif args.pid:
+        report(args.pid, children(args.pid))
+    else:
+        parser.error('indica el pid del master o --demo')
+
+if __name__ == '__main__':
+    main()
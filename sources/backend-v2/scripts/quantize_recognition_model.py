@@ -0,0 +1,135 @@
+"""
+Genera variantes cuantizadas post-entrenamiento de model-recognition.h5 y un
+informe comparándolas con el modelo float32.
+
+Variantes (ver services/recognition_model.py):
+    tflite:dynamic  pesos INT8 (rango dinámico), activaciones float
+    tflite:fp16     pesos float16
+    tflite:int8     pesos y activaciones INT8, calibrado con --calibration
+    onnx:dynamic    pesos INT8 con onnxruntime.quantization
+
+Para cada variante el informe da:
+    - coincidencia del top-1 con el modelo float32 (Keras) sobre --eval
+      (por defecto las mismas imágenes de calibración)
+    - tamaño en disco
+    - memoria residente (VmRSS) de un proceso nuevo tras cargar el modelo y
+      hacer una predicción
+    - latencia por imagen (p50/p95, lote de 1)
+
+Se sirve una variante con RECOGNITION_BACKEND=tflite RECOGNITION_VARIANT=int8
+(en ml-service copiar models/model-recognition.int8.tflite).
+
+Sin --calibration (solo --eval) se omite int8, que lo necesita para calibrar.
+
+Uso (desde backend-v2):
+    python scripts/quantize_recognition_model.py --calibration dir_imagenes
+        [--model ruta/model-recognition.h5] [--eval dir] [--variants tflite:dynamic tflite:fp16 tflite:int8]
+        [--report informe.json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+from services.recognition_model import (artifact_path, load_calibration_images, load_recognition_model,
+                                        quantize_recognition_model)
+
+DEFAULT_MODEL = os.path.join(os.path.dirname(__file__), '..', 'model-recognition.h5')
+DEFAULT_VARIANTS = ['tflite:dynamic', 'tflite:fp16', 'tflite:int8']
+
+def rss_mb():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    return None
+
+def probe_rss(model_path, backend, variant):
+    """RSS de un proceso limpio con solo este modelo cargado (no el de este script)."""
+    command = [sys.executable, __file__, '--probe', backend, variant or '', '--model', model_path]
+    result = subprocess.run(command, capture_output=True, text=True, check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+def probe(model_path, backend, variant):
+    model = load_recognition_model(model_path, backend, variant=variant or None)
+    model.predict(np.zeros((1, 180, 180, 3), np.float32))
+    print(rss_mb())
+
+def per_image_latency(model, images, repeat=50):
+    model.predict(images[:1])
+    times = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        model.predict(images[i % len(images)][None, ...])
+        times.append((time.perf_counter() - start) * 1000)
+    return round(float(np.percentile(times, 50)), 3), round(float(np.percentile(times, 95)), 3)
+
+def evaluate(model_path, backend, variant, images, reference):
+    model = load_recognition_model(model_path, backend, variant=variant)
+    path = artifact_path(model_path, backend, variant)
+    top1 = model.predict(images).argmax(axis=1)
+    p50, p95 = per_image_latency(model, images)
+    return {
+        'backend': backend,
+        'variant': variant or 'float32',
+        'path': path,
+        'size_mb': round(os.path.getsize(path) / 1e6, 2),
+        'top1_agreement': round(float(np.mean(top1 == reference)), 4),
+        'rss_mb': round(probe_rss(model_path, backend, variant), 1),
+        'latency_ms_p50': p50,
+        'latency_ms_p95': p95
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Cuantiza el modelo de reconocimiento y genera un informe')
+    parser.add_argument('--model', default=DEFAULT_MODEL)
+    parser.add_argument('--calibration', help='Directorio con imágenes de muestra (obligatorio para int8)')
+    parser.add_argument('--calibration-size', type=int, default=200)
+    parser.add_argument('--eval', help='Directorio con imágenes de evaluación (por defecto --calibration)')
+    parser.add_argument('--variants', nargs='+', help=f"por defecto {' '.join(DEFAULT_VARIANTS)}")
+    parser.add_argument('--report', help='Guardar el informe como JSON')
+    parser.add_argument('--probe', nargs=2, metavar=('BACKEND', 'VARIANT'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.probe:
+        probe(args.model, *args.probe)
+        return
+
+    calibration = load_calibration_images(args.calibration, args.calibration_size) if args.calibration else None
+    eval_dir = args.eval or args.calibration
+    if eval_dir is None:
+        parser.error('--calibration o --eval es obligatorio para el informe')
+    images = load_calibration_images(eval_dir, 1000) if args.eval else calibration
+
+    variants = [tuple(spec.split(':')) for spec in args.variants or DEFAULT_VARIANTS]
+    if calibration is None and any(variant == 'int8' for _, variant in variants):
+        # int8 calibra las activaciones: sin --calibration no se puede generar
+        if args.variants:
+            parser.error('las variantes int8 requieren --calibration')
+        print('⚠️  Sin --calibration: se omite tflite:int8')
+        variants = [(backend, variant) for backend, variant in variants if variant != 'int8']
+    for backend, variant in variants:
+        path = quantize_recognition_model(args.model, variant, backend=backend, calibration=calibration)
+        print(f"✅ {backend}:{variant} -> {path}")
+
+    reference = load_recognition_model(args.model, 'keras').predict(images).argmax(axis=1)
+    rows = [evaluate(args.model, 'keras', None, images, reference)]
+    rows += [evaluate(args.model, backend, variant, images, reference) for backend, variant in variants]
+
+    print(f"\nInforme sobre {len(images)} imágenes:")
+    print(f"{'variante':<16} {'tamaño MB':>10} {'top-1':>8} {'RSS MB':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    for row in rows:
+        print(f"{row['backend'] + ':' + row['variant']:<16} {row['size_mb']:>10.2f} {row['top1_agreement']:>8.2%} "
+              f"{row['rss_mb']:>8.1f} {row['latency_ms_p50']:>8.2f} {row['latency_ms_p95']:>8.2f}")
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump({'images': len(images), 'results': rows}, f, indent=2)
+        print(f"\nInforme guardado en {args.report}")
+
+if __name__ == '__main__':
+    main()
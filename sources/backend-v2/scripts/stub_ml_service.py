@@ -0,0 +1,102 @@
+"""
+ML Service de prueba: responde POST /predict/recognition como el ml-service real
+(mismo formato de respuesta y errores) sin TensorFlow ni modelo. La predicción
+es determinista: se deriva del hash de la imagen subida.
+
+Uso (desde backend-v2):
+    python scripts/stub_ml_service.py [--port 5001] [--delay-ms 0]
+    RECOGNITION_MODE=remote ML_SERVICE_URL=http://localhost:5001 python app.py
+
+tests/test_recognition_remote.py lo arranca en proceso para probar el modo remote.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+CLASS_NAMES = ['ajo', 'geranio', 'hierbabuena', 'menta', 'oregano', 'orquidea', 'rosachina', 'tomatecherry']
+
+def fake_probabilities(image_bytes):
+    weights = hashlib.blake2b(image_bytes, digest_size=len(CLASS_NAMES)).digest()
+    total = sum(weights) or 1
+    return [w / total for w in weights]
+
+def parse_image(content_type, body):
+    """Bytes del campo 'image' de un multipart/form-data, o None."""
+    message = BytesParser(policy=HTTP).parsebytes(
+        f'Content-Type: {content_type}\r\n\r\n'.encode() + body
+    )
+    if not message.is_multipart():
+        return None
+    for part in message.iter_parts():
+        if part.get_param('name', header='content-disposition') == 'image' and part.get_filename():
+            return part.get_payload(decode=True)
+    return None
+
+def recognition_response(image_bytes):
+    probabilities = fake_probabilities(image_bytes)
+    predictions = sorted(
+        ({'species': name, 'confidence': round(p * 100, 2)} for name, p in zip(CLASS_NAMES, probabilities)),
+        key=lambda x: x['confidence'], reverse=True
+    )
+    return {
+        'speciesName': predictions[0]['species'],
+        'speciesId': CLASS_NAMES.index(predictions[0]['species']) + 1,
+        'confidence': predictions[0]['confidence'],
+        'allPredictions': predictions
+    }
+
+def make_server(port=5001, delay_ms=0.0):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        requests_served = 0
+        connections = set()
+
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            Handler.connections.add(self.client_address)
+            length = int(self.headers.get('Content-Length', 0))
+            body = self.rfile.read(length)
+            if self.path != '/predict/recognition':
+                self._send(404, {'error': 'Not Found'})
+                return
+            Handler.requests_served += 1
+            time.sleep(delay_ms / 1000.0)
+            image_bytes = parse_image(self.headers.get('Content-Type', ''), body)
+            if image_bytes is None:
+                self._send(400, {'error': 'No image file provided'})
+                return
+            self._send(200, recognition_response(image_bytes))
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+    server.handler = Handler
+    return server
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--port', type=int, default=5001)
+    parser.add_argument('--delay-ms', type=float, default=0.0)
+    args = parser.parse_args()
+    server = make_server(args.port, args.delay_ms)
+    print(f"🤖 Stub ML Service en http://127.0.0.1:{args.port}")
+    server.serve_forever()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+import atexit
+import itertools
+import queue
+import secrets
+import threading
+import time
+from models.plant_model import Plant
+from utils.log import get_logger
+
+log = get_logger(__name__)
+
+class WriteBehindBuffer:
+    """
+    Buffer write-behind para ambiental_conditions (opcional, INGEST_WRITE_BEHIND).
+
+    Las lecturas se encolan en memoria y un hilo de fondo las escribe con un
+    INSERT multi-fila y un solo commit cada flush_rows filas o cada
+    flush_interval_ms, lo que ocurra antes. La API responde sin esperar a la
+    base de datos: en lugar de condition_id devuelve un sequence_id
+    ("<arranque>-<n>") visible para el cliente.
+
+    overflow (cola llena):
+        'block' - espera hasta enqueue_timeout_ms (un solo plazo para todo el
+                  lote, no por fila) y las lecturas que no entren se escriben
+                  de forma síncrona
+        'sync'  - se escribe de forma síncrona inmediatamente
+        'drop'  - se descarta (se cuenta en dropped)
+    delivery (fallo al escribir un lote):
+        'at_least_once' - se reintenta el lote con backoff hasta max_retries
+                          veces; si sigue fallando (p. ej. la planta se borró)
+                          sus filas van al log de dead-letter y se sigue con
+                          el siguiente lote, sin bloquear el hilo de escritura
+        'at_most_once'  - se descarta el lote (también al log de dead-letter)
+    Las filas descartadas se cuentan en dropped.
+    Al terminar el proceso se vacía la cola (shutdown_timeout segundos como máximo).
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.app = None
+        self._queue = None
+        self._thread = None
+        self._stopping = threading.Event()
+        self._boot_id = secrets.token_hex(4)
+        self._sequence = itertools.count(1)
+        self._stats_lock = threading.Lock()
+        self.queued = 0
+        self.flushed_rows = 0
+        self.flushes = 0
+        self.dropped = 0
+        self.sync_writes = 0
+        self.errors = 0
+        self.last_flush_ms = None
+
+    def init_app(self, app):
+        config = app.config
+        self.app = app
+        self.flush_rows = config['INGEST_FLUSH_ROWS']
+        self.flush_interval = config['INGEST_FLUSH_INTERVAL_MS'] / 1000.0
+        self.enqueue_timeout = config['INGEST_ENQUEUE_TIMEOUT_MS'] / 1000.0
+        self.overflow = config['INGEST_OVERFLOW']
+        self.delivery = config['INGEST_DELIVERY']
+        self.max_retries = config['INGEST_MAX_RETRIES']
+        self.shutdown_timeout = config['INGEST_SHUTDOWN_TIMEOUT']
+        self._queue = queue.Queue(maxsize=config['INGEST_QUEUE_SIZE'])
+        self._thread = threading.Thread(target=self._run, name='ingest-write-behind', daemon=True)
+        self._thread.start()
+        self.enabled = True
+        atexit.register(self.shutdown)
+
+    def submit(self, rows):
+        """
+        Encola filas (plant_id, temperature, humidity, moisture, light).
+        Devuelve una lista paralela de (estado, sequence_id) con estado
+        'queued', 'dropped' o 'rejected' (el llamador debe escribirla él mismo).
+        """
+        results = []
+        deadline = time.monotonic() + self.enqueue_timeout
+        for row in rows:
+            sequence_id = f'{self._boot_id}-{next(self._sequence)}'
+            try:
+                if self.overflow == 'block':
+                    # Con el plazo vencido put(timeout<=0) no espera: el resto se rechaza
+                    self._queue.put(row, timeout=max(deadline - time.monotonic(), 0))
+                else:
+                    self._queue.put_nowait(row)
+                results.append(('queued', sequence_id))
+            except queue.Full:
+                if self.overflow == 'drop':
+                    results.append(('dropped', None))
+                else:
+                    results.append(('rejected', None))
+        with self._stats_lock:
+            self.queued += sum(1 for state, _ in results if state == 'queued')
+            self.dropped += sum(1 for state, _ in results if state == 'dropped')
+            self.sync_writes += sum(1 for state, _ in results if state == 'rejected')
+        return results
+
+    def _drain(self, deadline):
+        """Saca de la cola hasta flush_rows filas, hasta el deadline o hasta el shutdown."""
+        batch = []
+        while len(batch) < self.flush_rows:
+            timeout = deadline - time.monotonic()
+            stopping = self._stopping.is_set()
+            try:
+                if timeout <= 0 or stopping:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    # Espera por tramos cortos: con el shutdown las filas ya sacadas
+                    # se escriben enseguida en vez de esperar al flush_interval
+                    batch.append(self._queue.get(timeout=min(timeout, 0.1)))
+            except queue.Empty:
+                if timeout <= 0 or stopping:
+                    break
+        return batch
+
+    def _run(self):
+        while not self._stopping.is_set():
+            batch = self._drain(time.monotonic() + self.flush_interval)
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch):
+        attempts = self.max_retries + 1 if self.delivery == 'at_least_once' else 1
+        backoff = 0.1
+        for attempt in range(1, attempts + 1):
+            start = time.perf_counter()
+            try:
+                with self.app.app_context():
+                    Plant.create_ambiental_conditions(batch)
+                with self._stats_lock:
+                    self.flushes += 1
+                    self.flushed_rows += len(batch)
+                    self.last_flush_ms = round((time.perf_counter() - start) * 1000, 2)
+                return True
+            except Exception as e:
+                with self._stats_lock:
+                    self.errors += 1
+                log.error("Error escribiendo lote de lecturas", rows=len(batch), attempt=attempt, error=str(e))
+            # Al cerrar no se reintenta; la espera se corta si llega el shutdown
+            if attempt == attempts or self._stopping.wait(backoff):
+                break
+            backoff = min(backoff * 2, 5.0)
+        with self._stats_lock:
+            self.dropped += len(batch)
+        log.error("☠️ Lote de lecturas descartado (dead-letter)", rows=len(batch),
+                  readings=[list(row) for row in batch])
+        return False
+
+    def shutdown(self):
+        """Detiene el hilo y escribe lo que quede en cola (flush-on-shutdown)."""
+        if not self.enabled:
+            return
+        self.enabled = False
+        self._stopping.set()
+        self._thread.join(timeout=self.shutdown_timeout)
+        deadline = time.monotonic() + self.shutdown_timeout
+        while not self._queue.empty() and time.monotonic() < deadline:
+            self._write(self._drain(time.monotonic()))
+        if not self._queue.empty():
+            log.error("Lecturas sin escribir al cerrar", rows=self._queue.qsize())
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                'enabled': self.enabled,
+                'queue_depth': self._queue.qsize() if self._queue is not None else 0,
+                'queued': self.queued,
+                'flushed_rows': self.flushed_rows,
+                'flushes': self.flushes,
+                'dropped': self.dropped,
+                'sync_writes': self.sync_writes,
+                'errors': self.errors,
+                'last_flush_ms': self.last_flush_ms
+            }
+
+ingest_buffer = WriteBehindBuffer()
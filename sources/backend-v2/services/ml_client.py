@@ -0,0 +1,79 @@
+"""
+Cliente del ML Service para RECOGNITION_MODE=remote.
+
+En ese modo /recognition/ no carga TensorFlow en los workers de backend-v2:
+reenvía la subida a POST /predict/recognition del ml-service. El cuerpo
+multipart del request se reenvía tal cual (mismo Content-Type con su boundary)
+leyéndolo por bloques del stream de entrada, sin parsearlo ni copiarlo entero
+en memoria. Las conexiones salen de una requests.Session con pool keep-alive;
+connect_timeout y read_timeout acotan cuánto puede bloquear un worker.
+"""
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+class MLServiceUnavailable(Exception):
+    """No se pudo conectar con el ML Service o no respondió a tiempo."""
+
+class _BodyStream:
+    """Stream de entrada con longitud conocida: requests lo envía por bloques con Content-Length."""
+
+    def __init__(self, stream, length):
+        self._stream = stream
+        self._length = length
+
+    def __len__(self):
+        return self._length
+
+    def read(self, size=-1):
+        return self._stream.read(size)
+
+class MLServiceClient:
+    def __init__(self, base_url, connect_timeout=1.0, read_timeout=30.0, pool_size=10):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = (connect_timeout, read_timeout)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def forward(self, path, stream, content_type, content_length=None):
+        """
+        Reenvía un cuerpo (stream de entrada o bytes) a path del ML Service.
+        Devuelve (status, json o None). Lanza MLServiceUnavailable si no responde.
+        """
+        body = _BodyStream(stream, content_length) if content_length else stream
+        start = time.perf_counter()
+        try:
+            response = self.session.post(f'{self.base_url}{path}', data=body,
+                                         headers={'Content-Type': content_type}, timeout=self.timeout)
+        except requests.RequestException as e:
+            with self._lock:
+                self.errors += 1
+            raise MLServiceUnavailable(f'ML Service not available ({self.base_url}): {e}') from e
+        elapsed = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self.requests += 1
+            self.total_ms += elapsed
+            self.max_ms = max(self.max_ms, elapsed)
+        try:
+            data = response.json()
+        except ValueError:
+            data = None
+        return response.status_code, data
+
+    def stats(self):
+        with self._lock:
+            return {
+                'base_url': self.base_url,
+                'requests': self.requests,
+                'errors': self.errors,
+                'latency_ms_avg': round(self.total_ms / self.requests, 3) if self.requests else 0.0,
+                'latency_ms_max': round(self.max_ms, 3)
+            }
@@ -0,0 +1,85 @@
+"""
+Sesiones revocadas para AUTH_SESSION_MODE=stateless.
+
+En modo stateless authenticate no consulta la base de datos: el JWT lleva el id
+de la sesión (sid), un hash del session token (sth) y su expiración (sexp).
+Solo hace falta saber si la sesión fue revocada por logout. Las revocaciones
+vigentes se cargan de revoked_sessions cada REVOCATION_SYNC_INTERVAL segundos
+en un conjunto de ids en memoria (una búsqueda en un set por request).
+"""
+import hashlib
+import threading
+import time
+from datetime import datetime
+from database import db
+from utils import metrics
+from utils.log import get_logger
+
+log = get_logger(__name__)
+
+def token_fingerprint(session_token):
+    """Hash corto del session token que viaja en el claim sth del JWT."""
+    return hashlib.sha256(session_token.encode()).hexdigest()[:32]
+
+class RevocationStore:
+    """Mantiene el conjunto de sesiones revocadas sincronizado con la tabla revoked_sessions."""
+
+    def __init__(self):
+        self.revoked = set()
+        self._local = {}  # session_id -> instante del logout en este worker
+        self.syncs = 0
+        self.sync_errors = 0
+        self.last_sync_ms = None
+
+    def init_app(self, app):
+        self.interval = app.config['REVOCATION_SYNC_INTERVAL']
+        metrics.register('revocations', self.stats)
+        self.sync()
+        threading.Thread(target=self._run, name='revocation-sync', daemon=True).start()
+
+    def sync(self):
+        started = time.monotonic()
+        try:
+            with db.checkout() as conn:
+                cur = conn.cursor()
+                cur.execute("SELECT session_id FROM revoked_sessions WHERE expires_at > %s", (datetime.utcnow(),))
+                session_ids = [row[0] for row in cur.fetchall()]
+                cur.close()
+        except Exception as e:
+            self.sync_errors += 1
+            log.warning("⚠️ Error sincronizando sesiones revocadas", error=str(e))
+            return
+        # Se construye aparte y se sustituye de golpe: los lectores nunca ven un conjunto a medias
+        revoked = set(session_ids)
+        for session_id, revoked_at in list(self._local.items()):
+            # Un logout local posterior al inicio de la lectura puede no estar en ella
+            if revoked_at >= started:
+                revoked.add(session_id)
+            else:
+                self._local.pop(session_id, None)
+        self.revoked = revoked
+        self.syncs += 1
+        self.last_sync_ms = round((time.monotonic() - started) * 1000, 2)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            self.sync()
+
+    def revoke(self, session_id):
+        """Revocación inmediata en este worker (logout ya confirmado en la base de datos)."""
+        self._local[session_id] = time.monotonic()
+        self.revoked.add(session_id)
+
+    def is_revoked(self, session_id):
+        return session_id in self.revoked
+
+    def stats(self):
+        return {
+            'revoked': len(self.revoked),
+            'syncs': self.syncs,
+            'sync_errors': self.sync_errors,
+            'last_sync_ms': self.last_sync_ms
+        }
+
+revocation_store = RevocationStore()
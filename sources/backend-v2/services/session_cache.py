@@ -0,0 +1,97 @@
+"""
+Caché de sesiones validadas para middleware/auth_middleware.authenticate.
+
+Guarda (user_id, session_token) -> expires_at para no consultar la tabla
+sessions en cada request autenticado. Cada entrada vive como máximo
+SESSION_CACHE_TTL segundos y nunca más allá de la expiración de la sesión.
+logout la invalida al momento en este proceso; con SESSION_CACHE_REDIS_URL
+la invalidación se publica también al resto de workers. Sin Redis, una sesión
+cerrada sigue siendo válida en los demás workers (y réplicas) hasta que su
+entrada expira: como mucho SESSION_CACHE_TTL segundos.
+"""
+import hashlib
+import threading
+from datetime import datetime
+from config import Config
+from utils.cache import TTLCache
+from utils import metrics
+from utils.log import get_logger
+
+session_cache = TTLCache(maxsize=Config.SESSION_CACHE_SIZE, ttl=Config.SESSION_CACHE_TTL)
+metrics.register('session_cache', session_cache.stats)
+log = get_logger(__name__)
+
+# Bus de invalidación entre procesos (opcional): objeto con publish(key)
+_invalidation_bus = None
+
+def _key(user_id, session_token):
+    # El token en claro no sale del proceso: la clave usa su hash
+    return f'{user_id}:{hashlib.sha256(session_token.encode()).hexdigest()}'
+
+def get_cached_session(user_id, session_token):
+    """expires_at de una sesión ya validada, o None si no está en caché."""
+    if Config.SESSION_CACHE_TTL <= 0:
+        return None
+    return session_cache.get(_key(user_id, session_token))
+
+def cache_session(user_id, session_token, expires_at):
+    if Config.SESSION_CACHE_TTL <= 0:
+        return
+    remaining = (expires_at - datetime.utcnow()).total_seconds()
+    session_cache.set(_key(user_id, session_token), expires_at, ttl=remaining)
+
+def invalidate_session(user_id, session_token):
+    if not session_token:
+        return
+    key = _key(user_id, session_token)
+    session_cache.invalidate(key)
+    if _invalidation_bus is not None:
+        try:
+            _invalidation_bus.publish(key)
+        except Exception as e:
+            log.warning("⚠️ No se pudo publicar la invalidación de sesión", error=str(e))
+
+def set_invalidation_bus(bus):
+    """
+    Registra un bus de invalidación entre procesos. bus.publish(key) se llama en
+    cada logout; el bus debe llamar a session_cache.invalidate(key) en los demás.
+    """
+    global _invalidation_bus
+    _invalidation_bus = bus
+
+class RedisInvalidationBus:
+    """Invalidación vía Redis pub/sub (requiere el paquete opcional redis)."""
+
+    channel = 'potai:session-invalidate'
+
+    def __init__(self, url):
+        import redis
+        self.client = redis.Redis.from_url(url)
+
+    def publish(self, key):
+        self.client.publish(self.channel, key)
+
+    def start(self, on_invalidate):
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self.channel)
+
+        def listen():
+            for message in pubsub.listen():
+                on_invalidate(message['data'].decode())
+
+        threading.Thread(target=listen, name='session-invalidation', daemon=True).start()
+
+def init_app(app):
+    url = app.config['SESSION_CACHE_REDIS_URL']
+    if app.config['SESSION_CACHE_TTL'] <= 0:
+        return
+    if not url:
+        log.info("ℹ️ Caché de sesiones sin Redis: un logout tarda hasta SESSION_CACHE_TTL en llegar a otros workers",
+                 ttl=app.config['SESSION_CACHE_TTL'])
+        return
+    try:
+        bus = RedisInvalidationBus(url)
+        bus.start(session_cache.invalidate)
+        set_invalidation_bus(bus)
+    except ImportError:
+        log.warning("⚠️ SESSION_CACHE_REDIS_URL definido pero el paquete redis no está instalado")
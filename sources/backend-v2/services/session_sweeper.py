@@ -0,0 +1,113 @@
+"""
+Limpieza periódica de sesiones expiradas.
+
+User.create_session inserta una fila por login y solo logout borra, así que
+sessions crece sin límite. El sweeper borra las expiradas (y, con
+AUTH_SESSION_MODE=stateless, las revocaciones ya caducadas: en modo db no se
+escribe revoked_sessions y la tabla puede no existir) en lotes pequeños con commit por lote y una pausa entre lotes,
+para no mantener bloqueos largos sobre la tabla que consulta authenticate.
+Con varios workers solo barre uno a la vez (GET_LOCK). El tamaño de sessions se
+lee al final de cada barrido y stats() devuelve ese valor, sin consultar
+information_schema en cada GET /metrics.
+"""
+import random
+import threading
+import time
+from datetime import datetime
+from database import db
+from utils import metrics
+from utils.log import get_logger
+
+SWEEP_LOCK = 'potai_session_sweeper'
+
+log = get_logger(__name__)
+
+class SessionSweeper:
+    def __init__(self):
+        self.sweeps = 0
+        self.deleted_sessions = 0
+        self.deleted_revocations = 0
+        self.last_sweep_ms = None
+        self.last_sweep_at = None
+        self.sessions_table = None
+        self.errors = 0
+
+    def init_app(self, app):
+        self.interval = app.config['SESSION_SWEEP_INTERVAL']
+        self.batch_size = app.config['SESSION_SWEEP_BATCH']
+        self.pause = app.config['SESSION_SWEEP_PAUSE_MS'] / 1000.0
+        self.prune_revocations = app.config['AUTH_SESSION_MODE'] == 'stateless'
+        metrics.register('session_sweeper', self.stats)
+        threading.Thread(target=self._run, name='session-sweeper', daemon=True).start()
+
+    def _run(self):
+        # Desfase aleatorio para que los workers no arranquen todos a la vez
+        time.sleep(random.uniform(0, self.interval))
+        while True:
+            try:
+                self.sweep()
+            except Exception as e:
+                self.errors += 1
+                log.warning("⚠️ Error limpiando sesiones expiradas", error=str(e))
+            time.sleep(self.interval)
+
+    def _delete_expired(self, conn, table, now):
+        deleted = 0
+        cur = conn.cursor()
+        while True:
+            cur.execute(f"DELETE FROM {table} WHERE expires_at < %s ORDER BY expires_at LIMIT %s",
+                        (now, self.batch_size))
+            conn.commit()
+            deleted += cur.rowcount
+            if cur.rowcount < self.batch_size:
+                break
+            time.sleep(self.pause)
+        cur.close()
+        return deleted
+
+    def sweep(self):
+        start = time.perf_counter()
+        with db.checkout() as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT GET_LOCK(%s, 0)", (SWEEP_LOCK,))
+            if not cur.fetchone()[0]:
+                cur.close()
+                return
+            try:
+                now = datetime.utcnow()
+                self.deleted_sessions += self._delete_expired(conn, 'sessions', now)
+                if self.prune_revocations:
+                    self.deleted_revocations += self._delete_expired(conn, 'revoked_sessions', now)
+                self.sessions_table = self._table_size(conn)
+            finally:
+                cur.execute("SELECT RELEASE_LOCK(%s)", (SWEEP_LOCK,))
+                cur.close()
+        self.sweeps += 1
+        self.last_sweep_ms = round((time.perf_counter() - start) * 1000, 2)
+        self.last_sweep_at = datetime.utcnow().isoformat()
+
+    def _table_size(self, conn):
+        """Tamaño aproximado de sessions (estadísticas de InnoDB, sin COUNT(*))."""
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT TABLE_ROWS, DATA_LENGTH + INDEX_LENGTH
+            FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'sessions'
+        """)
+        row = cur.fetchone()
+        cur.close()
+        return {'rows_estimate': row[0], 'bytes': row[1]} if row else None
+
+    def stats(self):
+        return {
+            'sweeps': self.sweeps,
+            'deleted_sessions': self.deleted_sessions,
+            'deleted_revocations': self.deleted_revocations,
+            'last_sweep_ms': self.last_sweep_ms,
+            'last_sweep_at': self.last_sweep_at,
+            'errors': self.errors,
+            # Del último barrido de este worker (None si aún no barrió)
+            'sessions_table': self.sessions_table
+        }
+
+session_sweeper = SessionSweeper()
@@ -0,0 +1,16 @@
+"""
+Presupuesto de arranque (scripts/check_import_time.py): crear la app en un
+proceso nuevo no debe importar TensorFlow, pandas ni sklearn ni pasar de
+IMPORT_TIME_BUDGET segundos (1.5 por defecto, el mejor de 3 intentos).
+"""
+import os
+import pytest
+from scripts.check_import_time import TARGETS, measure
+
+BUDGET = float(os.getenv('IMPORT_TIME_BUDGET', 1.5))
+
+@pytest.mark.parametrize('target', list(TARGETS))
+def test_import_stays_light_and_within_budget(target):
+    runs = [measure(target) for _ in range(3)]
+    assert not set(module for run in runs for module in run['heavy'])
+    assert min(run['seconds'] for run in runs) <= BUDGET
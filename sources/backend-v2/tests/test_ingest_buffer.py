@@ -0,0 +1,163 @@
+"""
+WriteBehindBuffer con Plant.create_ambiental_conditions sustituido: flush por
+tamaño, overflow (block con un solo plazo por lote, drop), reintentos acotados
+con dead-letter, flush al cerrar y cómo informa el endpoint IoT de una lectura
+descartada.
+"""
+import threading
+import time
+import pytest
+from flask import Flask
+from config import Config
+from models.plant_model import Plant
+from services.ingest_buffer import WriteBehindBuffer
+
+class FakeTable:
+    """Sustituye a create_ambiental_conditions; fail_times lotes fallan antes de escribir."""
+
+    def __init__(self, fail_times=0, gate=None):
+        self.rows = []
+        self.calls = 0
+        self.fail_times = fail_times
+        self.gate = gate
+
+    def __call__(self, rows):
+        if not rows:
+            return []
+        if self.gate is not None:
+            self.gate.wait()
+        self.calls += 1
+        if self.calls <= self.fail_times:
+            raise RuntimeError('Cannot add or update a child row: a foreign key constraint fails')
+        self.rows.extend(rows)
+        return list(range(len(self.rows) - len(rows) + 1, len(self.rows) + 1))
+
+def make_buffer(monkeypatch, table, **overrides):
+    monkeypatch.setattr(Plant, 'create_ambiental_conditions', staticmethod(table))
+    app = Flask(__name__)
+    app.config.update(
+        INGEST_FLUSH_ROWS=4,
+        INGEST_FLUSH_INTERVAL_MS=20,
+        INGEST_QUEUE_SIZE=100,
+        INGEST_OVERFLOW='block',
+        INGEST_ENQUEUE_TIMEOUT_MS=100,
+        INGEST_DELIVERY='at_least_once',
+        INGEST_MAX_RETRIES=2,
+        INGEST_SHUTDOWN_TIMEOUT=2
+    )
+    app.config.update(overrides)
+    buffer = WriteBehindBuffer()
+    buffer.init_app(app)
+    return buffer
+
+def rows(n, plant_id=1):
+    return [(plant_id, 20.0 + i, 50.0, 40.0, 300.0) for i in range(n)]
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+def test_rows_are_flushed_in_batches(monkeypatch):
+    table = FakeTable()
+    buffer = make_buffer(monkeypatch, table)
+    results = buffer.submit(rows(10))
+    assert [state for state, _ in results] == ['queued'] * 10
+    assert len({sequence_id for _, sequence_id in results}) == 10
+    assert wait_for(lambda: len(table.rows) == 10)
+    assert table.rows == rows(10)
+    stats = buffer.stats()
+    assert stats['flushed_rows'] == 10 and stats['flushes'] >= 3
+    buffer.shutdown()
+
+def test_block_overflow_uses_one_deadline_per_batch(monkeypatch):
+    gate = threading.Event()
+    table = FakeTable(gate=gate)
+    buffer = make_buffer(monkeypatch, table, INGEST_QUEUE_SIZE=2, INGEST_FLUSH_ROWS=1,
+                         INGEST_ENQUEUE_TIMEOUT_MS=100)
+    # El hilo de escritura queda bloqueado con la primera fila; la cola se llena con dos más
+    buffer.submit(rows(1))
+    assert wait_for(lambda: buffer.stats()['queue_depth'] == 0)
+    start = time.monotonic()
+    states = [state for state, _ in buffer.submit(rows(20))]
+    elapsed = time.monotonic() - start
+    assert states == ['queued'] * 2 + ['rejected'] * 18
+    assert elapsed < 0.5, f'el plazo es por lote, no por fila ({elapsed:.2f}s)'
+    assert buffer.stats()['sync_writes'] == 18
+    gate.set()
+    buffer.shutdown()
+
+def test_drop_overflow_reports_dropped(monkeypatch):
+    gate = threading.Event()
+    buffer = make_buffer(monkeypatch, FakeTable(gate=gate), INGEST_QUEUE_SIZE=1, INGEST_FLUSH_ROWS=1,
+                         INGEST_OVERFLOW='drop')
+    buffer.submit(rows(1))
+    assert wait_for(lambda: buffer.stats()['queue_depth'] == 0)
+    states = [state for state, _ in buffer.submit(rows(3))]
+    assert states == ['queued', 'dropped', 'dropped']
+    assert buffer.stats()['dropped'] == 2
+    gate.set()
+    buffer.shutdown()
+
+def test_failing_batch_is_dead_lettered_after_max_retries(monkeypatch):
+    table = FakeTable(fail_times=100)
+    buffer = make_buffer(monkeypatch, table, INGEST_FLUSH_ROWS=2, INGEST_MAX_RETRIES=2)
+    buffer.submit(rows(2))
+    assert wait_for(lambda: buffer.stats()['dropped'] == 2)
+    assert table.calls == 3
+    assert buffer.stats()['errors'] == 3
+    # El hilo de escritura sigue vivo: el siguiente lote se escribe
+    table.fail_times = 0
+    buffer.submit(rows(2, plant_id=2))
+    assert wait_for(lambda: table.rows == rows(2, plant_id=2))
+    buffer.shutdown()
+
+def test_transient_failure_is_retried(monkeypatch):
+    table = FakeTable(fail_times=1)
+    buffer = make_buffer(monkeypatch, table, INGEST_FLUSH_ROWS=2)
+    buffer.submit(rows(2))
+    assert wait_for(lambda: table.rows == rows(2))
+    assert buffer.stats()['dropped'] == 0 and buffer.stats()['errors'] == 1
+    buffer.shutdown()
+
+def test_shutdown_flushes_the_queue(monkeypatch):
+    table = FakeTable()
+    buffer = make_buffer(monkeypatch, table, INGEST_FLUSH_ROWS=1000, INGEST_FLUSH_INTERVAL_MS=60000)
+    buffer.submit(rows(7))
+    buffer.shutdown()
+    assert table.rows == rows(7)
+    assert not buffer.enabled
+
+@pytest.fixture
+def iot_client(monkeypatch):
+    from controllers import iot_controller
+    plant = {'plant_id': 1, 'species_id': None, 'species_name': 'Unknown'}
+    monkeypatch.setattr(Plant, 'get_plant_by_pot_label', staticmethod(lambda label: plant))
+    monkeypatch.setattr(Plant, 'get_plants_by_pot_labels', staticmethod(lambda labels: {
+        label: plant for label in labels
+    }))
+    gate = threading.Event()
+    buffer = make_buffer(monkeypatch, FakeTable(gate=gate), INGEST_QUEUE_SIZE=1, INGEST_FLUSH_ROWS=1,
+                         INGEST_OVERFLOW='drop')
+    monkeypatch.setattr(iot_controller, 'ingest_buffer', buffer)
+    app = Flask(__name__)
+    app.register_blueprint(iot_controller.iot_bp, url_prefix='/iot')
+    # Primera lectura: la toma el hilo de escritura (bloqueado); segunda: llena la cola
+    buffer.submit(rows(1))
+    assert wait_for(lambda: buffer.stats()['queue_depth'] == 0)
+    buffer.submit(rows(1))
+    yield app.test_client(), {'X-IoT-API-Key': Config.IOT_API_KEY}
+    gate.set()
+    buffer.shutdown()
+
+READING = {'pot_label': 'M1', 'temperature': 21.5, 'humidity': 50, 'moisture': 40, 'light': 300}
+
+def test_dropped_reading_is_not_reported_as_success(iot_client):
+    client, headers = iot_client
+    response = client.post('/iot/sensor-data', json=READING, headers=headers)
+    assert response.status_code == 503
+    response = client.post('/iot/sensor-data/batch', json={'readings': [READING, READING]}, headers=headers)
+    data = response.get_json()
+    assert data['recorded'] == 0 and data['errors'] == 2
+    assert all(result['status'] == 'error' and 'dropped' in result['error'] for result in data['results'])
@@ -0,0 +1,88 @@
+"""
+POST /iot/sensor-data/batch contra una tabla pots en memoria que compara labels
+como MySQL (sin mayúsculas ni espacios finales): lecturas válidas, inválidas y
+de maceteros desconocidos en el mismo lote, labels enteros y caché de labels.
+"""
+import types
+import pytest
+from flask import Flask
+from config import Config
+from models import plant_model
+from models.plant_model import Plant, pot_label_cache
+
+POTS = {'5': (1, 10, None, None), 'M1': (2, 10, None, None)}
+
+class FakeCursor:
+    def __init__(self, queries):
+        self.queries = queries
+        self.rows = []
+
+    def execute(self, sql, params=()):
+        self.queries.append(params)
+        wanted = {str(label).rstrip(' ').lower() for label in params}
+        self.rows = [(label, *plant) for label, plant in POTS.items() if label.lower() in wanted]
+
+    def fetchone(self):
+        return self.rows[0][1:] if self.rows else None
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+@pytest.fixture
+def client(monkeypatch):
+    from controllers import iot_controller
+    queries = []
+    connection = types.SimpleNamespace(cursor=lambda: FakeCursor(queries))
+    monkeypatch.setattr(plant_model, 'db', types.SimpleNamespace(connection=connection))
+    monkeypatch.setattr(Plant, 'create_ambiental_conditions', staticmethod(
+        lambda rows: list(range(100, 100 + len(rows)))
+    ))
+    monkeypatch.setattr(iot_controller.ingest_buffer, 'enabled', False)
+    pot_label_cache.clear()
+    app = Flask(__name__)
+    app.register_blueprint(iot_controller.iot_bp, url_prefix='/iot')
+    yield app.test_client(), queries
+    pot_label_cache.clear()
+
+def post(client, readings):
+    return client.post('/iot/sensor-data/batch', json={'readings': readings},
+                       headers={'X-IoT-API-Key': Config.IOT_API_KEY})
+
+def reading(label, **fields):
+    return dict({'pot_label': label, 'temperature': 21.5, 'humidity': 50, 'moisture': 40, 'light': 300}, **fields)
+
+def test_mixed_valid_invalid_and_unknown_labels(client):
+    client, queries = client
+    response = post(client, [
+        reading(5),
+        reading('m1 '),
+        reading('desconocido'),
+        reading('M1', temperature='caliente'),
+        {'pot_label': 'M1'},
+        reading('5')
+    ])
+    assert response.status_code == 201
+    data = response.get_json()
+    statuses = [result['status'] for result in data['results']]
+    assert statuses == ['success', 'success', 'error', 'error', 'error', 'success']
+    assert [data['results'][i]['plant_id'] for i in (0, 1, 5)] == [1, 2, 1]
+    assert data['results'][2]['error'] == 'Plant not found for this pot label'
+    assert data['results'][3] == {'index': 3, 'status': 'error', 'error': 'Invalid field types',
+                                  'fields': ['temperature']}
+    assert data['results'][4]['error'] == 'Missing required fields'
+    assert (data['received'], data['recorded'], data['errors']) == (6, 3, 3)
+    assert len(queries) == 1, 'todos los maceteros se resuelven en una sola consulta'
+
+def test_labels_share_one_cache_entry(client):
+    client, queries = client
+    post(client, [reading(5), reading('M1')])
+    post(client, [reading('5'), reading('m1')])
+    assert len(queries) == 1
+    assert Plant.get_plant_by_pot_label('M1 ')['plant_id'] == 2
+    assert len(queries) == 1
+    Plant.invalidate_pot_label('m1')
+    assert Plant.get_plant_by_pot_label('M1')['plant_id'] == 2
+    assert len(queries) == 2
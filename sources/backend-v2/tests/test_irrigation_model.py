@@ -0,0 +1,125 @@
+"""
+CompiledForest debe dar exactamente lo mismo que RandomForestRegressor.predict
+(la misma suma árbol a árbol), en filas aleatorias y en los casos límite:
+umbrales exactos, valores fuera de rango, NaN y lotes mayores que chunk_size.
+"""
+import os
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from services.irrigation_model import CompiledForest, CachedPredictor, load_irrigation_model
+
+REAL_MODEL = os.path.join(os.path.dirname(__file__), '..', '..', 'ML', 'modelo_riego_numerico.pkl')
+
+def training_data(rng, n=2000, nan_fraction=0.0):
+    X = np.column_stack([
+        rng.integers(1, 9, n),
+        rng.uniform(0, 100, n),
+        rng.uniform(5, 40, n)
+    ])
+    y = X[:, 0] * 10 + np.maximum(0, 60 - X[:, 1]) * 2 + X[:, 2] + rng.normal(0, 5, n)
+    if nan_fraction:
+        X[rng.random(X.shape) < nan_fraction] = np.nan
+    return X, y
+
+def random_rows(rng, n):
+    return np.column_stack([
+        rng.integers(0, 10, n),
+        rng.uniform(-20, 120, n),
+        rng.uniform(-10, 60, n)
+    ])
+
+def edge_rows(model):
+    # Cada umbral de cada árbol (y su vecino float32 por arriba y por abajo),
+    # aplicado a su feature sobre una fila base
+    rows = []
+    for estimator in model.estimators_[:10]:
+        tree = estimator.tree_
+        for feature, threshold in zip(tree.feature, tree.threshold):
+            if feature < 0:
+                continue
+            t32 = np.float32(threshold)
+            for value in (threshold, t32, np.nextafter(t32, np.float32(np.inf)), np.nextafter(t32, np.float32(-np.inf))):
+                row = [4.0, 50.0, 20.0]
+                row[feature] = float(value)
+                rows.append(row)
+    rows += [[0, 0, 0], [8, 100, 40], [-1e9, -1e9, -1e9], [1e9, 1e9, 1e9], [1, 1e-30, -1e-30]]
+    return np.asarray(rows, dtype=np.float64)
+
+@pytest.fixture(scope='module')
+def model():
+    X, y = training_data(np.random.default_rng(0))
+    return RandomForestRegressor(n_estimators=30, max_depth=12, random_state=0).fit(X, y)
+
+def test_compiled_matches_sklearn_on_random_rows(model):
+    compiled = CompiledForest.from_sklearn(model)
+    rows = random_rows(np.random.default_rng(1), 5000)
+    np.testing.assert_array_equal(compiled.predict(rows), model.predict(rows))
+
+def test_compiled_matches_sklearn_on_thresholds_and_extremes(model):
+    compiled = CompiledForest.from_sklearn(model)
+    rows = edge_rows(model)
+    np.testing.assert_array_equal(compiled.predict(rows), model.predict(rows))
+
+def test_compiled_matches_sklearn_on_single_row_and_chunks(model):
+    compiled = CompiledForest.from_sklearn(model)
+    row = [3, 42.5, 21.0]
+    assert compiled.predict([row])[0] == model.predict([row])[0]
+    rows = random_rows(np.random.default_rng(2), compiled.chunk_size * 2 + 7)
+    np.testing.assert_array_equal(compiled.predict(rows), model.predict(rows))
+
+def test_compiled_matches_sklearn_with_missing_values():
+    rng = np.random.default_rng(3)
+    X, y = training_data(rng, nan_fraction=0.1)
+    model = RandomForestRegressor(n_estimators=20, max_depth=10, random_state=0).fit(X, y)
+    rows = random_rows(rng, 2000)
+    rows[rng.random(rows.shape) < 0.2] = np.nan
+    rows[:3] = np.nan
+    np.testing.assert_array_equal(CompiledForest.from_sklearn(model).predict(rows), model.predict(rows))
+
+def test_saved_arrays_predict_the_same(model, tmp_path):
+    compiled = CompiledForest.from_sklearn(model)
+    path = str(tmp_path / 'forest.compiled.joblib')
+    compiled.save(path)
+    rows = random_rows(np.random.default_rng(4), 1000)
+    np.testing.assert_array_equal(CompiledForest.load(path).predict(rows), model.predict(rows))
+
+@pytest.mark.skipif(not os.path.exists(REAL_MODEL), reason='sin ML/modelo_riego_numerico.pkl')
+def test_real_model_compiled_matches_sklearn(tmp_path):
+    import joblib
+    sklearn_model = joblib.load(REAL_MODEL)
+    path = str(tmp_path / 'modelo_riego_numerico.pkl')
+    joblib.dump(sklearn_model, path)
+    compiled = load_irrigation_model(path, backend='compiled')
+    rows = np.vstack([random_rows(np.random.default_rng(5), 3000), edge_rows(sklearn_model)])
+    np.testing.assert_array_equal(compiled.predict(rows), load_irrigation_model(path, backend='sklearn').predict(rows))
+
+class ConstantPredictor:
+    backend = 'constant'
+
+    def __init__(self, value):
+        self.value = value
+
+    def predict(self, rows):
+        return np.full(len(rows), self.value, dtype=np.float64)
+
+def test_cached_predictor_reloads_in_background_not_in_predict(tmp_path):
+    import time
+    path = tmp_path / 'modelo.pkl'
+    path.write_bytes(b'v1')
+    loads = []
+
+    def load():
+        loads.append(time.monotonic())
+        return ConstantPredictor(float(len(loads)))
+
+    cache = CachedPredictor(load, str(path), maxsize=100, check_interval=0.05)
+    rows = [[1, 40.0, 20.0], [1, 40.2, 20.01]]
+    assert cache.predict(rows).tolist() == [1.0, 1.0]
+    path.write_bytes(b'version 2')
+    deadline = time.monotonic() + 5
+    while cache.stats()['model_reloads'] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert cache.stats()['model_reloads'] == 1
+    assert cache.predict(rows).tolist() == [2.0, 2.0]
+    assert len(loads) == 2
@@ -0,0 +1,51 @@
+"""
+LazyModel y readiness(): un modelo cuya carga falló no cuenta como listo y se
+reintenta en segundo plano desde el propio health check.
+"""
+import time
+import pytest
+from services import model_loader
+from services.model_loader import LazyModel, ModelUnavailable
+
+@pytest.fixture(autouse=True)
+def registry(monkeypatch):
+    monkeypatch.setattr(model_loader, '_registry', {})
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+def test_not_loaded_models_do_not_block_readiness():
+    LazyModel('riego', lambda: object())
+    ready, statuses = model_loader.readiness()
+    assert ready and statuses['riego']['state'] == 'not_loaded'
+
+def test_failed_model_is_not_ready_until_a_retry_succeeds():
+    attempts = []
+
+    def loader():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise FileNotFoundError('modelo.pkl')
+        return 'modelo'
+
+    model = LazyModel('riego', loader, retry_interval=0.05)
+    with pytest.raises(ModelUnavailable):
+        model.get()
+    ready, statuses = model_loader.readiness()
+    assert not ready
+    assert statuses['riego']['state'] == 'failed' and 'modelo.pkl' in statuses['riego']['error']
+
+    time.sleep(0.06)
+    # El health check relanza la carga en segundo plano
+    model_loader.readiness()
+    assert wait_for(lambda: model_loader.readiness()[0])
+    assert model.peek() == 'modelo' and len(attempts) == 2
+
+def test_loading_model_is_not_ready():
+    model = LazyModel('reconocimiento', lambda: time.sleep(0.2) or 'modelo')
+    model.warm_up()
+    assert not model_loader.readiness()[0]
+    assert wait_for(lambda: model_loader.readiness()[0])
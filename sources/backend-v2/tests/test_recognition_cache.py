@@ -0,0 +1,91 @@
+"""
+RecognitionCache con persistencia SQLite: las escrituras van a un hilo de fondo,
+un error de SQLite no llega a quien llama a store() y un miss en memoria se
+busca en el archivo (entradas de otro worker).
+"""
+import sqlite3
+import time
+import numpy as np
+from services.recognition_cache import RecognitionCache, content_hash
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+def test_entries_are_persisted_and_reloaded(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    cache = RecognitionCache(path=path, namespace='keras')
+    probabilities = np.linspace(0, 1, 8, dtype=np.float32)
+    for i in range(150):
+        cache.store(f'key{i}', None, probabilities)
+    assert wait_for(lambda: cache.stats()['persisted'] == 150)
+
+    reloaded = RecognitionCache(path=path, namespace='keras')
+    assert reloaded.stats()['size'] == 150
+    np.testing.assert_array_equal(reloaded._get('key149'), probabilities)
+    assert RecognitionCache(path=path, namespace='tflite:int8').stats()['size'] == 0
+
+def test_sqlite_errors_are_counted_not_raised(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    cache = RecognitionCache(path=path)
+    # Otro proceso borra la tabla: cada lote falla en el hilo de escritura
+    db = sqlite3.connect(path)
+    db.execute('DROP TABLE recognition_cache')
+    db.commit()
+    db.close()
+    cache.store('a', None, np.ones(8))
+    assert wait_for(lambda: cache.stats()['persist_errors'] == 1)
+    assert cache.stats()['size'] == 1
+    probabilities, _ = cache.lookup(b'otra imagen')
+    assert probabilities is None
+
+def test_store_does_not_wait_for_a_locked_database(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    cache = RecognitionCache(path=path)
+    # Un escritor externo mantiene el lock de escritura de SQLite
+    holder = sqlite3.connect(path, isolation_level=None)
+    holder.execute('BEGIN EXCLUSIVE')
+    try:
+        start = time.perf_counter()
+        for i in range(50):
+            cache.store(f'key{i}', None, np.ones(8))
+        assert time.perf_counter() - start < 0.5
+        assert cache.stats()['size'] == 50
+    finally:
+        holder.execute('ROLLBACK')
+        holder.close()
+    assert wait_for(lambda: cache.stats()['persisted'] == 50, timeout=10)
+
+def test_miss_reads_entries_written_by_another_worker(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    worker_a = RecognitionCache(path=path, namespace='keras')
+    worker_b = RecognitionCache(path=path, namespace='keras')
+    image = b'foto de la maceta'
+    probabilities = np.linspace(0, 1, 8, dtype=np.float32)
+    worker_a.store(content_hash(image), None, probabilities)
+    assert wait_for(lambda: worker_a.stats()['persisted'] == 1)
+
+    found, _ = worker_b.lookup(image)
+    np.testing.assert_array_equal(found, probabilities)
+    assert worker_b.stats()['disk_hits'] == 1 and worker_b.stats()['misses'] == 0
+    # Ya está en memoria: el siguiente lookup no va al archivo
+    worker_b.lookup(image)
+    assert worker_b.stats()['hits'] == 1 and worker_b.stats()['disk_hits'] == 1
+    assert RecognitionCache(path=path, namespace='onnx').lookup(image)[0] is None
+
+def test_missing_directory_is_created(tmp_path):
+    path = str(tmp_path / 'no' / 'existe' / 'cache.sqlite')
+    cache = RecognitionCache(path=path)
+    assert cache.stats()['persistent']
+    cache.store('a', None, np.ones(8))
+    assert wait_for(lambda: cache.stats()['persisted'] == 1)
+
+def test_unusable_path_falls_back_to_memory(tmp_path):
+    blocker = tmp_path / 'archivo'
+    blocker.write_text('no es un directorio')
+    cache = RecognitionCache(path=str(blocker / 'cache.sqlite'))
+    assert not cache.stats()['persistent']
+    cache.store('a', None, np.ones(8))
+    assert cache.stats()['size'] == 1
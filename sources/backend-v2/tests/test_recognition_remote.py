@@ -0,0 +1,70 @@
+"""
+/recognition/ con RECOGNITION_MODE=remote contra scripts/stub_ml_service.py:
+formato de respuesta, errores de validación, ML Service caído y que el
+proceso no importa TensorFlow.
+"""
+import importlib
+import io
+import os
+import sys
+import threading
+import pytest
+from flask import Flask
+from config import Config
+from scripts.stub_ml_service import CLASS_NAMES, make_server, recognition_response
+
+@pytest.fixture
+def stub_server():
+    server = make_server(port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def remote(stub_server, monkeypatch):
+    monkeypatch.setattr(Config, 'RECOGNITION_MODE', 'remote')
+    monkeypatch.setattr(Config, 'ML_SERVICE_URL', f'http://127.0.0.1:{stub_server.server_address[1]}')
+    # El modo se decide al importar el controller: se importa de nuevo con esta configuración
+    monkeypatch.delitem(sys.modules, 'controllers.recognition_controller', raising=False)
+    controller = importlib.import_module('controllers.recognition_controller')
+    app = Flask(__name__)
+    app.register_blueprint(controller.recognition_bp, url_prefix='/recognition')
+    yield app.test_client(), controller.ml_client
+    controller.ml_client.session.close()
+    sys.modules.pop('controllers.recognition_controller', None)
+
+def test_response_is_translated_and_connections_reused(remote, stub_server):
+    client, ml_client = remote
+    image = os.urandom(256 * 1024)
+    for _ in range(3):
+        response = client.post('/recognition/', data={'image': (io.BytesIO(image), 'planta.jpg')})
+        assert response.status_code == 200, response.get_json()
+    data = response.get_json()
+    expected = recognition_response(image)
+    assert data['plant_type'] == expected['speciesName']
+    assert data['confidence'] == expected['confidence']
+    assert set(data['all_probabilities']) == set(CLASS_NAMES)
+    assert len(stub_server.handler.connections) == 1, 'las conexiones deben reutilizarse (keep-alive)'
+    assert ml_client.stats()['requests'] == 3
+
+def test_validation_errors(remote):
+    client, _ = remote
+    response = client.post('/recognition/', data={'other': 'x'})
+    assert response.status_code == 400 and response.get_json() == {'error': 'No image file provided'}
+    assert client.post('/recognition/', json={}).status_code == 400
+
+def test_ml_service_down_returns_503(remote, stub_server):
+    client, ml_client = remote
+    stub_server.shutdown()
+    stub_server.server_close()
+    # Los hilos del stub siguen atendiendo las conexiones keep-alive ya abiertas
+    ml_client.session.close()
+    response = client.post('/recognition/', data={'image': (io.BytesIO(b'foto'), 'planta.jpg')})
+    assert response.status_code == 503
+    assert response.get_json() == {'error': 'Recognition service unavailable'}
+    assert ml_client.stats()['errors'] == 1
+
+def test_remote_mode_does_not_import_tensorflow(remote):
+    heavy = [name for name in ('tensorflow', 'tflite_runtime', 'onnxruntime') if name in sys.modules]
+    assert not heavy
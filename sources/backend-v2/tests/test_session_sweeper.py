@@ -0,0 +1,63 @@
+"""
+SessionSweeper con una conexión falsa: en AUTH_SESSION_MODE=db no toca
+revoked_sessions (puede no existir sin la migración 004) y el barrido completa
+sus estadísticas; en stateless sí poda las revocaciones caducadas.
+"""
+import contextlib
+import types
+import pytest
+from services import session_sweeper as sweeper_module
+from services.session_sweeper import SessionSweeper
+
+class FakeCursor:
+    def __init__(self, tables, executed):
+        self.tables = tables
+        self.executed = executed
+        self.rowcount = 0
+        self.row = None
+
+    def execute(self, sql, params=()):
+        self.executed.append(sql)
+        if 'GET_LOCK' in sql:
+            self.row = (1,)
+        elif sql.startswith('DELETE FROM'):
+            table = sql.split()[2]
+            if table not in self.tables:
+                raise RuntimeError(f"Table '{table}' doesn't exist")
+            self.rowcount, self.tables[table] = self.tables[table], 0
+        elif 'information_schema' in sql:
+            self.row = (42, 16384)
+
+    def fetchone(self):
+        return self.row
+
+    def close(self):
+        pass
+
+@pytest.fixture
+def make_sweeper(monkeypatch):
+    def make(mode, tables):
+        executed = []
+        conn = types.SimpleNamespace(cursor=lambda: FakeCursor(tables, executed), commit=lambda: None)
+        monkeypatch.setattr(sweeper_module, 'db', types.SimpleNamespace(
+            checkout=lambda: contextlib.nullcontext(conn)
+        ))
+        sweeper = SessionSweeper()
+        sweeper.batch_size = 100
+        sweeper.pause = 0
+        sweeper.prune_revocations = mode == 'stateless'
+        return sweeper, executed
+    return make
+
+def test_db_mode_skips_revoked_sessions(make_sweeper):
+    sweeper, executed = make_sweeper('db', {'sessions': 3})
+    sweeper.sweep()
+    stats = sweeper.stats()
+    assert stats['sweeps'] == 1 and stats['deleted_sessions'] == 3
+    assert stats['sessions_table'] == {'rows_estimate': 42, 'bytes': 16384}
+    assert not any('revoked_sessions' in sql for sql in executed)
+
+def test_stateless_mode_prunes_revocations(make_sweeper):
+    sweeper, _ = make_sweeper('stateless', {'sessions': 3, 'revoked_sessions': 2})
+    sweeper.sweep()
+    assert sweeper.stats()['deleted_revocations'] == 2
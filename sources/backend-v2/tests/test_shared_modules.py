@@ -0,0 +1,15 @@
+"""
+Los módulos de modelos se editan en sources/shared y sources/shared/sync.py
+los copia a backend-v2/services y backend/ml-service: si este test falla, se
+editó una copia en lugar del original o falta ejecutar el sync.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'shared'))
+
+import sync
+
+def test_vendored_copies_are_in_sync():
+    outdated = sync.outdated()
+    assert not outdated, f'copias desactualizadas (ejecuta python sources/shared/sync.py): {outdated}'
@@ -0,0 +1,154 @@
+"""
+Logging estructurado y no bloqueante para backend-v2.
+
+    from utils.log import get_logger
+    log = get_logger(__name__)
+    log.info('✅ Login successful', user_id=user_id)
+    log.debug('✅ JWT valid', user_id=user_id, sample=0.01)
+
+- Nivel global LOG_LEVEL: si el mensaje no pasa el nivel se descarta antes de
+  construir nada (en producción, LOG_LEVEL=WARNING no cuesta nada por request).
+- Los campos se pasan como kwargs y se escriben como key=value (LOG_FORMAT=text)
+  o como un objeto JSON por línea (LOG_FORMAT=json).
+- sample=r emite solo 1 de cada round(1/r) llamadas con ese mismo mensaje.
+- Los registros se encolan (QueueHandler) y un hilo de fondo (QueueListener)
+  los formatea y escribe; con la cola llena se descartan en vez de bloquear
+  el request (contados en dropped).
+- Tras un fork (workers de gunicorn con preload) el hilo del listener no existe
+  en el hijo: se crea una cola y un listener nuevos automáticamente.
+"""
+import atexit
+import itertools
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
+from config import Config
+
+ROOT_LOGGER = 'potai'
+
+_configure_lock = threading.Lock()
+_listener = None
+_handler = None
+
+class _NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler que no formatea en el hilo que loguea y no espera si la cola está llena."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # El formateo (msg % args, traceback) lo hace el listener en su hilo
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class StructuredFormatter(logging.Formatter):
+    def __init__(self, fmt='text'):
+        super().__init__()
+        self.fmt = fmt
+
+    def format(self, record):
+        fields = getattr(record, 'fields', None) or {}
+        timestamp = datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds')
+        message = record.getMessage()
+        exc_text = self.formatException(record.exc_info) if record.exc_info else None
+        if self.fmt == 'json':
+            entry = {'ts': timestamp, 'level': record.levelname, 'logger': record.name, 'msg': message}
+            entry.update(fields)
+            if exc_text:
+                entry['exc'] = exc_text
+            return json.dumps(entry, ensure_ascii=False, default=str)
+        line = f"{timestamp} {record.levelname:<7} {record.name} {message}"
+        if fields:
+            line += ' ' + ' '.join(f'{key}={value}' for key, value in fields.items())
+        if exc_text:
+            line += '\n' + exc_text
+        return line
+
+def _configure():
+    global _listener, _handler
+    with _configure_lock:
+        if _handler is not None:
+            return
+        stream = logging.StreamHandler(sys.stdout)
+        stream.setFormatter(StructuredFormatter(Config.LOG_FORMAT))
+        _handler = _NonBlockingQueueHandler(queue.Queue(maxsize=Config.LOG_QUEUE_SIZE))
+        root = logging.getLogger(ROOT_LOGGER)
+        root.setLevel(Config.LOG_LEVEL.upper())
+        root.addHandler(_handler)
+        root.propagate = False
+        _listener = logging.handlers.QueueListener(_handler.queue, stream)
+        _listener.start()
+        atexit.register(_stop_listener)
+        os.register_at_fork(after_in_child=_restart_after_fork)
+
+def _stop_listener():
+    if _listener is not None:
+        _listener.stop()
+
+def _restart_after_fork():
+    global _listener
+    _handler.queue = queue.Queue(maxsize=Config.LOG_QUEUE_SIZE)
+    _listener = logging.handlers.QueueListener(_handler.queue, *_listener.handlers)
+    _listener.start()
+
+class StructuredLogger:
+    def __init__(self, logger):
+        self._logger = logger
+        self._counters = {}
+
+    def _sampled(self, msg, rate):
+        if rate >= 1:
+            return True
+        every = max(int(round(1 / rate)), 1)
+        counter = self._counters.get(msg)
+        if counter is None:
+            counter = self._counters.setdefault(msg, itertools.count())
+        return next(counter) % every == 0
+
+    def log(self, level, msg, sample=1.0, exc_info=None, **fields):
+        if not self._logger.isEnabledFor(level):
+            return
+        if sample < 1:
+            if not self._sampled(msg, sample):
+                return
+            fields['sample_rate'] = sample
+        self._logger.log(level, msg, exc_info=exc_info, extra={'fields': fields})
+
+    def debug(self, msg, **fields):
+        self.log(logging.DEBUG, msg, **fields)
+
+    def info(self, msg, **fields):
+        self.log(logging.INFO, msg, **fields)
+
+    def warning(self, msg, **fields):
+        self.log(logging.WARNING, msg, **fields)
+
+    def error(self, msg, **fields):
+        self.log(logging.ERROR, msg, **fields)
+
+    def exception(self, msg, **fields):
+        self.log(logging.ERROR, msg, exc_info=True, **fields)
+
+def get_logger(name):
+    _configure()
+    if not name.startswith(ROOT_LOGGER):
+        name = f'{ROOT_LOGGER}.{name}'
+    return StructuredLogger(logging.getLogger(name))
+
+def stats():
+    return {
+        'level': logging.getLevelName(logging.getLogger(ROOT_LOGGER).level),
+        'queue_depth': _handler.queue.qsize() if _handler is not None else 0,
+        'dropped': _handler.dropped if _handler is not None else 0
+    }
@@ -0,0 +1,18 @@
+"""
+Registro mínimo de métricas del proceso.
+Cada componente registra una función que devuelve un dict con su estado
+y GET /metrics las expone todas juntas.
+"""
+_collectors = {}
+
+def register(name, collector):
+    _collectors[name] = collector
+
+def snapshot():
+    result = {}
+    for name, collector in _collectors.items():
+        try:
+            result[name] = collector()
+        except Exception as e:
+            result[name] = {'error': str(e)}
+    return result
@@ -0,0 +1,12 @@
+"""
+Punto de entrada WSGI para producción:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Con gunicorn.conf.py (preload) la app se crea una vez en el master y los
+hilos de fondo se arrancan en cada worker (post_fork).
+"""
+import os
+from app import create_app
+
+app = create_app(start_background=os.getenv('GUNICORN_PRELOAD') != '1')
@@ -1,14 +1,20 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, abort
 from flask_cors import CORS
+import io
 import os
 import logging
-import tensorflow as tf
-import joblib
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-from PIL import Image
-import io
-import requests
 from dotenv import load_dotenv
+from irrigation_model import load_irrigation_model
+import model_loader
+from model_loader import LazyModel
+from batching import MicroBatcher, BatcherFull
+from recognition_model import load_recognition_model, artifact_path
+from image_preprocessing import decode_image, normalize, BatchBuffer, IMG_HEIGHT, IMG_WIDTH
+from recognition_cache import RecognitionCache
+from species_client import SpeciesClient, CircuitBreaker
 
 load_dotenv()
 
@@ -21,12 +27,69 @@ logger = logging.getLogger(__name__)
 
 PORT = int(os.getenv('PORT', 5000))
 SPECIES_SERVICE_URL = os.getenv('SPECIES_SERVICE_URL', 'http://species-service:3006')
+# Datos de especies en memoria, refrescados en segundo plano
+SPECIES_REFRESH_INTERVAL = float(os.getenv('SPECIES_REFRESH_INTERVAL', 300))
+SPECIES_CONNECT_TIMEOUT = float(os.getenv('SPECIES_CONNECT_TIMEOUT', 1))
+SPECIES_READ_TIMEOUT = float(os.getenv('SPECIES_READ_TIMEOUT', 2))
+SPECIES_BREAKER_THRESHOLD = int(os.getenv('SPECIES_BREAKER_THRESHOLD', 5))
+SPECIES_BREAKER_RESET = float(os.getenv('SPECIES_BREAKER_RESET', 30))
 
 # Configuración del modelo de reconocimiento
-IMG_HEIGHT = 180
-IMG_WIDTH = 180
 RECOGNITION_MODEL_PATH = './models/model-recognition.h5'
 IRRIGATION_MODEL_PATH = './models/modelo_riego_numerico.pkl'
+# 'compiled' (evaluador NumPy) o 'sklearn' (RandomForestRegressor.predict original)
+IRRIGATION_MODEL_BACKEND = os.getenv('IRRIGATION_MODEL_BACKEND', 'compiled')
+# Tablas precalculadas por especie (humedad x temperatura) para el modelo de riego
+IRRIGATION_LOOKUP_TABLE = {
+    'moisture_range': tuple(float(v) for v in os.getenv('IRRIGATION_LUT_MOISTURE_RANGE', '0,100').split(',')),
+    'moisture_step': float(os.getenv('IRRIGATION_LUT_MOISTURE_STEP', 1.0)),
+    'temperature_range': tuple(float(v) for v in os.getenv('IRRIGATION_LUT_TEMPERATURE_RANGE', '0,50').split(',')),
+    'temperature_step': float(os.getenv('IRRIGATION_LUT_TEMPERATURE_STEP', 0.1)),
+    'interpolate': os.getenv('IRRIGATION_LUT_INTERPOLATE', 'false').lower() == 'true'
+} if os.getenv('IRRIGATION_LUT', 'false').lower() == 'true' else None
+# Caché LRU cuantizada de predicciones de riego (opcional: IRRIGATION_CACHE_SIZE > 0)
+IRRIGATION_CACHE = {
+    'maxsize': int(os.getenv('IRRIGATION_CACHE_SIZE', 0)),
+    'moisture_step': float(os.getenv('IRRIGATION_CACHE_MOISTURE_STEP', 1.0)),
+    'temperature_step': float(os.getenv('IRRIGATION_CACHE_TEMPERATURE_STEP', 0.1)),
+    'check_interval': float(os.getenv('IRRIGATION_CACHE_CHECK_INTERVAL', 5))
+}
+if IRRIGATION_CACHE['maxsize'] <= 0:
+    IRRIGATION_CACHE = None
+
+# Backend de inferencia: keras (por defecto) | tf_function | tflite | onnx
+RECOGNITION_BACKEND = os.getenv('RECOGNITION_BACKEND', 'keras')
+RECOGNITION_NUM_THREADS = int(os.getenv('RECOGNITION_NUM_THREADS', 0)) or None
+# Variante cuantizada: vacío = float32, tflite: dynamic | fp16 | int8, onnx: dynamic
+RECOGNITION_VARIANT = os.getenv('RECOGNITION_VARIANT') or None
+# Micro-batching del modelo de reconocimiento (RECOGNITION_MAX_BATCH=1 lo desactiva)
+RECOGNITION_MAX_BATCH = int(os.getenv('RECOGNITION_MAX_BATCH', 16))
+RECOGNITION_MAX_WAIT_MS = float(os.getenv('RECOGNITION_MAX_WAIT_MS', 5))
+RECOGNITION_QUEUE_SIZE = int(os.getenv('RECOGNITION_QUEUE_SIZE', 256))
+RECOGNITION_TIMEOUT = float(os.getenv('RECOGNITION_TIMEOUT', 30))
+# Decode JPEG reducido (modo draft) antes del resize a 180x180 (opcional)
+RECOGNITION_JPEG_DRAFT = os.getenv('RECOGNITION_JPEG_DRAFT', 'false').lower() == 'true'
+# Caché de resultados por hash del contenido (RECOGNITION_CACHE_SIZE=0 la desactiva)
+RECOGNITION_CACHE_SIZE = int(os.getenv('RECOGNITION_CACHE_SIZE', 1000))
+RECOGNITION_CACHE_TTL = int(os.getenv('RECOGNITION_CACHE_TTL', 86400))
+RECOGNITION_CACHE_PERCEPTUAL = os.getenv('RECOGNITION_CACHE_PERCEPTUAL', 'false').lower() == 'true'
+RECOGNITION_CACHE_PATH = os.getenv('RECOGNITION_CACHE_PATH') or None
+# Reconocimiento por lotes (POST /predict/recognition/batch): límite de imágenes y
+# de bytes (descomprimidos) por request, tamaño de cada predict e hilos de decode
+RECOGNITION_BATCH_MAX_IMAGES = int(os.getenv('RECOGNITION_BATCH_MAX_IMAGES', 64))
+RECOGNITION_BATCH_MAX_BYTES = int(os.getenv('RECOGNITION_BATCH_MAX_BYTES', 200 * 1024 * 1024))
+RECOGNITION_BATCH_CHUNK = int(os.getenv('RECOGNITION_BATCH_CHUNK', 32))
+RECOGNITION_DECODE_WORKERS = int(os.getenv('RECOGNITION_DECODE_WORKERS', min(4, os.cpu_count() or 1)))
+# Tamaño máximo del cuerpo de cualquier request (comprimido, tal como llega): por
+# encima se responde 413 sin leerlo. Por defecto el límite descomprimido del lote
+# más 1 MB para las cabeceras multipart
+MAX_REQUEST_BYTES = int(os.getenv('MAX_REQUEST_BYTES', RECOGNITION_BATCH_MAX_BYTES + 1024 * 1024))
+app.config['MAX_CONTENT_LENGTH'] = MAX_REQUEST_BYTES
+# Riego por lotes (POST /predict/irrigation/batch): filas por request y n_jobs
+# (hilos que se reparten el lote; cada uno predice al menos IRRIGATION_BATCH_MIN_ROWS_PER_JOB filas)
+IRRIGATION_BATCH_MAX_ROWS = int(os.getenv('IRRIGATION_BATCH_MAX_ROWS', 100000))
+IRRIGATION_BATCH_MAX_JOBS = int(os.getenv('IRRIGATION_BATCH_MAX_JOBS', os.cpu_count() or 1))
+IRRIGATION_BATCH_MIN_ROWS_PER_JOB = int(os.getenv('IRRIGATION_BATCH_MIN_ROWS_PER_JOB', 5000))
 
 # Clases/etiquetas del modelo (deben coincidir con Species Service)
 CLASS_NAMES = [
@@ -34,41 +97,347 @@ CLASS_NAMES = [
     'oregano', 'orquidea', 'rosachina', 'tomatecherry'
 ]
 
-# Cargar modelos al inicio
-recognition_model = None
-irrigation_model = None
+# Modelos: se cargan en el primer uso o en el warm-up en segundo plano (ML_WARMUP),
+# así el servicio arranca sin importar TensorFlow ni leer los modelos
+ML_WARMUP = os.getenv('ML_WARMUP', 'true').lower() == 'true'
+MODEL_RETRY_INTERVAL = float(os.getenv('MODEL_RETRY_INTERVAL', 30))
+
+def _load_recognition():
+    """Devuelve (modelo, batcher o None)."""
+    model = load_recognition_model(RECOGNITION_MODEL_PATH, backend=RECOGNITION_BACKEND,
+                                   num_threads=RECOGNITION_NUM_THREADS,
+                                   variant=RECOGNITION_VARIANT)
+    recognition_artifact = artifact_path(RECOGNITION_MODEL_PATH, RECOGNITION_BACKEND, RECOGNITION_VARIANT)
+    logger.info(f'✅ Modelo de reconocimiento ({model.backend}) cargado desde {recognition_artifact}')
+    batcher = None
+    if RECOGNITION_MAX_BATCH > 1:
+        batcher = MicroBatcher(
+            model.predict,
+            max_batch_size=RECOGNITION_MAX_BATCH,
+            max_wait_ms=RECOGNITION_MAX_WAIT_MS,
+            max_queue=RECOGNITION_QUEUE_SIZE,
+            buffer=BatchBuffer(RECOGNITION_MAX_BATCH)
+        )
+    return model, batcher
+
+def _load_irrigation():
+    model = load_irrigation_model(IRRIGATION_MODEL_PATH, backend=IRRIGATION_MODEL_BACKEND,
+                                  lookup_table=IRRIGATION_LOOKUP_TABLE,
+                                  cache=IRRIGATION_CACHE)
+    logger.info(f'✅ Modelo de riego ({model.backend}) cargado desde {IRRIGATION_MODEL_PATH}')
+    if hasattr(model, 'stats'):
+        logger.info(f'📊 Estado del modelo de riego: {model.stats()}')
+    return model
+
+recognition = LazyModel('recognition', _load_recognition, retry_interval=MODEL_RETRY_INTERVAL, logger=logger)
+irrigation = LazyModel('irrigation', _load_irrigation, retry_interval=MODEL_RETRY_INTERVAL, logger=logger)
+
+species_client = SpeciesClient(
+    SPECIES_SERVICE_URL,
+    CLASS_NAMES,
+    refresh_interval=SPECIES_REFRESH_INTERVAL,
+    connect_timeout=SPECIES_CONNECT_TIMEOUT,
+    read_timeout=SPECIES_READ_TIMEOUT,
+    breaker=CircuitBreaker(SPECIES_BREAKER_THRESHOLD, SPECIES_BREAKER_RESET),
+    logger=logger
+)
+
+def start_background():
+    """
+    Hilos de fondo: refresco de especies y warm-up de modelos. Con gunicorn
+    (preload) se llama en cada worker tras el fork; los hilos no sobreviven al fork.
+    """
+    species_client.start()
+    if ML_WARMUP:
+        model_loader.warm_up_all()
+
+if os.getenv('GUNICORN_PRELOAD') != '1':
+    start_background()
+
+recognition_cache = RecognitionCache(
+    maxsize=RECOGNITION_CACHE_SIZE,
+    ttl=RECOGNITION_CACHE_TTL,
+    perceptual=RECOGNITION_CACHE_PERCEPTUAL,
+    path=RECOGNITION_CACHE_PATH,
+    namespace=f'{RECOGNITION_BACKEND}:{RECOGNITION_VARIANT}:{RECOGNITION_JPEG_DRAFT}'
+) if RECOGNITION_CACHE_SIZE > 0 else None
+
+# Los hilos se crean en el primer lote (en cada worker, nunca en el master)
+decode_pool = ThreadPoolExecutor(max_workers=RECOGNITION_DECODE_WORKERS, thread_name_prefix='recognition-decode')
+
+irrigation_pool = ThreadPoolExecutor(max_workers=IRRIGATION_BATCH_MAX_JOBS, thread_name_prefix='irrigation-batch')
+
+# Umbral mínimo de riego (ml): por debajo no se riega
+RIEGO_MINIMO = 50
+IRRIGATION_FIELDS = ['speciesId', 'moisture', 'temperature']
+
+class BatchTooLarge(ValueError):
+    """El lote supera RECOGNITION_BATCH_MAX_IMAGES o RECOGNITION_BATCH_MAX_BYTES."""
 
-try:
-    if os.path.exists(RECOGNITION_MODEL_PATH):
-        recognition_model = tf.keras.models.load_model(RECOGNITION_MODEL_PATH)
-        logger.info(f'✅ Modelo de reconocimiento cargado desde {RECOGNITION_MODEL_PATH}')
+def predict_probabilities(recognition_model, recognition_batcher, image_bytes):
+    """Probabilidades del modelo para la imagen, desde la caché si ya se vio."""
+    key = phash = None
+    if recognition_cache is not None:
+        probabilities, key = recognition_cache.lookup(image_bytes)
+        if probabilities is not None:
+            return probabilities
+    
+    # Decodificar (JPEG reducido), redimensionar y normalizar a float32
+    img = decode_image(image_bytes, draft=RECOGNITION_JPEG_DRAFT)
+    if recognition_cache is not None:
+        probabilities, phash = recognition_cache.lookup_image(img)
+        if probabilities is not None:
+            recognition_cache.store(key, phash, probabilities)
+            return probabilities
+    img_array = normalize(np.asarray(img))
+    
+    # Realizar predicción (agrupada con otros requests concurrentes si hay batcher)
+    if recognition_batcher is not None:
+        probabilities = recognition_batcher.predict(img_array, timeout=RECOGNITION_TIMEOUT)
     else:
-        logger.warning(f'⚠️  Modelo de reconocimiento no encontrado: {RECOGNITION_MODEL_PATH}')
-except Exception as e:
-    logger.error(f'❌ Error cargando modelo de reconocimiento: {e}')
-
-try:
-    if os.path.exists(IRRIGATION_MODEL_PATH):
-        irrigation_model = joblib.load(IRRIGATION_MODEL_PATH)
-        logger.info(f'✅ Modelo de riego cargado desde {IRRIGATION_MODEL_PATH}')
+        probabilities = recognition_model.predict(np.expand_dims(img_array, 0))[0]
+    if recognition_cache is not None:
+        recognition_cache.store(key, phash, probabilities)
+    return probabilities
+
+def read_batch_images():
+    """
+    Lista de (nombre, bytes) de los archivos subidos en images/image. Los .zip
+    se expanden a sus imágenes (se ignoran directorios y archivos ocultos).
+    """
+    images = []
+    total_bytes = 0
+
+    def add(name, size, read):
+        nonlocal total_bytes
+        total_bytes += size
+        if len(images) >= RECOGNITION_BATCH_MAX_IMAGES:
+            raise BatchTooLarge(f'More than {RECOGNITION_BATCH_MAX_IMAGES} images in one batch')
+        if total_bytes > RECOGNITION_BATCH_MAX_BYTES:
+            raise BatchTooLarge(f'Batch larger than {RECOGNITION_BATCH_MAX_BYTES} bytes')
+        images.append((name, read()))
+
+    for file in request.files.getlist('images') + request.files.getlist('image'):
+        data = file.read()
+        if not data.startswith(b'PK\x03\x04'):
+            add(file.filename, len(data), lambda: data)
+            continue
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            for info in archive.infolist():
+                name = os.path.basename(info.filename)
+                if info.is_dir() or not name or name.startswith('.') or info.filename.startswith('__MACOSX/'):
+                    continue
+                # file_size del índice se comprueba antes de descomprimir nada
+                add(f'{file.filename}/{info.filename}', info.file_size, lambda: archive.read(info))
+    return images
+
+def _prepare_image(image_bytes, out):
+    """
+    Decodifica y normaliza la imagen en out (en un hilo de decode_pool).
+    Devuelve (probabilidades si estaban en caché o None, content_hash, phash).
+    """
+    key = phash = None
+    if recognition_cache is not None:
+        probabilities, key = recognition_cache.lookup(image_bytes)
+        if probabilities is not None:
+            return probabilities, key, phash
+    img = decode_image(image_bytes, draft=RECOGNITION_JPEG_DRAFT)
+    if recognition_cache is not None:
+        probabilities, phash = recognition_cache.lookup_image(img)
+        if probabilities is not None:
+            recognition_cache.store(key, phash, probabilities)
+            return probabilities, key, phash
+    normalize(np.asarray(img), out=out)
+    return None, key, phash
+
+def predict_batch_probabilities(recognition_model, images):
+    """
+    Probabilidades por imagen, en orden (o la excepción si esa imagen falló).
+    Las imágenes se decodifican en paralelo en decode_pool y las que no están en
+    caché se predicen juntas, en lotes de hasta RECOGNITION_BATCH_CHUNK.
+    """
+    inputs = np.empty((len(images), IMG_HEIGHT, IMG_WIDTH, 3), dtype=np.float32)
+    futures = [decode_pool.submit(_prepare_image, image_bytes, inputs[i])
+               for i, (_, image_bytes) in enumerate(images)]
+    results = [None] * len(images)
+    pending = []
+    for i, future in enumerate(futures):
+        try:
+            probabilities, key, phash = future.result()
+        except Exception as e:
+            results[i] = e
+            continue
+        if probabilities is not None:
+            results[i] = probabilities
+        else:
+            pending.append((i, key, phash))
+
+    for start in range(0, len(pending), RECOGNITION_BATCH_CHUNK):
+        chunk = pending[start:start + RECOGNITION_BATCH_CHUNK]
+        indices = [i for i, _, _ in chunk]
+        try:
+            outputs = recognition_model.predict(inputs[indices])
+        except Exception as e:
+            logger.error(f'Error predicting recognition batch: {str(e)}')
+            for i in indices:
+                results[i] = e
+            continue
+        for (i, key, phash), probabilities in zip(chunk, outputs):
+            results[i] = probabilities
+            if recognition_cache is not None:
+                recognition_cache.store(key, phash, probabilities)
+    return results
+
+class InvalidBatch(ValueError):
+    """Cuerpo de /predict/irrigation/batch mal formado."""
+
+    def __init__(self, message, **details):
+        super().__init__(message)
+        self.details = details
+
+def _float_column(values):
+    """Lista -> array float64; los valores no numéricos quedan como NaN."""
+    try:
+        return np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        column = np.empty(len(values), dtype=np.float64)
+        for i, value in enumerate(values):
+            try:
+                column[i] = float(value)
+            except (TypeError, ValueError):
+                column[i] = np.nan
+        return column
+
+def parse_irrigation_batch(data):
+    """
+    Filas (n, 3) [speciesId, moisture, temperature] de un array JSON de objetos
+    o de un objeto con una lista por campo. Lanza InvalidBatch con los índices
+    de las filas inválidas por campo.
+    """
+    if isinstance(data, list):
+        columns = {
+            field: [row.get(field) if isinstance(row, dict) else None for row in data]
+            for field in IRRIGATION_FIELDS
+        }
+    elif isinstance(data, dict):
+        missing = [field for field in IRRIGATION_FIELDS if not isinstance(data.get(field), list)]
+        if missing:
+            raise InvalidBatch('Missing required fields', missing=missing)
+        columns = {field: data[field] for field in IRRIGATION_FIELDS}
+        if len({len(column) for column in columns.values()}) > 1:
+            raise InvalidBatch('Columns must have the same length',
+                               lengths={field: len(column) for field, column in columns.items()})
     else:
-        logger.warning(f'⚠️  Modelo de riego no encontrado: {IRRIGATION_MODEL_PATH}')
-except Exception as e:
-    logger.error(f'❌ Error cargando modelo de riego: {e}')
+        raise InvalidBatch('Body must be a JSON array or an object of arrays')
+    
+    n_rows = len(columns['speciesId'])
+    if n_rows == 0:
+        raise InvalidBatch('No rows provided')
+    if n_rows > IRRIGATION_BATCH_MAX_ROWS:
+        raise InvalidBatch(f'More than {IRRIGATION_BATCH_MAX_ROWS} rows in one batch')
+    
+    rows = np.column_stack([_float_column(columns[field]) for field in IRRIGATION_FIELDS])
+    invalid = ~np.isfinite(rows)
+    invalid[:, 0] |= rows[:, 0] != np.floor(rows[:, 0])
+    if invalid.any():
+        raise InvalidBatch('Invalid data types', invalid={
+            field: np.flatnonzero(invalid[:, i])[:100].tolist()
+            for i, field in enumerate(IRRIGATION_FIELDS) if invalid[:, i].any()
+        }, invalidRows=int(invalid.any(axis=1).sum()))
+    return rows
+
+def predict_irrigation_rows(irrigation_model, rows, n_jobs=1):
+    """ml predichos para las filas: un predict, o n_jobs en paralelo sobre trozos contiguos."""
+    n_jobs = max(1, min(n_jobs, IRRIGATION_BATCH_MAX_JOBS, len(rows) // IRRIGATION_BATCH_MIN_ROWS_PER_JOB))
+    if n_jobs == 1:
+        return np.asarray(irrigation_model.predict(rows), dtype=np.float64)
+    chunks = np.array_split(rows, n_jobs)
+    return np.concatenate(list(irrigation_pool.map(irrigation_model.predict, chunks)))
+
+def recognition_result(probabilities):
+    """Respuesta de reconocimiento (especie, confianza, todas las predicciones y datos de la especie)."""
+    top_index = np.argmax(probabilities)
+    confidence = float(probabilities[top_index] * 100)
+    predicted_species = CLASS_NAMES[top_index]
+    
+    # Datos de la especie desde memoria (precargados del Species Service)
+    species_data = species_client.get(predicted_species)
+    species_id = species_data['id'] if species_data else None
+    if species_data is None:
+        logger.warning(f'⚠️  Especie no disponible: {predicted_species}')
+    
+    # Preparar todas las predicciones ordenadas por confianza
+    all_predictions = [
+        {
+            'species': CLASS_NAMES[i],
+            'confidence': round(float(probabilities[i] * 100), 2)
+        }
+        for i in range(len(CLASS_NAMES))
+    ]
+    all_predictions.sort(key=lambda x: x['confidence'], reverse=True)
+    
+    response = {
+        'speciesName': predicted_species,
+        'speciesId': species_id,
+        'confidence': round(confidence, 2),
+        'allPredictions': all_predictions
+    }
+    
+    # Si encontramos datos de la especie, incluirlos
+    if species_data:
+        response['speciesData'] = {
+            'id': species_data['id'],
+            'commonName': species_data['commonName'],
+            'scientificName': species_data.get('scientificName'),
+            'waterRequirements': species_data.get('waterRequirements'),
+            'lightRequirements': species_data.get('lightRequirements'),
+            'humidityRequirements': species_data.get('humidityRequirements')
+        }
+    return response
 
 @app.route('/health', methods=['GET'])
 def health():
+    recognition_loaded = recognition.peek()
+    irrigation_model = irrigation.peek()
     return jsonify({
         'status': 'healthy',
         'service': 'ml-service',
         'models': {
-            'recognition': 'loaded' if recognition_model is not None else 'not_loaded',
-            'irrigation': 'loaded' if irrigation_model is not None else 'not_loaded'
+            'recognition': 'loaded' if recognition_loaded is not None else recognition.state,
+            'irrigation': 'loaded' if irrigation_model is not None else irrigation.state
         },
+        'recognitionBackend': recognition_loaded[0].backend if recognition_loaded is not None else None,
+        'recognitionVariant': RECOGNITION_VARIANT,
+        'irrigationBackend': irrigation_model.backend if irrigation_model is not None else None,
         'speciesServiceUrl': SPECIES_SERVICE_URL,
         'availableSpecies': CLASS_NAMES
     })
 
+@app.route('/health/live', methods=['GET'])
+def liveness():
+    # El proceso responde; no depende de que los modelos estén cargados
+    return jsonify({'status': 'alive'}), 200
+
+@app.route('/health/ready', methods=['GET'])
+def readiness():
+    ready, models = model_loader.readiness()
+    return jsonify({
+        'status': 'ready' if ready else 'not_ready',
+        'models': models
+    }), 200 if ready else 503
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    irrigation_model = irrigation.peek()
+    loaded = recognition.peek()
+    recognition_batcher = loaded[1] if loaded is not None else None
+    return jsonify({
+        'irrigation': irrigation_model.stats() if hasattr(irrigation_model, 'stats') else None,
+        'recognitionBatching': recognition_batcher.stats() if recognition_batcher is not None else None,
+        'recognitionCache': recognition_cache.stats() if recognition_cache is not None else None,
+        'species': species_client.stats()
+    })
+
 @app.route('/', methods=['GET'])
 def home():
     return jsonify({
@@ -76,7 +445,9 @@ def home():
         'version': '1.0.0',
         'endpoints': {
             'recognition': 'POST /predict/recognition',
-            'irrigation': 'POST /predict/irrigation'
+            'recognitionBatch': 'POST /predict/recognition/batch',
+            'irrigation': 'POST /predict/irrigation',
+            'irrigationBatch': 'POST /predict/irrigation/batch'
         }
     })
 
@@ -100,7 +471,8 @@ def predict_recognition():
             ]
         }
     """
-    if recognition_model is None:
+    loaded = recognition.get_or_none()
+    if loaded is None:
         return jsonify({
             'error': 'Recognition model not loaded',
             'message': 'Model file not found or failed to load'
@@ -118,82 +490,17 @@ def predict_recognition():
     try:
         # Leer la imagen desde el archivo
         image_bytes = file.read()
-        img = Image.open(io.BytesIO(image_bytes))
-        
-        # Convertir a RGB si es necesario
-        if img.mode != 'RGB':
-            img = img.convert('RGB')
-        
-        # Redimensionar
-        img = img.resize((IMG_WIDTH, IMG_HEIGHT))
         
-        # Convertir a array y normalizar
-        img_array = np.array(img)
-        img_array = np.expand_dims(img_array, 0)  # Agregar dimensión de batch
-        img_array = img_array / 255.0  # Normalizar
-        
-        # Realizar predicción
-        predictions = recognition_model.predict(img_array, verbose=0)
-        probabilities = predictions[0]
-        top_index = np.argmax(probabilities)
-        confidence = float(probabilities[top_index] * 100)
-        predicted_species = CLASS_NAMES[top_index]
-        
-        # Buscar species en Species Service
-        species_data = None
-        species_id = None
-        
-        try:
-            # Buscar por nombre común (sin tildes)
-            search_response = requests.get(
-                f'{SPECIES_SERVICE_URL}/species/search',
-                params={'q': predicted_species},
-                timeout=5
-            )
-            
-            if search_response.status_code == 200:
-                search_result = search_response.json()
-                if search_result.get('species'):
-                    species_data = search_result['species']
-                    species_id = species_data['id']
-                    logger.info(f'✅ Especie encontrada: {species_data["commonName"]} (ID: {species_id})')
-                else:
-                    logger.warning(f'⚠️  Especie no encontrada en base de datos: {predicted_species}')
-            else:
-                logger.error(f'❌ Error buscando especie: {search_response.status_code}')
-        except Exception as e:
-            logger.error(f'❌ Error comunicándose con Species Service: {e}')
-        
-        # Preparar todas las predicciones ordenadas por confianza
-        all_predictions = [
-            {
-                'species': CLASS_NAMES[i],
-                'confidence': round(float(probabilities[i] * 100), 2)
-            }
-            for i in range(len(CLASS_NAMES))
-        ]
-        all_predictions.sort(key=lambda x: x['confidence'], reverse=True)
-        
-        response = {
-            'speciesName': predicted_species,
-            'speciesId': species_id,
-            'confidence': round(confidence, 2),
-            'allPredictions': all_predictions
-        }
-        
-        # Si encontramos datos de la especie, incluirlos
-        if species_data:
-            response['speciesData'] = {
-                'id': species_data['id'],
-                'commonName': species_data['commonName'],
-                'scientificName': species_data.get('scientificName'),
-                'waterRequirements': species_data.get('waterRequirements'),
-                'lightRequirements': species_data.get('lightRequirements'),
-                'humidityRequirements': species_data.get('humidityRequirements')
-            }
-        
-        return jsonify(response), 200
+        # Realizar predicción (o reutilizar la de una subida idéntica)
+        probabilities = predict_probabilities(*loaded, image_bytes)
+        return jsonify(recognition_result(probabilities)), 200
         
+    except BatcherFull as e:
+        logger.warning(f'⚠️  {e}')
+        return jsonify({
+            'error': 'Recognition service busy',
+            'message': str(e)
+        }), 503
     except Exception as e:
         logger.error(f'Error processing image: {str(e)}')
         return jsonify({
@@ -201,6 +508,65 @@ def predict_recognition():
             'message': str(e)
         }), 500
 
+@app.route('/predict/recognition/batch', methods=['POST'])
+def predict_recognition_batch():
+    """
+    Reconoce varias plantas en un solo request.
+    
+    Request (multipart/form-data):
+        - images: varios archivos de imagen y/o archivos .zip con imágenes
+    
+    Response (results en el mismo orden que las imágenes; un error en una
+    imagen no hace fallar el resto):
+        {
+            "count": 3,
+            "succeeded": 2,
+            "failed": 1,
+            "results": [
+                {"index": 0, "filename": "maceta1.jpg", "speciesName": "rosachina", "confidence": 95.5, ...},
+                {"index": 1, "filename": "fotos.zip/maceta2.jpg", "error": "Error processing image: ..."},
+                ...
+            ]
+        }
+    """
+    # Se rechaza por Content-Length antes de esperar al modelo; un cuerpo sin
+    # longitud (chunked) lo corta Werkzeug al superar MAX_CONTENT_LENGTH
+    if (request.content_length or 0) > app.config['MAX_CONTENT_LENGTH']:
+        abort(413)
+    loaded = recognition.get_or_none()
+    if loaded is None:
+        return jsonify({
+            'error': 'Recognition model not loaded',
+            'message': 'Model file not found or failed to load'
+        }), 503
+    
+    try:
+        images = read_batch_images()
+    except BatchTooLarge as e:
+        return jsonify({'error': 'Batch too large', 'message': str(e)}), 413
+    except zipfile.BadZipFile as e:
+        return jsonify({'error': 'Invalid zip archive', 'message': str(e)}), 400
+    
+    if not images:
+        return jsonify({'error': 'No image files provided'}), 400
+    
+    outcomes = predict_batch_probabilities(loaded[0], images)
+    results = []
+    for index, ((filename, _), outcome) in enumerate(zip(images, outcomes)):
+        if isinstance(outcome, Exception):
+            results.append({'index': index, 'filename': filename,
+                            'error': f'Error processing image: {str(outcome)}'})
+        else:
+            results.append({'index': index, 'filename': filename, **recognition_result(outcome)})
+    failed = sum(1 for result in results if 'error' in result)
+    
+    return jsonify({
+        'count': len(results),
+        'succeeded': len(results) - failed,
+        'failed': failed,
+        'results': results
+    }), 200
+
 @app.route('/predict/irrigation', methods=['POST'])
 def predict_irrigation():
     """
@@ -222,6 +588,7 @@ def predict_irrigation():
             "confidence": 0.87
         }
     """
+    irrigation_model = irrigation.get_or_none()
     if irrigation_model is None:
         return jsonify({
             'error': 'Irrigation model not loaded',
@@ -248,20 +615,10 @@ def predict_irrigation():
         moisture = float(data['moisture'])
         temperature = float(data['temperature'])
         
-        # Preparar datos para el modelo: [speciesId, moisture, temperature]
-        import pandas as pd
-        input_data = pd.DataFrame([[
-            species_id,
-            moisture,
-            temperature
-        ]], columns=['localname', 'moisture', 'temperature'])
-        
-        # Predecir cantidad de riego en ml
-        predicted_ml = irrigation_model.predict(input_data)[0]
+        # Predecir cantidad de riego en ml: [speciesId, moisture, temperature]
+        predicted_ml = float(irrigation_model.predict([(species_id, moisture, temperature)])[0])
         predicted_ml = max(0, predicted_ml)  # No valores negativos
         
-        # Umbral mínimo de riego
-        RIEGO_MINIMO = 50
         needs_watering = predicted_ml >= RIEGO_MINIMO
         
         return jsonify({
@@ -283,6 +640,65 @@ def predict_irrigation():
             'message': str(e)
         }), 500
 
+@app.route('/predict/irrigation/batch', methods=['POST'])
+def predict_irrigation_batch():
+    """
+    Predice el riego de muchas macetas con una sola llamada al modelo.
+    
+    Request Body (JSON), filas u columnas:
+        [{"speciesId": 1, "moisture": 35.5, "temperature": 25.0}, ...]
+        {"speciesId": [1, 2], "moisture": [35.5, 60.0], "temperature": [25.0, 18.5]}
+    
+    Query: n_jobs (opcional) reparte lotes grandes entre varios hilos.
+    
+    Response (columnas en el orden de entrada):
+        {
+            "count": 2,
+            "needsWatering": [true, false],
+            "waterAmountMl": [250.0, 12.4],
+            "thresholdMl": 50
+        }
+    """
+    irrigation_model = irrigation.get_or_none()
+    if irrigation_model is None:
+        return jsonify({
+            'error': 'Irrigation model not loaded',
+            'message': 'Model file not found or failed to load'
+        }), 503
+    
+    data = request.get_json(silent=True)
+    if data is None:
+        return jsonify({'error': 'No JSON data provided'}), 400
+    
+    try:
+        rows = parse_irrigation_batch(data)
+        n_jobs = request.args.get('n_jobs', 1, type=int)
+    except InvalidBatch as e:
+        return jsonify({'error': str(e), **e.details}), 400
+    
+    try:
+        predicted_ml = np.maximum(predict_irrigation_rows(irrigation_model, rows, n_jobs), 0)
+    except Exception as e:
+        logger.error(f'Error predicting irrigation batch: {str(e)}')
+        return jsonify({
+            'error': 'Error predicting irrigation',
+            'message': str(e)
+        }), 500
+    
+    return jsonify({
+        'count': len(predicted_ml),
+        'needsWatering': (predicted_ml >= RIEGO_MINIMO).tolist(),
+        'waterAmountMl': np.round(predicted_ml, 2).tolist(),
+        'thresholdMl': RIEGO_MINIMO
+    }), 200
+
+@app.errorhandler(413)
+def request_too_large(error):
+    return jsonify({
+        'error': 'Request too large',
+        'message': f'Request body larger than {MAX_REQUEST_BYTES} bytes'
+    }), 413
+
 @app.errorhandler(Exception)
 def handle_error(error):
     logger.error(f'Error: {str(error)}')
@@ -291,6 +707,7 @@ def handle_error(error):
         'message': str(error)
     }), 500
 
+# Solo para desarrollo; en producción: gunicorn -c gunicorn.conf.py app:app
 if __name__ == '__main__':
     logger.info(f'🤖 ML Service starting on port {PORT}')
     app.run(host='0.0.0.0', port=PORT, debug=True)
@@ -0,0 +1,129 @@
+"""
+Micro-batching dinámico para el modelo de reconocimiento.
+
+Cada request encola su imagen ya preprocesada y espera su resultado. Un hilo
+de fondo toma la primera imagen de la cola y sigue juntando hasta max_batch_size
+imágenes o hasta que pasan max_wait_ms desde que llegó la primera, lo que
+ocurra antes; ejecuta un solo predict sobre el lote y reparte cada fila a su
+request. Con tráfico bajo la latencia añadida es como mucho max_wait_ms; con
+tráfico alto los lotes se llenan solos y la espera es casi nula.
+Si el proceso hace fork (gunicorn --preload) el hijo arranca su propio hilo.
+"""
+import os
+import queue
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future
+import numpy as np
+
+class BatcherFull(Exception):
+    """La cola del batcher está llena (el servicio está saturado)."""
+
+class MicroBatcher:
+    def __init__(self, predict_fn, max_batch_size=16, max_wait_ms=5.0, max_queue=256,
+                 latency_window=1000, name='recognition-batcher', buffer=None):
+        self.predict_fn = predict_fn
+        # BatchBuffer opcional: los lotes se apilan en él en vez de en un array nuevo
+        self.buffer = buffer
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._max_queue = max_queue
+        self._name = name
+        self._batch_sizes = Counter()
+        self._queue_waits = deque(maxlen=latency_window)
+        self._inference_ms = deque(maxlen=latency_window)
+        self.requests = 0
+        self.batches = 0
+        self.rejected = 0
+        self.errors = 0
+        self._start()
+        os.register_at_fork(after_in_child=self._start)
+
+    def _start(self):
+        self._stats_lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=self._max_queue)
+        self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+        self._thread.start()
+
+    def submit(self, item):
+        """Encola una entrada (sin dimensión de batch) y devuelve un Future con su salida."""
+        future = Future()
+        try:
+            self._queue.put_nowait((item, future, time.perf_counter()))
+        except queue.Full:
+            with self._stats_lock:
+                self.rejected += 1
+            raise BatcherFull(f'Recognition queue full ({self._queue.maxsize} pending)')
+        return future
+
+    def predict(self, item, timeout=None):
+        return self.submit(item).result(timeout)
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = batch[0][2] + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            try:
+                items = [item for item, _, _ in batch]
+                if self.buffer is not None:
+                    inputs = np.stack(items, out=self.buffer.batch(len(items)))
+                else:
+                    inputs = np.stack(items)
+                outputs = self.predict_fn(inputs)
+                for (_, future, _), output in zip(batch, outputs):
+                    future.set_result(output)
+            except Exception as e:
+                with self._stats_lock:
+                    self.errors += 1
+                for _, future, _ in batch:
+                    future.set_exception(e)
+            finished = time.perf_counter()
+            with self._stats_lock:
+                self.requests += len(batch)
+                self.batches += 1
+                self._batch_sizes[len(batch)] += 1
+                self._queue_waits.extend((started - enqueued) * 1000 for _, _, enqueued in batch)
+                self._inference_ms.append((finished - started) * 1000)
+
+    @staticmethod
+    def _summary(values):
+        if not values:
+            return None
+        values = np.asarray(values)
+        return {
+            'avg': round(float(values.mean()), 3),
+            'p50': round(float(np.percentile(values, 50)), 3),
+            'p95': round(float(np.percentile(values, 95)), 3),
+            'max': round(float(values.max()), 3)
+        }
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait * 1000,
+                'queue_depth': self._queue.qsize(),
+                'requests': self.requests,
+                'batches': self.batches,
+                'avg_batch_size': round(self.requests / self.batches, 3) if self.batches else 0.0,
+                'batch_sizes': {str(size): count for size, count in sorted(self._batch_sizes.items())},
+                'added_latency_ms': self._summary(self._queue_waits),
+                'inference_ms': self._summary(self._inference_ms),
+                'rejected': self.rejected,
+                'errors': self.errors
+            }
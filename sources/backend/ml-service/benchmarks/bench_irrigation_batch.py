@@ -0,0 +1,64 @@
+"""
+Throughput de POST /predict/irrigation/batch frente a POST /predict/irrigation
+(una maceta por request), en proceso con el Flask test client y el modelo real.
+Comprueba además que batch, batch con n_jobs y single dan los mismos ml.
+
+Uso (desde ml-service, con models/modelo_riego_numerico.pkl):
+    python benchmarks/bench_irrigation_batch.py [--rows 20000] [--single 2000] [--n-jobs 4]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('ML_WARMUP', 'false')
+os.environ.setdefault('SPECIES_SERVICE_URL', 'http://127.0.0.1:9')
+
+import numpy as np
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--single', type=int, default=2000)
+    parser.add_argument('--n-jobs', type=int, default=4)
+    args = parser.parse_args()
+
+    import app as ml_app
+    model = ml_app.irrigation.get()
+    client = ml_app.app.test_client()
+    clear = getattr(model, 'clear', lambda: None)
+
+    rng = np.random.default_rng(0)
+    columns = {
+        'speciesId': rng.integers(1, 9, args.rows).tolist(),
+        'moisture': rng.uniform(0, 100, args.rows).round(1).tolist(),
+        'temperature': rng.uniform(5, 40, args.rows).round(1).tolist()
+    }
+    rows = [dict(zip(columns, values)) for values in zip(*columns.values())]
+    print(f'Modelo: {model.backend}, filas: {args.rows}\n')
+
+    def timed(label, fn, count):
+        clear()
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        print(f'{label:<32} {elapsed * 1000:>9.1f} ms  {count / elapsed:>10.0f} filas/s')
+        return result
+
+    single = timed(f'single x{args.single}', lambda: [
+        client.post('/predict/irrigation', json=row).get_json()['waterAmountMl'] for row in rows[:args.single]
+    ], args.single)
+    columnar = timed('batch, columnas', lambda: client.post('/predict/irrigation/batch', json=columns).get_json(),
+                     args.rows)
+    array = timed('batch, array de objetos', lambda: client.post('/predict/irrigation/batch', json=rows).get_json(),
+                  args.rows)
+    parallel = timed(f'batch, columnas, n_jobs={args.n_jobs}', lambda: client.post(
+        f'/predict/irrigation/batch?n_jobs={args.n_jobs}', json=columns).get_json(), args.rows)
+
+    assert columnar == array == parallel, 'los resultados del lote deben coincidir'
+    assert np.allclose(single, columnar['waterAmountMl'][:args.single]), 'batch y single deben coincidir'
+    print('\n✅ batch, n_jobs y single coinciden')
+
+if __name__ == '__main__':
+    main()
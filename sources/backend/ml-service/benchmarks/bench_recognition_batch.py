@@ -0,0 +1,167 @@
+"""
+Throughput de POST /predict/recognition/batch frente a POST /predict/recognition
+(una imagen por request, en secuencia y con varios clientes concurrentes).
+
+Por defecto ejecuta la app en proceso (Flask test client, sin red). Si el modelo
+real no se puede cargar (sin TensorFlow o sin el .h5) se usa un modelo de
+sustitución en NumPy (una capa densa 180*180*3 -> 8 + softmax): el coste del
+modelo no es el real, pero sí el del decode, el preprocesado, el micro-batching
+y el manejo del request. Con --url se mide contra un ml-service en marcha.
+
+Sin --images genera fotos sintéticas JPEG de --width x --height. En proceso,
+sin SPECIES_SERVICE_URL se arranca scripts/stub_species_server.py.
+
+Uso (desde ml-service):
+    python benchmarks/bench_recognition_batch.py [--images dir] [--count 48] [--clients 8]
+    python benchmarks/bench_recognition_batch.py --url http://localhost:5000
+"""
+import argparse
+import io
+import os
+import sys
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('ML_WARMUP', 'false')
+os.environ.setdefault('RECOGNITION_CACHE_SIZE', '0')
+os.environ.setdefault('MODEL_RETRY_INTERVAL', '0')
+
+import numpy as np
+from PIL import Image
+
+def synthetic_photos(count, width, height):
+    rng = np.random.default_rng(42)
+    y, x = np.mgrid[0:height, 0:width]
+    base = np.stack([(x * 255 // width), (y * 255 // height), ((x + y) * 255 // (width + height))], axis=-1)
+    photos = []
+    for _ in range(count):
+        # Gradientes suaves + ruido: se comprime como una foto, no como ruido puro
+        noise = rng.integers(0, 30, (height, width, 3))
+        buffer = io.BytesIO()
+        Image.fromarray(np.clip(base + noise, 0, 255).astype(np.uint8)).save(buffer, 'JPEG', quality=90)
+        photos.append(buffer.getvalue())
+    return photos
+
+def load_photos(directory, limit):
+    photos = []
+    for name in sorted(os.listdir(directory))[:limit]:
+        with open(os.path.join(directory, name), 'rb') as f:
+            photos.append(f.read())
+    return photos
+
+class StandInModel:
+    """Modelo de sustitución: misma entrada/salida que la CNN, coste distinto."""
+    backend = 'stand-in'
+
+    def __init__(self, classes=8):
+        rng = np.random.default_rng(0)
+        self.weights = rng.standard_normal((180 * 180 * 3, classes)).astype(np.float32) / 100
+
+    def predict(self, batch):
+        logits = batch.reshape(len(batch), -1) @ self.weights
+        exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+        return exp / exp.sum(axis=1, keepdims=True)
+
+def local_client(stand_in):
+    # Species Service de prueba para que los datos de especie no dependan de la red
+    if 'SPECIES_SERVICE_URL' not in os.environ:
+        import threading
+        from scripts.stub_species_server import make_server
+        server = make_server(port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        os.environ['SPECIES_SERVICE_URL'] = f'http://127.0.0.1:{server.server_address[1]}'
+    import app as ml_app
+    if stand_in:
+        ml_app.load_recognition_model = lambda *args, **kwargs: StandInModel()
+    ml_app.recognition.warm_up(background=False)
+    if ml_app.recognition.peek() is None:
+        raise SystemExit(f'❌ No se pudo cargar el modelo: {ml_app.recognition.error}')
+    flask_client = ml_app.app.test_client()
+
+    def post(path, files):
+        data = {'images' if len(files) > 1 or path.endswith('batch') else 'image': files}
+        response = flask_client.post(path, data=data, content_type='multipart/form-data')
+        return response.status_code, response.get_json()
+
+    return post, ml_app.recognition.peek()[0].backend
+
+def remote_client(url):
+    import requests
+    session = requests.Session()
+
+    def post(path, files):
+        field = 'images' if path.endswith('batch') else 'image'
+        response = session.post(f'{url.rstrip("/")}{path}',
+                                files=[(field, (name, stream)) for stream, name in files], timeout=300)
+        return response.status_code, response.json()
+
+    return post, url
+
+def as_files(photos, names):
+    return [(io.BytesIO(photo), name) for photo, name in zip(photos, names)]
+
+def run(label, fn, count):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f'{label:<42} {elapsed * 1000:>9.1f} ms  {count / elapsed:>8.1f} img/s')
+    return count / elapsed
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--images')
+    parser.add_argument('--count', type=int, default=48)
+    parser.add_argument('--width', type=int, default=1600)
+    parser.add_argument('--height', type=int, default=1200)
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--url')
+    args = parser.parse_args()
+
+    photos = load_photos(args.images, args.count) if args.images else synthetic_photos(args.count, args.width, args.height)
+    names = [f'planta{i}.jpg' for i in range(len(photos))]
+    count = len(photos)
+
+    if args.url:
+        post, model = remote_client(args.url)
+    else:
+        try:
+            post, model = local_client(stand_in=False)
+        except (SystemExit, ImportError):
+            print('⚠️  Modelo real no disponible: se usa el modelo de sustitución (NumPy)')
+            post, model = local_client(stand_in=True)
+    print(f'{count} imágenes, modelo: {model}, cpus: {os.cpu_count()}\n')
+
+    def single_sequential():
+        for photo, name in zip(photos, names):
+            status, _ = post('/predict/recognition', as_files([photo], [name]))
+            assert status == 200, status
+
+    def single_concurrent():
+        with ThreadPoolExecutor(args.clients) as pool:
+            statuses = list(pool.map(lambda i: post('/predict/recognition', as_files([photos[i]], [names[i]]))[0],
+                                     range(count)))
+        assert statuses == [200] * count, statuses
+
+    def batch():
+        status, body = post('/predict/recognition/batch', as_files(photos, names))
+        assert status == 200 and body['succeeded'] == count, body
+
+    def batch_zip():
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, 'w', zipfile.ZIP_STORED) as zf:
+            for photo, name in zip(photos, names):
+                zf.writestr(name, photo)
+        status, body = post('/predict/recognition/batch', [(io.BytesIO(archive.getvalue()), 'fotos.zip')])
+        assert status == 200 and body['succeeded'] == count, body
+
+    batch()  # calentamiento (hilos de decode, primer predict)
+    baseline = run('single, secuencial', single_sequential, count)
+    run(f'single, {args.clients} clientes concurrentes', single_concurrent, count)
+    batched = run('batch (1 request, multipart)', batch, count)
+    run('batch (1 request, zip)', batch_zip, count)
+    print(f'\nbatch vs single secuencial: x{batched / baseline:.2f}')
+
+if __name__ == '__main__':
+    main()
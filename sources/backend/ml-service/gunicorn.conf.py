@@ -0,0 +1,48 @@
+"""
+Configuración de gunicorn para el ML Service (prefork con modelos compartidos).
+
+    gunicorn -c gunicorn.conf.py app:app
+
+- preload_app: el master importa app.py y carga los modelos de PRELOAD_MODELS
+  antes de hacer fork; los workers los heredan copy-on-write. El modelo de riego
+  se lee con joblib mmap_mode='r' (modelo_riego_numerico.compiled.joblib).
+- El modelo de reconocimiento (TensorFlow/TFLite/ONNX Runtime) no es seguro
+  tras fork: cada worker lo carga (ML_WARMUP) junto con su micro-batcher.
+  Con TensorFlow conviene pocos workers y RECOGNITION_NUM_THREADS acotado:
+  workers x hilos de inferencia <= núcleos.
+- El refresco de especies y el warm-up arrancan en cada worker (post_fork).
+- Recarga sin cortar requests: kill -HUP <master>; para desplegar código nuevo
+  kill -USR2 <master> y después kill -QUIT al master viejo.
+
+Memoria por worker: python ../../backend-v2/scripts/measure_worker_memory.py <pid del master>.
+"""
+import gc
+import os
+
+bind = os.getenv('GUNICORN_BIND', f"0.0.0.0:{os.getenv('PORT', 5000)}")
+workers = int(os.getenv('WEB_CONCURRENCY', 2))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 8))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 0))
+preload_app = True
+PRELOAD_MODELS = [name for name in os.getenv('PRELOAD_MODELS', 'irrigation').split(',') if name]
+
+# app.py no arranca hilos de fondo al importarse; se arrancan post_fork en cada worker
+os.environ['GUNICORN_PRELOAD'] = '1'
+
+def when_ready(server):
+    import model_loader
+    for name in PRELOAD_MODELS:
+        model = model_loader.get_model(name)
+        model.warm_up(background=False)
+        server.log.info(f'📦 Modelo {name} precargado en el master: {model.state}')
+    gc.collect()
+    gc.freeze()
+
+def post_fork(server, worker):
+    from app import start_background
+    start_background()
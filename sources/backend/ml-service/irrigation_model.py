@@ -0,0 +1,462 @@
+# Copia generada desde sources/shared/irrigation_model.py por sources/shared/sync.py: no editar aquí.
+"""
+Carga y evaluación del modelo de riego (modelo_riego_numerico.pkl).
+
+El RandomForestRegressor de sklearn paga en cada predict la construcción del
+DataFrame, la validación de entrada y un bucle Python sobre los 100 árboles.
+CompiledForest aplana todos los árboles en arrays NumPy contiguos (feature,
+threshold, hijos y valor por nodo) y los recorre de forma vectorizada, para
+una fila o un lote, con el mismo resultado que sklearn.
+
+Como el modelo solo tiene tres entradas (especie, humedad y temperatura),
+IrrigationLookupTable puede además tabular su salida por especie en una
+rejilla humedad x temperatura al cargar, y servir cada predicción con un
+acceso O(1) a un array (opcionalmente con interpolación bilineal).
+
+CachedPredictor memoiza predicciones con claves cuantizadas
+(especie, humedad, temperatura): las lecturas de sensores se repiten mucho.
+Es opcional (desactivado por defecto) porque responde con la predicción del
+punto cuantizado, no de la lectura exacta.
+
+Los arrays de CompiledForest se guardan junto al .pkl
+(modelo_riego_numerico.compiled.joblib) y se cargan con joblib mmap_mode='r':
+todos los workers del host comparten las mismas páginas en vez de tener cada
+uno su copia.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+
+# Columnas con las que se entrenó el modelo (ML/entrenar2.py)
+FEATURES = ['localname', 'moisture', 'temperature']
+
+class SklearnPredictor:
+    """Camino original: DataFrame de pandas + RandomForestRegressor.predict."""
+
+    backend = 'sklearn'
+
+    def __init__(self, model):
+        self.model = model
+
+    def predict(self, rows):
+        import pandas as pd
+        return self.model.predict(pd.DataFrame(rows, columns=FEATURES))
+
+class CompiledForest:
+    """
+    Bosque aplanado: los nodos de todos los árboles viven en los mismos arrays
+    y los índices de hijos son globales (children[2 * nodo] = izquierdo,
+    children[2 * nodo + 1] = derecho). En las hojas ambos hijos apuntan al
+    propio nodo, así que basta con iterar max_depth pasos sin máscaras.
+    """
+
+    backend = 'compiled'
+
+    # Filas por bloque en predict: acota la memoria de los arrays (árboles x filas)
+    chunk_size = 4096
+
+    def __init__(self, feature, threshold, children, missing_right, value, roots, max_depth):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.missing_right = missing_right
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.n_trees = len(roots)
+
+    @classmethod
+    def from_sklearn(cls, model):
+        features, thresholds, children, missing, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            n = tree.node_count
+            own = np.arange(offset, offset + n)
+            is_leaf = tree.children_left == -1
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(tree.threshold)
+            children.append(np.column_stack([
+                np.where(is_leaf, own, tree.children_left + offset),
+                np.where(is_leaf, own, tree.children_right + offset)
+            ]).ravel())
+            # sklearn >= 1.3 enruta los NaN según missing_go_to_left
+            nodes = tree.__getstate__()['nodes']
+            if 'missing_go_to_left' in nodes.dtype.names:
+                missing.append(nodes['missing_go_to_left'] == 0)
+            else:
+                missing.append(np.ones(n, dtype=bool))
+            values.append(tree.value[:, 0, 0])
+            roots.append(offset)
+            offset += n
+            max_depth = max(max_depth, tree.max_depth)
+
+        # sklearn compara X en float32 contra umbrales float64. Para un x float32,
+        # x <= t equivale a x <= (mayor float32 <= t), así que se puede comparar
+        # todo en float32 sin cambiar ninguna rama
+        threshold = np.concatenate(thresholds)
+        threshold32 = threshold.astype(np.float32)
+        threshold32 = np.where(
+            threshold32.astype(np.float64) > threshold,
+            np.nextafter(threshold32, np.float32(-np.inf)),
+            threshold32
+        ).astype(np.float32)
+
+        return cls(
+            np.ascontiguousarray(np.concatenate(features), dtype=np.intp),
+            np.ascontiguousarray(threshold32),
+            np.ascontiguousarray(np.concatenate(children), dtype=np.intp),
+            np.ascontiguousarray(np.concatenate(missing)),
+            np.ascontiguousarray(np.concatenate(values), dtype=np.float64),
+            np.asarray(roots, dtype=np.intp),
+            max_depth
+        )
+
+    def save(self, path):
+        """Guarda los arrays sin comprimir (requisito para cargarlos con mmap_mode)."""
+        import joblib
+        joblib.dump({
+            'feature': self.feature,
+            'threshold': self.threshold,
+            'children': self.children,
+            'missing_right': self.missing_right,
+            'value': self.value,
+            'roots': self.roots,
+            'max_depth': self.max_depth
+        }, path)
+
+    @classmethod
+    def load(cls, path, mmap_mode='r'):
+        import joblib
+        return cls(**joblib.load(path, mmap_mode=mmap_mode))
+
+    def apply(self, rows):
+        """Índice global de la hoja alcanzada por cada fila en cada árbol: (n_árboles, n_filas)."""
+        X = np.ascontiguousarray(rows, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        n_rows, n_features = X.shape
+        flat = X.ravel()
+        has_nan = bool(np.isnan(flat).any())
+        base = np.arange(0, n_rows * n_features, n_features, dtype=np.intp)
+        node = np.repeat(self.roots[:, None], n_rows, axis=1)
+        for _ in range(self.max_depth):
+            x = flat[self.feature[node] + base]
+            go_right = x > self.threshold[node]
+            if has_nan:
+                go_right = np.where(np.isnan(x), self.missing_right[node], go_right)
+            node = self.children[2 * node + go_right]
+        return node
+
+    def predict(self, rows):
+        X = np.asarray(rows, dtype=np.float32)
+        if X.ndim == 2 and X.shape[0] > self.chunk_size:
+            return np.concatenate([
+                self._predict_chunk(X[start:start + self.chunk_size])
+                for start in range(0, X.shape[0], self.chunk_size)
+            ])
+        return self._predict_chunk(X)
+
+    def _predict_chunk(self, rows):
+        leaves = self.value[self.apply(rows)]
+        # add.accumulate suma árbol a árbol en orden, igual que sklearn,
+        # para que el resultado coincida bit a bit
+        return np.add.accumulate(leaves, axis=0)[-1] / self.n_trees
+
+class IrrigationLookupTable:
+    """
+    Salida del modelo precalculada por especie sobre una rejilla humedad x temperatura.
+
+    Las especies se tabulan por id entero entre los umbrales que usa el bosque
+    para localname (fuera de ese rango todos los ids caen en las mismas ramas).
+    Las filas fuera de la rejilla o con especie no entera se delegan al modelo.
+    max_abs_error se mide al construir, contra el modelo, sobre puntos aleatorios
+    dentro de la rejilla.
+    """
+
+    def __init__(self, predictor, moisture_range=(0, 100), moisture_step=1.0,
+                 temperature_range=(0, 50), temperature_step=0.1,
+                 interpolate=False, error_samples=50000):
+        start = time.perf_counter()
+        self.predictor = predictor
+        self.backend = f'lut+{predictor.backend}'
+        self.interpolate = interpolate
+        self.moisture_min, self.moisture_max = map(float, moisture_range)
+        self.temperature_min, self.temperature_max = map(float, temperature_range)
+        self.moisture_step = float(moisture_step)
+        self.temperature_step = float(temperature_step)
+        self.species_min, self.species_max = self._species_range(predictor)
+
+        species = np.arange(self.species_min, self.species_max + 1)
+        n_moisture = int(round((self.moisture_max - self.moisture_min) / self.moisture_step)) + 1
+        n_temperature = int(round((self.temperature_max - self.temperature_min) / self.temperature_step)) + 1
+        moisture = self.moisture_min + np.arange(n_moisture) * self.moisture_step
+        temperature = self.temperature_min + np.arange(n_temperature) * self.temperature_step
+        grid = np.stack(np.meshgrid(species, moisture, temperature, indexing='ij'), axis=-1).reshape(-1, 3)
+        self.table = np.ascontiguousarray(
+            predictor.predict(grid).reshape(len(species), n_moisture, n_temperature)
+        )
+        self.served = 0
+        self.fallbacks = 0
+        self.max_abs_error, self.mean_abs_error = self._measure_error(error_samples)
+        self.served = 0
+        self.fallbacks = 0
+        self.build_seconds = time.perf_counter() - start
+
+    @staticmethod
+    def _species_range(predictor):
+        if isinstance(predictor, CompiledForest):
+            thresholds = predictor.threshold[(predictor.feature == 0) &
+                                             (predictor.children[0::2] != np.arange(len(predictor.feature)))]
+        else:
+            thresholds = np.concatenate([
+                e.tree_.threshold[e.tree_.feature == 0] for e in predictor.model.estimators_
+            ])
+        if len(thresholds) == 0:
+            return 0, 0
+        return int(np.floor(thresholds.min())), int(np.ceil(thresholds.max()))
+
+    def _measure_error(self, samples):
+        if samples <= 0:
+            return None, None
+        rng = np.random.default_rng(0)
+        rows = np.column_stack([
+            rng.integers(self.species_min, self.species_max + 1, samples),
+            rng.uniform(self.moisture_min, self.moisture_max, samples),
+            rng.uniform(self.temperature_min, self.temperature_max, samples)
+        ])
+        error = np.abs(self.predict(rows) - self.predictor.predict(rows))
+        return float(error.max()), float(error.mean())
+
+    def predict(self, rows):
+        X = np.asarray(rows, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        species, moisture, temperature = X[:, 0], X[:, 1], X[:, 2]
+        in_table = (
+            (species == np.round(species)) &
+            (moisture >= self.moisture_min) & (moisture <= self.moisture_max) &
+            (temperature >= self.temperature_min) & (temperature <= self.temperature_max)
+        )
+        result = np.empty(X.shape[0], dtype=np.float64)
+        if not in_table.all():
+            result[~in_table] = self.predictor.predict(X[~in_table])
+            self.fallbacks += int((~in_table).sum())
+
+        s = np.clip(species[in_table], self.species_min, self.species_max).astype(np.intp) - self.species_min
+        m = (moisture[in_table] - self.moisture_min) / self.moisture_step
+        t = (temperature[in_table] - self.temperature_min) / self.temperature_step
+        if self.interpolate:
+            m0 = np.minimum(np.floor(m).astype(np.intp), self.table.shape[1] - 2).clip(0)
+            t0 = np.minimum(np.floor(t).astype(np.intp), self.table.shape[2] - 2).clip(0)
+            dm = m - m0
+            dt = t - t0
+            table = self.table
+            result[in_table] = (
+                table[s, m0, t0] * (1 - dm) * (1 - dt) +
+                table[s, m0 + 1, t0] * dm * (1 - dt) +
+                table[s, m0, t0 + 1] * (1 - dm) * dt +
+                table[s, m0 + 1, t0 + 1] * dm * dt
+            )
+        else:
+            result[in_table] = self.table[s, np.rint(m).astype(np.intp), np.rint(t).astype(np.intp)]
+        self.served += int(in_table.sum())
+        return result
+
+    def stats(self):
+        return {
+            'backend': self.backend,
+            'shape': list(self.table.shape),
+            'species_range': [self.species_min, self.species_max],
+            'moisture_range': [self.moisture_min, self.moisture_max, self.moisture_step],
+            'temperature_range': [self.temperature_min, self.temperature_max, self.temperature_step],
+            'interpolate': self.interpolate,
+            'max_abs_error_ml': self.max_abs_error,
+            'mean_abs_error_ml': self.mean_abs_error,
+            'build_seconds': round(self.build_seconds, 3),
+            'served': self.served,
+            'fallbacks': self.fallbacks
+        }
+
+class CachedPredictor:
+    """
+    Caché LRU delante del predictor, con clave (especie, humedad cuantizada,
+    temperatura cuantizada). El modelo se evalúa sobre el punto cuantizado,
+    así que la respuesta de una clave no depende de qué lectura llegó primero.
+
+    Un hilo de fondo comprueba cada check_interval segundos el mtime/tamaño
+    del .pkl: si el fichero cambió recarga el modelo con load() y vacía la
+    caché. La recarga (segundos con la tabla de búsqueda) nunca ocurre en el
+    hilo de un request.
+    """
+
+    def __init__(self, load, path, moisture_step=1.0, temperature_step=0.1,
+                 maxsize=10000, check_interval=5.0):
+        self._load = load
+        self.path = path
+        self.moisture_step = float(moisture_step)
+        self.temperature_step = float(temperature_step)
+        self.maxsize = maxsize
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.reloads = 0
+        self.reload_errors = 0
+        self.predictor = load()
+        self._file_signature = self._signature()
+        self._start_watcher()
+        os.register_at_fork(after_in_child=self._start_watcher)
+
+    @property
+    def backend(self):
+        return f'cache+{self.predictor.backend}'
+
+    def _signature(self):
+        try:
+            stat = os.stat(self.path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    def _start_watcher(self):
+        # También tras un fork: el hilo no pasa al hijo y el lock pudo quedar tomado
+        self._lock = threading.Lock()
+        if self.check_interval > 0:
+            threading.Thread(target=self._watch, name='irrigation-model-watcher', daemon=True).start()
+
+    def _watch(self):
+        while True:
+            time.sleep(self.check_interval)
+            try:
+                self._check_model_file()
+            except Exception:
+                # Fichero a medio escribir o corrupto: seguir con el modelo anterior
+                with self._lock:
+                    self.reload_errors += 1
+
+    def _check_model_file(self):
+        signature = self._signature()
+        if signature is None or signature == self._file_signature:
+            return
+        # Cargar fuera del lock para no bloquear las predicciones en curso
+        predictor = self._load()
+        with self._lock:
+            self.predictor = predictor
+            self._file_signature = signature
+            self._data.clear()
+            self.reloads += 1
+
+    def predict(self, rows):
+        X = np.asarray(rows, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        quantized = np.column_stack([
+            X[:, 0],
+            np.round(X[:, 1] / self.moisture_step),
+            np.round(X[:, 2] / self.temperature_step)
+        ])
+        keys = [tuple(row) for row in quantized.tolist()]
+        result = np.empty(len(keys), dtype=np.float64)
+        missing = {}
+        with self._lock:
+            predictor = self.predictor
+            for i, key in enumerate(keys):
+                value = self._data.get(key)
+                if value is None:
+                    missing.setdefault(key, []).append(i)
+                else:
+                    self._data.move_to_end(key)
+                    result[i] = value
+            self.hits += len(keys) - sum(len(indexes) for indexes in missing.values())
+            self.misses += sum(len(indexes) for indexes in missing.values())
+        if not missing:
+            return result
+
+        # Una sola llamada al modelo para todas las claves nuevas del lote
+        points = np.array([
+            (key[0], key[1] * self.moisture_step, key[2] * self.temperature_step)
+            for key in missing
+        ])
+        predicted = predictor.predict(points)
+        with self._lock:
+            for (key, indexes), value in zip(missing.items(), predicted.tolist()):
+                result[indexes] = value
+                if predictor is self.predictor:
+                    self._data[key] = value
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                'backend': self.backend,
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'moisture_step': self.moisture_step,
+                'temperature_step': self.temperature_step,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'model_reloads': self.reloads,
+                'model_reload_errors': self.reload_errors
+            }
+        if hasattr(self.predictor, 'stats'):
+            stats['lookup_table'] = self.predictor.stats()
+        return stats
+
+def compiled_path(path):
+    return os.path.splitext(path)[0] + '.compiled.joblib'
+
+def _load_compiled(path, mmap):
+    """
+    CompiledForest del .pkl. Con mmap usa (y si falta o es más viejo que el .pkl,
+    regenera) el archivo .compiled.joblib y lo mapea en memoria de solo lectura.
+    """
+    import joblib
+    if not mmap:
+        return CompiledForest.from_sklearn(joblib.load(path))
+    sidecar = compiled_path(path)
+    if not os.path.exists(sidecar) or os.path.getmtime(sidecar) < os.path.getmtime(path):
+        forest = CompiledForest.from_sklearn(joblib.load(path))
+        tmp = f'{sidecar}.{os.getpid()}.tmp'
+        try:
+            forest.save(tmp)
+            os.replace(tmp, sidecar)
+        except OSError:
+            # Directorio de solo lectura: se usa la copia en memoria
+            return forest
+    return CompiledForest.load(sidecar, mmap_mode='r')
+
+def load_irrigation_model(path, backend='compiled', lookup_table=None, cache=None, mmap=True):
+    """
+    Carga el .pkl y devuelve un predictor con predict(rows) -> ndarray de ml.
+    lookup_table: dict opcional con los parámetros de IrrigationLookupTable;
+    si se indica, las predicciones se sirven desde la tabla precalculada.
+    cache: dict opcional con los parámetros de CachedPredictor (caché cuantizada
+    que se vacía y recarga el modelo cuando cambia el fichero).
+    mmap: con el backend compiled, comparte los arrays entre procesos vía mmap.
+    """
+    if cache is not None:
+        return CachedPredictor(lambda: load_irrigation_model(path, backend, lookup_table, mmap=mmap), path, **cache)
+    if backend == 'sklearn':
+        import joblib
+        predictor = SklearnPredictor(joblib.load(path))
+    else:
+        predictor = _load_compiled(path, mmap)
+    if lookup_table is not None:
+        return IrrigationLookupTable(predictor, **lookup_table)
+    return predictor
@@ -0,0 +1,94 @@
+"""
+Species Service de prueba: responde GET /species/search?q=... como el servicio
+real (species-service/src/services/species.service.js) con las 8 especies del
+seed, sin base de datos. Permite simular latencia y fallos.
+
+Uso (desde ml-service):
+    python scripts/stub_species_server.py [--port 3006] [--delay-ms 0] [--fail-rate 0]
+    SPECIES_SERVICE_URL=http://localhost:3006 python app.py
+
+Los tests de SpeciesClient (tests/test_species_client.py) lo arrancan en proceso.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import unicodedata
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+SPECIES = [
+    (1, 'Ajo', 'Allium sativum'),
+    (2, 'Geranio', 'Pelargonium'),
+    (3, 'Hierbabuena', 'Mentha spicata'),
+    (4, 'Menta', 'Mentha'),
+    (5, 'Orégano', 'Origanum vulgare'),
+    (6, 'Orquídea', 'Orchidaceae'),
+    (7, 'Rosa China', 'Hibiscus rosa-sinensis'),
+    (8, 'Tomate Cherry', 'Solanum lycopersicum var. cerasiforme')
+]
+
+def normalize(text):
+    text = unicodedata.normalize('NFD', text.lower())
+    return ''.join(c for c in text if not unicodedata.combining(c) and not c.isspace())
+
+def search(query):
+    query = normalize(query)
+    matches = [
+        {
+            'id': species_id,
+            'commonName': common,
+            'scientificName': scientific,
+            'waterRequirements': 'stub',
+            'lightRequirements': 'stub',
+            'humidityRequirements': 'stub'
+        }
+        for species_id, common, scientific in SPECIES
+        if query in normalize(common) or query in normalize(scientific)
+    ]
+    return {'species': matches[0] if matches else None, 'total': len(matches), 'allMatches': matches}
+
+def make_server(port=3006, delay_ms=0.0, fail_rate=0.0):
+    class Handler(BaseHTTPRequestHandler):
+        requests_served = 0
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path != '/species/search':
+                self.send_error(404)
+                return
+            Handler.requests_served += 1
+            time.sleep(delay_ms / 1000.0)
+            if random.random() < fail_rate:
+                self.send_error(503)
+                return
+            body = json.dumps(search(parse_qs(url.query).get('q', [''])[0])).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+    server.handler = Handler
+    return server
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--port', type=int, default=3006)
+    parser.add_argument('--delay-ms', type=float, default=0.0)
+    parser.add_argument('--fail-rate', type=float, default=0.0)
+    args = parser.parse_args()
+    server = make_server(args.port, args.delay_ms, args.fail_rate)
+    print(f"🌱 Stub Species Service en http://127.0.0.1:{args.port}")
+    server.serve_forever()
+
+if __name__ == '__main__':
+    main()
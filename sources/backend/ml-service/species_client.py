@@ -0,0 +1,188 @@
+"""
+Datos de especies del Species Service, servidos desde memoria.
+
+predict_recognition hacía un requests.get nuevo (sin reutilizar conexión) a
+/species/search después de cada inferencia, sumando la latencia del Species
+Service a cada reconocimiento. Como el modelo solo predice las 8 clases de
+CLASS_NAMES, SpeciesClient las precarga al arrancar, las refresca cada
+refresh_interval segundos en un hilo de fondo y get() responde desde memoria.
+
+Las llamadas que quedan (precarga, refresco y clases que aún no se cargaron)
+usan una requests.Session con pool de conexiones keep-alive y pasan por un
+CircuitBreaker: tras failure_threshold fallos seguidos (errores de conexión,
+timeouts y respuestas 5xx; un 4xx no es un fallo del servicio) deja de llamar
+durante reset_timeout segundos y get() devuelve lo que haya en memoria (o
+None). Pasado ese tiempo sale una única llamada de prueba: si va bien el
+circuito se cierra y si falla se vuelve a abrir.
+Si un refresco falla se siguen sirviendo los datos anteriores.
+"""
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+class CircuitOpen(Exception):
+    """El circuito está abierto: no se llama al Species Service."""
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self.trips = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return 'closed'
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return 'half_open'
+            return 'open'
+
+    def allow(self):
+        """True si la llamada puede salir. En half_open solo sale una llamada de prueba a la vez."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._probing or time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def release(self):
+        """La llamada terminó sin decir nada de la salud del servicio: libera la prueba."""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._probing = False
+            self._failures += 1
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    self.trips += 1
+                self._opened_at = time.monotonic()
+
+def _is_service_failure(error):
+    """Solo cuentan para el breaker los errores de conexión, timeouts y 5xx."""
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return True
+    response = getattr(error, 'response', None)
+    return isinstance(error, requests.HTTPError) and response is not None and response.status_code >= 500
+
+class SpeciesClient:
+    def __init__(self, base_url, class_names, refresh_interval=300.0, connect_timeout=1.0,
+                 read_timeout=2.0, pool_size=10, breaker=None, logger=None):
+        self.base_url = base_url.rstrip('/')
+        self.class_names = list(class_names)
+        self.refresh_interval = refresh_interval
+        self.timeout = (connect_timeout, read_timeout)
+        self.breaker = breaker or CircuitBreaker()
+        self.logger = logger
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._species = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.remote_calls = 0
+        self.remote_errors = 0
+        self.rejected = 0
+        self.last_refresh = None
+
+    def _fetch(self, name):
+        """Busca una especie en el Species Service. Devuelve el dict o None si no existe."""
+        if not self.breaker.allow():
+            with self._lock:
+                self.rejected += 1
+            raise CircuitOpen(f'Species Service circuit open ({self.base_url})')
+        with self._lock:
+            self.remote_calls += 1
+        try:
+            response = self.session.get(f'{self.base_url}/species/search', params={'q': name},
+                                        timeout=self.timeout)
+            response.raise_for_status()
+            species = response.json().get('species')
+        except Exception as e:
+            with self._lock:
+                self.remote_errors += 1
+            if _is_service_failure(e):
+                self.breaker.record_failure()
+            else:
+                self.breaker.release()
+            raise
+        self.breaker.record_success()
+        return species
+
+    def refresh(self):
+        """Recarga todas las clases; las que fallan conservan el valor anterior."""
+        loaded = 0
+        for name in self.class_names:
+            try:
+                species = self._fetch(name)
+            except Exception as e:
+                if self.logger:
+                    self.logger.warning(f'⚠️  No se pudo refrescar la especie {name}: {e}')
+                continue
+            with self._lock:
+                self._species[name] = species
+            loaded += 1
+        if loaded:
+            self.last_refresh = time.time()
+        return loaded
+
+    def start(self):
+        """Precarga en segundo plano y refresca periódicamente."""
+        def run():
+            while True:
+                self.refresh()
+                time.sleep(self.refresh_interval)
+
+        threading.Thread(target=run, name='species-refresh', daemon=True).start()
+
+    def get(self, name):
+        """Datos de la especie (dict) o None si no existe o no se pudo obtener."""
+        with self._lock:
+            if name in self._species:
+                self.hits += 1
+                return self._species[name]
+            self.misses += 1
+        try:
+            species = self._fetch(name)
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f'❌ Error comunicándose con Species Service: {e}')
+            return None
+        with self._lock:
+            self._species[name] = species
+        return species
+
+    def stats(self):
+        with self._lock:
+            stats = {
+                'cached': len(self._species),
+                'classes': len(self.class_names),
+                'hits': self.hits,
+                'misses': self.misses,
+                'remote_calls': self.remote_calls,
+                'remote_errors': self.remote_errors,
+                'rejected_by_breaker': self.rejected
+            }
+        stats.update({
+            'breaker_state': self.breaker.state,
+            'breaker_trips': self.breaker.trips,
+            'last_refresh': self.last_refresh
+        })
+        return stats
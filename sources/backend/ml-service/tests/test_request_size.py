@@ -0,0 +1,19 @@
+"""
+MAX_REQUEST_BYTES: un cuerpo más grande que el límite se rechaza con 413 en JSON
+antes de leerlo, aunque el modelo de reconocimiento no esté cargado.
+"""
+import io
+import os
+
+os.environ.setdefault('ML_WARMUP', 'false')
+os.environ.setdefault('SPECIES_SERVICE_URL', 'http://127.0.0.1:9')
+
+import app as ml_app
+
+def test_oversized_batch_returns_413(monkeypatch):
+    monkeypatch.setitem(ml_app.app.config, 'MAX_CONTENT_LENGTH', 1024)
+    client = ml_app.app.test_client()
+    response = client.post('/predict/recognition/batch', content_type='multipart/form-data',
+                           data={'images': [(io.BytesIO(b'\xff' * 4096), 'planta.jpg')]})
+    assert response.status_code == 413
+    assert response.get_json()['error'] == 'Request too large'
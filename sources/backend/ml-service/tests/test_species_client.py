@@ -0,0 +1,103 @@
+"""
+SpeciesClient contra scripts/stub_species_server.py: precarga, caché en memoria
+y circuit breaker (una sola llamada de prueba en half_open, los 4xx no cuentan).
+"""
+import threading
+import time
+import pytest
+from scripts.stub_species_server import make_server
+from species_client import CircuitBreaker, SpeciesClient
+
+CLASS_NAMES = ['ajo', 'geranio', 'hierbabuena', 'menta', 'oregano', 'orquidea', 'rosachina', 'tomatecherry']
+
+@pytest.fixture
+def species_server():
+    servers = []
+
+    def start(**kwargs):
+        server = make_server(port=0, **kwargs)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server, f'http://127.0.0.1:{server.server_address[1]}'
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+def test_preload_serves_from_memory(species_server):
+    server, url = species_server()
+    client = SpeciesClient(url, CLASS_NAMES)
+    assert client.refresh() == 8
+    served = server.handler.requests_served
+    for name in CLASS_NAMES:
+        assert client.get(name) is not None
+    assert server.handler.requests_served == served, 'get() no debe llamar al servicio tras la precarga'
+    assert client.get('rosachina')['id'] == 7
+    assert client.stats()['hits'] == 9
+
+def test_breaker_opens_when_service_is_down(species_server):
+    server, url = species_server()
+    client = SpeciesClient(url, CLASS_NAMES, breaker=CircuitBreaker(failure_threshold=3, reset_timeout=60))
+    client.refresh()
+    server.shutdown()
+    server.server_close()
+    client.session.close()
+    for _ in range(5):
+        assert client.get('cactus') is None
+    assert client.breaker.state == 'open'
+    assert client.stats()['rejected_by_breaker'] == 2
+    assert client.get('menta') is not None, 'con el circuito abierto se sigue sirviendo desde memoria'
+
+def test_server_errors_count_as_failures(species_server):
+    _, url = species_server(fail_rate=1.0)
+    client = SpeciesClient(url, CLASS_NAMES, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+    assert client.get('ajo') is None
+    assert client.get('ajo') is None
+    assert client.breaker.state == 'open'
+
+def test_client_errors_do_not_open_the_breaker(species_server):
+    _, url = species_server()
+    # Ruta inexistente: el stub responde 404
+    client = SpeciesClient(f'{url}/no-existe', CLASS_NAMES, breaker=CircuitBreaker(failure_threshold=2))
+    for _ in range(5):
+        assert client.get('ajo') is None
+    assert client.breaker.state == 'closed'
+    assert client.stats()['remote_errors'] == 5
+
+def test_half_open_allows_a_single_probe():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    assert not breaker.allow()
+    time.sleep(0.06)
+    assert breaker.state == 'half_open'
+
+    allowed = []
+    barrier = threading.Barrier(16)
+
+    def caller():
+        barrier.wait()
+        allowed.append(breaker.allow())
+
+    threads = [threading.Thread(target=caller) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert allowed.count(True) == 1
+
+    # La prueba falla: se vuelve a abrir; la siguiente prueba va bien: se cierra
+    breaker.record_failure()
+    assert breaker.state == 'open' and not breaker.allow()
+    time.sleep(0.06)
+    assert breaker.allow() and not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == 'closed' and breaker.allow() and breaker.allow()
+
+def test_released_probe_lets_the_next_caller_probe():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+    assert breaker.allow() and not breaker.allow()
+    breaker.release()
+    assert breaker.allow()
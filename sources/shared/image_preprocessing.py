@@ -0,0 +1,67 @@
+"""
+Decodificación y preprocesado de imágenes para el modelo de reconocimiento.
+
+El camino original decodificaba la foto a resolución completa (12 MP de un
+móvil), la redimensionaba a 180x180, y np.array(img) / 255.0 creaba una copia
+float64 que Keras volvía a convertir a float32. Aquí:
+
+- decode_image(draft=True) usa el modo draft de JPEG: libjpeg decodifica
+  directamente a 1/2, 1/4 u 1/8 de la resolución (la menor que siga siendo
+  >= 180x180), con lo que el decode y el resize trabajan sobre muchos menos
+  píxeles.
+- normalize convierte uint8 -> float32 / 255 en una sola pasada, escribiendo
+  en el array de destino (sin temporales float64).
+- BatchBuffer mantiene un lote float32 preasignado que se reutiliza entre
+  llamadas; batch_buffer() da uno por hilo.
+
+El modo draft cambia ligeramente los píxeles respecto al decode completo
+(escalado DCT en vez de remuestreo), así que es opcional (RECOGNITION_JPEG_DRAFT);
+por defecto draft=False conserva el camino exacto.
+"""
+import io
+import threading
+import numpy as np
+from PIL import Image
+
+IMG_HEIGHT = 180
+IMG_WIDTH = 180
+
+_SCALE = np.float32(255.0)
+_local = threading.local()
+
+def decode_image(image_bytes, size=(IMG_WIDTH, IMG_HEIGHT), draft=False):
+    """Decodifica a RGB y redimensiona a size (ancho, alto). Devuelve una imagen PIL."""
+    img = Image.open(io.BytesIO(image_bytes))
+    if draft and img.format == 'JPEG':
+        img.draft('RGB', size)
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+    return img.resize(size)
+
+def normalize(pixels, out=None):
+    """uint8 (..., 3) -> float32 en [0, 1], escribiendo en out si se da."""
+    return np.divide(pixels, _SCALE, out=out, dtype=np.float32)
+
+def preprocess_image(image_bytes, out=None, draft=False):
+    """Bytes de la imagen -> array float32 (180, 180, 3) listo para el modelo."""
+    img = decode_image(image_bytes, draft=draft)
+    return normalize(np.asarray(img), out=out)
+
+class BatchBuffer:
+    """Lote float32 (n, 180, 180, 3) preasignado; crece si se pide un lote mayor."""
+
+    def __init__(self, max_batch_size=1, height=IMG_HEIGHT, width=IMG_WIDTH):
+        self.shape = (height, width, 3)
+        self.array = np.empty((max_batch_size,) + self.shape, dtype=np.float32)
+
+    def batch(self, n):
+        if n > len(self.array):
+            self.array = np.empty((n,) + self.shape, dtype=np.float32)
+        return self.array[:n]
+
+def batch_buffer():
+    """BatchBuffer del hilo actual (los hilos del servidor no comparten buffer)."""
+    buffer = getattr(_local, 'buffer', None)
+    if buffer is None:
+        buffer = _local.buffer = BatchBuffer()
+    return buffer
@@ -0,0 +1,117 @@
+"""
+Carga diferida de modelos.
+
+Cargar TensorFlow, el .h5 y el .pkl al importar los controllers hacía pagar
+varios segundos y cientos de MB a cada arranque de worker, test o uso de
+create_app desde scripts, aunque solo se sirvieran /auth o /plants.
+
+LazyModel envuelve una función de carga: el modelo (y sus imports pesados) se
+carga la primera vez que se pide con get(), o antes con warm_up() en un hilo
+de fondo. Si la carga falla, get() lanza ModelUnavailable y se reintenta como
+mucho cada retry_interval segundos (p. ej. si el archivo aparece después).
+
+Los modelos se registran por nombre; readiness() resume su estado para el
+health check de disponibilidad: no está listo mientras un modelo carga ni si
+su carga falló (en ese caso relanza la carga en segundo plano cuando toca
+reintentar, para no depender de que llegue un request).
+"""
+import threading
+import time
+
+class ModelUnavailable(Exception):
+    """El modelo no está cargado y no se pudo cargar."""
+
+_registry = {}
+
+class LazyModel:
+    def __init__(self, name, loader, retry_interval=30.0, logger=None):
+        self.name = name
+        self._loader = loader
+        self.retry_interval = retry_interval
+        self.logger = logger
+        self._model = None
+        self._lock = threading.Lock()
+        self.state = 'not_loaded'
+        self.error = None
+        self.load_ms = None
+        self._failed_at = None
+        self.warming = False
+        _registry[name] = self
+
+    @property
+    def loaded(self):
+        return self._model is not None
+
+    def get(self):
+        model = self._model
+        if model is not None:
+            return model
+        with self._lock:
+            if self._model is None and self._can_retry():
+                self._load()
+        if self._model is None:
+            raise ModelUnavailable(f'{self.name} model not available: {self.error}')
+        return self._model
+
+    def peek(self):
+        """El modelo si ya está cargado, sin provocar la carga."""
+        return self._model
+
+    def get_or_none(self):
+        try:
+            return self.get()
+        except ModelUnavailable:
+            return None
+
+    def _can_retry(self):
+        return self._failed_at is None or time.monotonic() - self._failed_at >= self.retry_interval
+
+    def _load(self):
+        self.state = 'loading'
+        start = time.perf_counter()
+        try:
+            self._model = self._loader()
+        except Exception as e:
+            self.state = 'failed'
+            self.error = str(e)
+            self._failed_at = time.monotonic()
+            if self.logger:
+                self.logger.error(f'❌ Error cargando modelo {self.name}: {e}')
+            return
+        self.load_ms = round((time.perf_counter() - start) * 1000, 1)
+        self.state = 'ready'
+        self.error = None
+        if self.logger:
+            self.logger.info(f'✅ Modelo {self.name} cargado en {self.load_ms} ms')
+
+    def warm_up(self, background=True):
+        """Carga el modelo ya (en un hilo de fondo si background) sin esperar al primer request."""
+        if background:
+            self.warming = True
+
+            def run():
+                self.get_or_none()
+                self.warming = False
+
+            threading.Thread(target=run, name=f'warmup-{self.name}', daemon=True).start()
+        else:
+            self.get_or_none()
+
+    def status(self):
+        return {'state': self.state, 'error': self.error, 'load_ms': self.load_ms}
+
+def get_model(name):
+    return _registry[name]
+
+def warm_up_all(background=True):
+    for model in _registry.values():
+        model.warm_up(background)
+
+def readiness():
+    """(listo, {nombre: estado}): listo cuando ningún modelo está cargando, calentándose o fallido."""
+    for model in _registry.values():
+        if model.state == 'failed' and not model.warming and model._can_retry():
+            model.warm_up()
+    statuses = {name: model.status() for name, model in _registry.items()}
+    ready = all(model.state not in ('loading', 'failed') and not model.warming for model in _registry.values())
+    return ready, statuses
@@ -0,0 +1,285 @@
+"""
+Caché de resultados del modelo de reconocimiento.
+
+La misma foto llega varias veces (reintentos de la app, /recognition/ seguido
+de crear la maceta con la misma imagen) y cada subida volvía a ejecutar la CNN.
+RecognitionCache guarda las probabilidades del modelo con dos claves:
+
+- hash del contenido (blake2b de los bytes subidos): misma foto, mismo archivo;
+  se consulta antes de decodificar.
+- opcionalmente (perceptual=True) un dHash de 64 bits de la imagen decodificada:
+  la misma foto recomprimida o con otros metadatos EXIF da el mismo dHash.
+  Solo se aceptan coincidencias exactas del dHash, no por distancia.
+
+Entradas acotadas por maxsize (LRU) y ttl segundos. Con path se persisten en
+SQLite: al arrancar se cargan las más recientes y, si un hash de contenido no
+está en memoria, se busca en el archivo antes de dar un miss, así que una foto
+que reconoció otro worker del mismo host (o un proceso anterior) no vuelve a
+pasar por la CNN. Las coincidencias por dHash solo se buscan en memoria.
+namespace (backend y variante del modelo) separa resultados de modelos
+distintos en el mismo archivo. Las escrituras en SQLite las hace un hilo de
+fondo con su propia conexión (por lotes, un commit por lote), fuera del lock de
+la caché; las lecturas usan una conexión por hilo con un timeout corto. Un
+"database is locked" de otro worker no bloquea ni hace fallar requests, solo se
+cuenta (y en las lecturas cuenta como miss). El hilo y las conexiones se
+vuelven a crear en el hijo tras un fork. Si el archivo no se puede abrir la
+caché funciona solo en memoria.
+"""
+import hashlib
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+def content_hash(image_bytes):
+    return hashlib.blake2b(image_bytes, digest_size=16).hexdigest()
+
+def perceptual_hash(img):
+    """dHash de 64 bits (gradiente horizontal de una miniatura 9x8 en grises) como hex."""
+    pixels = np.asarray(img.convert('L').resize((9, 8)), dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).ravel()
+    return f'{int(np.packbits(bits).view(">u8")[0]):016x}'
+
+class RecognitionCache:
+    # Escrituras pendientes como máximo; si el disco no da abasto se descartan
+    write_queue_size = 1000
+    write_batch_size = 100
+    # Espera máxima de una lectura si otro worker tiene el archivo bloqueado
+    read_timeout = 0.05
+
+    def __init__(self, maxsize=1000, ttl=86400, perceptual=False, path=None, namespace=''):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.perceptual = perceptual
+        self.namespace = namespace
+        self._entries = OrderedDict()
+        self._by_phash = {}
+        self._lock = threading.Lock()
+        self._pending = None
+        self._local = threading.local()
+        self._writes = 0
+        self.persisted = 0
+        self.persist_errors = 0
+        self.disk_hits = 0
+        self.read_errors = 0
+        self.dropped_writes = 0
+        self.hits = 0
+        self.perceptual_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        if path:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                self._open(path)
+            except (OSError, sqlite3.Error) as e:
+                log.warning("Caché de reconocimiento solo en memoria: no se pudo abrir %s: %s", path, e)
+                path = None
+        self._path = path
+        if path:
+            self._start_writer(path)
+            os.register_at_fork(after_in_child=lambda: self._start_writer(path))
+
+    def _start_writer(self, path):
+        # También tras un fork: el hilo no pasa al hijo, el lock pudo quedar tomado
+        # y las conexiones de lectura del padre no se pueden usar en el hijo
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._pending = queue.Queue(maxsize=self.write_queue_size)
+        threading.Thread(target=self._write_loop, args=(path, self._pending),
+                         name='recognition-cache-writer', daemon=True).start()
+
+    def _open(self, path):
+        db = sqlite3.connect(path)
+        try:
+            self._load(db)
+        finally:
+            db.close()
+
+    def _load(self, db):
+        db.execute("""
+            CREATE TABLE IF NOT EXISTS recognition_cache (
+                namespace TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                phash TEXT,
+                probabilities TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (namespace, content_hash)
+            )
+        """)
+        db.execute("DELETE FROM recognition_cache WHERE created_at < ?", (time.time() - self.ttl,))
+        db.commit()
+        rows = db.execute(
+            "SELECT content_hash, phash, probabilities, created_at FROM recognition_cache "
+            "WHERE namespace = ? ORDER BY created_at DESC LIMIT ?", (self.namespace, self.maxsize)
+        ).fetchall()
+        for key, phash, probabilities, created_at in reversed(rows):
+            self._put(key, phash, np.asarray(json.loads(probabilities), dtype=np.float32), created_at)
+
+    def _put(self, key, phash, probabilities, created_at):
+        self._entries[key] = (probabilities, phash, created_at + self.ttl)
+        self._entries.move_to_end(key)
+        if phash:
+            self._by_phash[phash] = key
+        while len(self._entries) > self.maxsize:
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _drop(self, key):
+        _, phash, _ = self._entries.pop(key)
+        if phash and self._by_phash.get(phash) == key:
+            del self._by_phash[phash]
+
+    def _get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[2] < time.time():
+            self._drop(key)
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def lookup(self, image_bytes):
+        """Busca por contenido. Devuelve (probabilidades o None, content_hash)."""
+        key = content_hash(image_bytes)
+        with self._lock:
+            probabilities = self._get(key)
+            if probabilities is not None:
+                self.hits += 1
+        if probabilities is None and self._path:
+            probabilities = self._read_through(key)
+        if probabilities is None and not self.perceptual:
+            with self._lock:
+                self.misses += 1
+        return probabilities, key
+
+    def _read_through(self, key):
+        """Busca key en SQLite (p. ej. la escribió otro worker) y la sube a memoria."""
+        try:
+            db = getattr(self._local, 'db', None)
+            if db is None:
+                db = self._local.db = sqlite3.connect(self._path, timeout=self.read_timeout)
+            row = db.execute(
+                "SELECT phash, probabilities, created_at FROM recognition_cache "
+                "WHERE namespace = ? AND content_hash = ? AND created_at >= ?",
+                (self.namespace, key, time.time() - self.ttl)
+            ).fetchone()
+        except sqlite3.Error:
+            with self._lock:
+                self.read_errors += 1
+            return None
+        if row is None:
+            return None
+        phash, probabilities, created_at = row
+        probabilities = np.asarray(json.loads(probabilities), dtype=np.float32)
+        with self._lock:
+            self._put(key, phash, probabilities, created_at)
+            self.disk_hits += 1
+        return probabilities
+
+    def lookup_image(self, img):
+        """
+        Busca por dHash de la imagen decodificada (solo con perceptual=True,
+        tras fallar lookup). Devuelve (probabilidades o None, phash).
+        """
+        if not self.perceptual:
+            return None, None
+        phash = perceptual_hash(img)
+        with self._lock:
+            key = self._by_phash.get(phash)
+            probabilities = self._get(key) if key is not None else None
+            if probabilities is not None:
+                self.perceptual_hits += 1
+            else:
+                self.misses += 1
+        return probabilities, phash
+
+    def store(self, key, phash, probabilities):
+        probabilities = np.asarray(probabilities, dtype=np.float32)
+        now = time.time()
+        with self._lock:
+            self._put(key, phash, probabilities, now)
+        if self._pending is not None:
+            try:
+                self._pending.put_nowait((key, phash, probabilities, now))
+            except queue.Full:
+                with self._lock:
+                    self.dropped_writes += 1
+
+    def _write_loop(self, path, pending):
+        db = None
+        while True:
+            rows = [pending.get()]
+            while len(rows) < self.write_batch_size:
+                try:
+                    rows.append(pending.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                if db is None:
+                    db = sqlite3.connect(path)
+                self._persist(db, rows)
+                with self._lock:
+                    self.persisted += len(rows)
+            except sqlite3.Error as e:
+                # p. ej. "database is locked" por otro worker: se pierde el lote, no el request
+                with self._lock:
+                    self.persist_errors += 1
+                log.warning("Error persistiendo la caché de reconocimiento (%d entradas): %s", len(rows), e)
+                try:
+                    db.rollback()
+                except Exception:
+                    pass
+
+    def _persist(self, db, rows):
+        db.executemany(
+            "INSERT OR REPLACE INTO recognition_cache (namespace, content_hash, phash, probabilities, created_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [(self.namespace, key, phash, json.dumps(probabilities.tolist()), now)
+             for key, phash, probabilities, now in rows]
+        )
+        previous = self._writes
+        self._writes += len(rows)
+        # De vez en cuando se podan las filas caducadas y las que exceden maxsize
+        if self._writes // 100 != previous // 100:
+            db.execute("DELETE FROM recognition_cache WHERE created_at < ?", (rows[-1][3] - self.ttl,))
+            db.execute("""
+                DELETE FROM recognition_cache WHERE namespace = ? AND content_hash NOT IN (
+                    SELECT content_hash FROM recognition_cache WHERE namespace = ?
+                    ORDER BY created_at DESC LIMIT ?
+                )
+            """, (self.namespace, self.namespace, self.maxsize))
+        db.commit()
+
+    def stats(self):
+        with self._lock:
+            hits = self.hits + self.disk_hits + self.perceptual_hits
+            lookups = hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'perceptual': self.perceptual,
+                'persistent': self._pending is not None,
+                'pending_writes': self._pending.qsize() if self._pending is not None else 0,
+                'persisted': self.persisted,
+                'persist_errors': self.persist_errors,
+                'read_errors': self.read_errors,
+                'dropped_writes': self.dropped_writes,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'perceptual_hits': self.perceptual_hits,
+                'misses': self.misses,
+                'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
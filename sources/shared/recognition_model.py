@@ -0,0 +1,213 @@
+"""
+Backends de inferencia para el clasificador de plantas (model-recognition.h5).
+
+Todos reciben un lote float32 (n, 180, 180, 3) ya normalizado a [0, 1] y
+devuelven las probabilidades (n, 8):
+
+    'keras'       - tf.keras model.predict (camino original; mucho overhead por
+                    llamada: crea un tf.data pipeline y callbacks en cada predict)
+    'tf_function' - el mismo modelo Keras trazado una vez con tf.function y
+                    firma de entrada fija; se llama directamente sin predict
+    'tflite'      - intérprete TFLite sobre model-recognition.tflite (usa
+                    tflite_runtime si está instalado, si no tf.lite)
+    'onnx'        - ONNX Runtime (CPUExecutionProvider) sobre model-recognition.onnx
+
+Los artefactos .tflite y .onnx se generan con convert_recognition_model()
+(ver scripts/convert_recognition_model.py) junto al .h5. TensorFlow, tf2onnx y
+onnxruntime se importan solo cuando el backend elegido los necesita.
+
+quantize_recognition_model() genera variantes cuantizadas post-entrenamiento
+(scripts/quantize_recognition_model.py), que se cargan con variant=...:
+    tflite: 'dynamic' (pesos INT8), 'fp16' (pesos float16),
+            'int8' (pesos y activaciones INT8, calibrado con imágenes de muestra)
+    onnx:   'dynamic' (pesos INT8, onnxruntime.quantization)
+La entrada y la salida siguen siendo float32 en todas las variantes.
+"""
+import os
+import threading
+import numpy as np
+
+IMG_HEIGHT = 180
+IMG_WIDTH = 180
+
+BACKEND_EXTENSIONS = {'keras': '.h5', 'tf_function': '.h5', 'tflite': '.tflite', 'onnx': '.onnx'}
+VARIANTS = {'tflite': ('dynamic', 'fp16', 'int8'), 'onnx': ('dynamic',)}
+
+class KerasBackend:
+    backend = 'keras'
+
+    def __init__(self, path, num_threads=None):
+        import tensorflow as tf
+        _configure_tf_threads(tf, num_threads)
+        self.model = tf.keras.models.load_model(path)
+
+    def predict(self, batch):
+        return self.model.predict(batch, verbose=0)
+
+class TFFunctionBackend:
+    backend = 'tf_function'
+
+    def __init__(self, path, num_threads=None):
+        import tensorflow as tf
+        _configure_tf_threads(tf, num_threads)
+        self._tf = tf
+        self.model = tf.keras.models.load_model(path)
+        signature = [tf.TensorSpec([None, IMG_HEIGHT, IMG_WIDTH, 3], tf.float32)]
+        self._call = tf.function(lambda x: self.model(x, training=False), input_signature=signature)
+        # Trazar ahora y no en el primer request
+        self._call(tf.zeros([1, IMG_HEIGHT, IMG_WIDTH, 3], tf.float32))
+
+    def predict(self, batch):
+        return self._call(self._tf.convert_to_tensor(batch, self._tf.float32)).numpy()
+
+class TFLiteBackend:
+    backend = 'tflite'
+
+    def __init__(self, path, num_threads=None):
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+        self.interpreter = Interpreter(model_path=path, num_threads=num_threads)
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+        self._batch_size = None
+        self._lock = threading.Lock()
+
+    def predict(self, batch):
+        # El intérprete no es thread-safe y el tamaño del lote es parte del grafo:
+        # se redimensiona solo cuando cambia
+        with self._lock:
+            if batch.shape[0] != self._batch_size:
+                self.interpreter.resize_tensor_input(self._input['index'], batch.shape)
+                self.interpreter.allocate_tensors()
+                self._batch_size = batch.shape[0]
+            self.interpreter.set_tensor(self._input['index'], batch.astype(self._input['dtype'], copy=False))
+            self.interpreter.invoke()
+            return self.interpreter.get_tensor(self._output['index']).copy()
+
+class OnnxBackend:
+    backend = 'onnx'
+
+    def __init__(self, path, num_threads=None):
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(path, sess_options=options, providers=['CPUExecutionProvider'])
+        self._input_name = self.session.get_inputs()[0].name
+
+    def predict(self, batch):
+        return self.session.run(None, {self._input_name: batch.astype(np.float32, copy=False)})[0]
+
+BACKENDS = {
+    'keras': KerasBackend,
+    'tf_function': TFFunctionBackend,
+    'tflite': TFLiteBackend,
+    'onnx': OnnxBackend
+}
+
+def _configure_tf_threads(tf, num_threads):
+    if num_threads:
+        try:
+            tf.config.threading.set_intra_op_parallelism_threads(num_threads)
+        except RuntimeError:
+            # TensorFlow ya inicializado: se mantiene la configuración previa
+            pass
+
+def artifact_path(model_path, backend, variant=None):
+    """
+    Ruta del artefacto del backend junto al .h5:
+    model-recognition.h5 -> model-recognition.onnx, model-recognition.int8.tflite...
+    """
+    if variant and variant not in VARIANTS.get(backend, ()):
+        raise ValueError(f'Variant {variant!r} not available for backend {backend}')
+    base = os.path.splitext(model_path)[0]
+    return base + (f'.{variant}' if variant else '') + BACKEND_EXTENSIONS[backend]
+
+def load_recognition_model(model_path, backend='keras', num_threads=None, variant=None):
+    """
+    Carga el clasificador con el backend indicado. model_path es el .h5; para
+    tflite y onnx se usa el artefacto convertido (o su variante cuantizada)
+    con el mismo nombre.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f'Unknown recognition backend: {backend}')
+    path = artifact_path(model_path, backend, variant)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f'{path} not found (run scripts/convert_recognition_model.py)')
+    return BACKENDS[backend](path, num_threads=num_threads)
+
+def convert_recognition_model(model_path, formats=('tflite', 'onnx'), opset=13):
+    """Genera los artefactos .tflite / .onnx a partir del .h5. Devuelve {formato: ruta}."""
+    import tensorflow as tf
+    model = tf.keras.models.load_model(model_path)
+    signature = [tf.TensorSpec([None, IMG_HEIGHT, IMG_WIDTH, 3], tf.float32, name='input')]
+    outputs = {}
+    if 'tflite' in formats:
+        concrete = tf.function(lambda x: model(x, training=False)).get_concrete_function(*signature)
+        converter = tf.lite.TFLiteConverter.from_concrete_functions([concrete], model)
+        path = artifact_path(model_path, 'tflite')
+        with open(path, 'wb') as f:
+            f.write(converter.convert())
+        outputs['tflite'] = path
+    if 'onnx' in formats:
+        import tf2onnx
+        path = artifact_path(model_path, 'onnx')
+        tf2onnx.convert.from_keras(model, input_signature=signature, opset=opset, output_path=path)
+        outputs['onnx'] = path
+    return outputs
+
+def load_calibration_images(directory, limit=200):
+    """Lee hasta limit imágenes de un directorio como lote float32 (n, 180, 180, 3) en [0, 1]."""
+    from PIL import Image
+    images = []
+    for name in sorted(os.listdir(directory)):
+        if len(images) >= limit:
+            break
+        try:
+            img = Image.open(os.path.join(directory, name)).convert('RGB').resize((IMG_WIDTH, IMG_HEIGHT))
+        except OSError:
+            continue
+        images.append(np.asarray(img, dtype=np.float32) / 255.0)
+    if not images:
+        raise ValueError(f'No images found in {directory}')
+    return np.stack(images)
+
+def quantize_recognition_model(model_path, variant, backend='tflite', calibration=None):
+    """
+    Genera una variante cuantizada del modelo y devuelve su ruta.
+    calibration (lote float32 de imágenes de muestra) es obligatorio para 'int8'.
+    """
+    path = artifact_path(model_path, backend, variant)
+    if backend == 'onnx':
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        source = artifact_path(model_path, 'onnx')
+        if not os.path.exists(source):
+            convert_recognition_model(model_path, formats=('onnx',))
+        quantize_dynamic(source, path, weight_type=QuantType.QInt8)
+        return path
+
+    import tensorflow as tf
+    model = tf.keras.models.load_model(model_path)
+    signature = [tf.TensorSpec([None, IMG_HEIGHT, IMG_WIDTH, 3], tf.float32, name='input')]
+    concrete = tf.function(lambda x: model(x, training=False)).get_concrete_function(*signature)
+    converter = tf.lite.TFLiteConverter.from_concrete_functions([concrete], model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if variant == 'fp16':
+        converter.target_spec.supported_types = [tf.float16]
+    elif variant == 'int8':
+        if calibration is None or len(calibration) == 0:
+            raise ValueError('int8 quantization requires calibration images')
+
+        def representative_dataset():
+            for image in calibration:
+                yield [image[None, ...]]
+
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    with open(path, 'wb') as f:
+        f.write(converter.convert())
+    return path
@@ -0,0 +1,81 @@
+"""
+Módulos de modelos compartidos por backend-v2 y backend/ml-service.
+
+Esta carpeta es la única fuente: cada servicio se construye con su propio
+contexto de Docker y no puede importar de aquí, así que este script copia los
+módulos a backend-v2/services y a backend/ml-service con una cabecera que
+indica de dónde salen. Los cambios se hacen en sources/shared y se propagan con:
+
+    python sources/shared/sync.py           # reescribe las copias
+    python sources/shared/sync.py --check   # sale con 1 si alguna copia no está al día
+
+backend-v2/tests/test_shared_modules.py ejecuta el --check.
+"""
+import argparse
+import os
+import sys
+
+SHARED = os.path.dirname(os.path.abspath(__file__))
+SOURCES = os.path.dirname(SHARED)
+
+MODULES = [
+    'irrigation_model.py',
+    'recognition_model.py',
+    'image_preprocessing.py',
+    'recognition_cache.py',
+    'model_loader.py'
+]
+
+TARGETS = [
+    os.path.join(SOURCES, 'backend-v2', 'services'),
+    os.path.join(SOURCES, 'backend', 'ml-service')
+]
+
+HEADER = '# Copia generada desde sources/shared/{module} por sources/shared/sync.py: no editar aquí.\n'
+
+def vendored(module):
+    """Contenido que debe tener la copia de module en cada servicio."""
+    with open(os.path.join(SHARED, module), encoding='utf-8') as f:
+        return HEADER.format(module=module) + f.read()
+
+def outdated():
+    """Rutas de las copias que no coinciden con sources/shared."""
+    paths = []
+    for module in MODULES:
+        expected = vendored(module)
+        for target in TARGETS:
+            path = os.path.join(target, module)
+            try:
+                with open(path, encoding='utf-8') as f:
+                    current = f.read()
+            except FileNotFoundError:
+                current = None
+            if current != expected:
+                paths.append(path)
+    return paths
+
+def sync():
+    for module in MODULES:
+        content = vendored(module)
+        for target in TARGETS:
+            with open(os.path.join(target, module), 'w', encoding='utf-8') as f:
+                f.write(content)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--check', action='store_true')
+    args = parser.parse_args()
+    if args.check:
+        paths = outdated()
+        for path in paths:
+            print(f'❌ {os.path.relpath(path, SOURCES)} no coincide con sources/shared')
+        if paths:
+            print('   Ejecuta: python sources/shared/sync.py')
+            sys.exit(1)
+        print('✅ Copias al día')
+        return
+    sync()
+    print(f'✅ {len(MODULES)} módulos copiados a {len(TARGETS)} servicios')
+
+if __name__ == '__main__':
+    main()